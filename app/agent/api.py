@@ -0,0 +1,65 @@
+import time
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, status
+
+from ..core.exceptions.http_exceptions import SessionNotFoundException
+from ..core.record_manager import SessionNotFound
+from ..core.recording_agent import RecordingAgent
+from ..core.utils.logger import get_api_logger
+from ..schemas.agent import AgentHeartbeatSchema, AgentTimeSchema, SessionCommandSchema
+from ..schemas.camera import SessionNotFoundExceptionSchema
+
+router = APIRouter(prefix="/agent/v1", tags=["Agent"])
+
+
+def get_recording_agent() -> RecordingAgent:
+    return RecordingAgent.get_instance(get_api_logger())
+
+
+@router.get("/time", response_model=AgentTimeSchema, status_code=status.HTTP_200_OK)
+def get_time():
+    return AgentTimeSchema(time=time.time())
+
+
+@router.get("/status", response_model=AgentHeartbeatSchema, status_code=status.HTTP_200_OK)
+def get_status(agent: Annotated[RecordingAgent, Depends(get_recording_agent)]):
+    return AgentHeartbeatSchema(**agent.status())
+
+
+@router.post(
+    "/sessions/{session}/start",
+    response_model=AgentHeartbeatSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={status.HTTP_404_NOT_FOUND: {"model": SessionNotFoundExceptionSchema}},
+)
+def start_session(
+    session: Annotated[str, Path(description="Recording session to start")],
+    command: SessionCommandSchema,
+    agent: Annotated[RecordingAgent, Depends(get_recording_agent)],
+):
+    try:
+        agent.start(session, command.start_at, command.stop_at, command.owner)
+    except SessionNotFound as e:
+        raise SessionNotFoundException(e.message, e.session)
+
+    return AgentHeartbeatSchema(**agent.status())
+
+
+@router.post(
+    "/sessions/{session}/stop",
+    response_model=AgentHeartbeatSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={status.HTTP_404_NOT_FOUND: {"model": SessionNotFoundExceptionSchema}},
+)
+def stop_session(
+    session: Annotated[str, Path(description="Recording session to stop")],
+    command: SessionCommandSchema,
+    agent: Annotated[RecordingAgent, Depends(get_recording_agent)],
+):
+    try:
+        agent.stop(session, command.stop_at, command.owner)
+    except SessionNotFound as e:
+        raise SessionNotFoundException(e.message, e.session)
+
+    return AgentHeartbeatSchema(**agent.status())
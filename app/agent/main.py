@@ -0,0 +1,41 @@
+from contextlib import asynccontextmanager
+from threading import Event, Thread
+
+from fastapi import FastAPI
+
+from ..api.dependencies import get_processing_queue, get_recording_catalog, get_retention_worker
+from ..api.metrics import router as metrics_router
+from ..core.process_context import start_worker_server
+from ..core.recording_agent import RecordingAgent
+from ..core.utils.custom_unique_id import custom_generate_unique_id
+from ..core.utils.logger import get_api_logger
+from .api import router as agent_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    agent = RecordingAgent.get_instance(get_api_logger())
+    # Agents keep their recordings on their own disks, which fill up like the coordinator's
+    get_recording_catalog().sync()
+    retention = get_retention_worker()
+    retention.start()
+    Thread(target=start_worker_server, daemon=True).start()
+    stop_event = Event()
+    heartbeats = Thread(target=agent.send_heartbeats, args=(stop_event,), daemon=True)
+    heartbeats.start()
+    yield
+    stop_event.set()
+    heartbeats.join()
+    retention.stop()
+    get_processing_queue().stop()
+
+
+app = FastAPI(
+    lifespan=lifespan,
+    generate_unique_id_function=custom_generate_unique_id,
+    title="OXCAM recording agent",
+    version="v0.2.0",
+    contact={"name": "OX-IT", "email": "viktor.koch@oxit.hu"},
+)
+app.include_router(agent_router)
+app.include_router(metrics_router)
@@ -1,6 +1,20 @@
 import logging
+from functools import cache
+from typing import Annotated
 
-from ..core.record_manager import RecordManager
+from fastapi import Query
+
+from ..core.agent_registry import AgentRegistry
+from ..core.config import DEFAULT_SESSION, get_recording_config
+from ..core.exceptions.http_exceptions import SessionNotFoundException
+from ..core.job_manager import JobManager
+from ..core.processing_queue import ProcessingQueue
+from ..core.record_manager import RecordManager, SessionNotFound
+from ..core.recording_catalog import RecordingCatalog
+from ..core.remote_record_manager import RemoteRecordManager
+from ..core.retention import RetentionWorker
+from ..core.schedulable import Schedulable
+from ..core.schedule_store import ScheduleStore
 from ..core.scheduler import Scheduler
 from ..core.utils.logger import get_api_logger
 from ..schemas.schedule import Schedule, SetSchedule
@@ -9,15 +23,82 @@ _logger = get_api_logger()
 
 
 def get_schedule(set_schedule: SetSchedule):
-    return Schedule(start_time=set_schedule.start_time, end_time=set_schedule.end_time)
+    return Schedule(
+        start_time=set_schedule.start_time,
+        end_time=set_schedule.end_time,
+        recurrence=set_schedule.recurrence,
+        session=set_schedule.session,
+    )
+
+
+@cache
+def get_schedule_store() -> ScheduleStore:
+    return ScheduleStore()
+
+
+def get_session_manager(session: str) -> RecordManager | RemoteRecordManager:
+    """
+    Return the record manager of a session, recording on this host or on an agent depending on its config.
+
+    Raises:
+        SessionNotFound: If the session is not configured.
+    """
+    config = get_recording_config().sessions.get(session)
+    if config is not None and config.remote:
+        return RemoteRecordManager.get_instance(_logger, session)
+
+    return RecordManager.get_instance(_logger, session)
+
+
+def get_session_managers() -> list[RecordManager | RemoteRecordManager]:
+    return [get_session_manager(session) for session in get_recording_config().sessions]
+
+
+def resolve_scheduled_task(schedule: Schedule) -> Schedulable:
+    """
+    Raises:
+        SessionNotFound: If the session of the schedule is not configured.
+    """
+    return get_session_manager(schedule.session)
 
 
 def get_scheduler() -> Scheduler:
-    return Scheduler.get_instance(_logger)
+    return Scheduler.get_instance(_logger, store=get_schedule_store(), task_resolver=resolve_scheduled_task)
+
+
+def get_record_manager(
+    session: Annotated[
+        str,
+        Query(description="Recording session to act on"),
+    ] = DEFAULT_SESSION,
+) -> RecordManager | RemoteRecordManager:
+    try:
+        return get_session_manager(session)
+    except SessionNotFound as e:
+        raise SessionNotFoundException(e.message, e.session)
+
+
+def get_agent_registry() -> AgentRegistry:
+    return AgentRegistry.get_instance(_logger)
+
+
+def get_job_manager() -> JobManager:
+    return JobManager.get_instance(_logger)
+
+
+def get_processing_queue() -> ProcessingQueue:
+    return ProcessingQueue.get_instance(_logger)
+
+
+def get_recording_catalog() -> RecordingCatalog:
+    return RecordingCatalog.get_instance()
 
 
-def get_record_manager() -> RecordManager:
-    return RecordManager.get_instance(_logger)
+def get_retention_worker() -> RetentionWorker:
+    # Remote sessions record on the agents' disks, only the local recordings compete with eviction
+    return RetentionWorker.get_instance(
+        _logger, is_recording=lambda: any(manager.is_running for manager in RecordManager.get_instances(_logger))
+    )
 
 
 def get_api_logger() -> logging.Logger:
@@ -0,0 +1,17 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..core.agent_registry import AgentRegistry
+from ..core.metrics import merge_metrics, render_metrics
+from .dependencies import get_agent_registry
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(registry: Annotated[AgentRegistry, Depends(get_agent_registry)]):
+    # The metrics of the recording agents are served here too, so one scrape target covers every session
+    text = merge_metrics([(render_metrics(), {})] + registry.collect_metrics())
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
@@ -1,10 +1,22 @@
 from fastapi import APIRouter
 
+from .admin import router as admin_router
+from .agent import router as agent_router
 from .camera import router as camera_router
+from .event import router as event_router
+from .job import router as job_router
+from .processing import router as processing_router
+from .recording import router as recording_router
 from .schedule import router as schedule_router
 from .version import router as version_router
 
 router = APIRouter(prefix="/v1")
 router.include_router(schedule_router)
 router.include_router(camera_router)
+router.include_router(job_router)
+router.include_router(processing_router)
+router.include_router(recording_router)
+router.include_router(event_router)
+router.include_router(admin_router)
+router.include_router(agent_router)
 router.include_router(version_router)
@@ -0,0 +1,49 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, Query, status
+
+from ...core.exceptions.http_exceptions import (
+    WorkerCommandFailedException,
+    WorkerNotFoundException,
+    WorkerNotRespondingException,
+)
+from ...core.profiler import MAX_DURATION
+from ...core.record_manager import RecordManager
+from ...core.worker_control import WorkerCommandFailed, WorkerNotFound, WorkerNotResponding
+from ...schemas.profile import ProfileSchema, WorkerExceptionSchema
+from ..dependencies import get_record_manager
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.post(
+    "/profile/{worker}",
+    response_model=ProfileSchema,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": WorkerExceptionSchema},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": WorkerExceptionSchema},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": WorkerExceptionSchema},
+    },
+)
+def profile_worker(
+    *,
+    worker: Annotated[str, Path(description="Name of the recording worker, `pano` or `cam<idx>`")],
+    duration: Annotated[
+        float,
+        Query(gt=0, le=MAX_DURATION, description="Seconds to profile the worker for"),
+    ] = 10,
+    interval: Annotated[
+        float,
+        Query(ge=0.001, le=1, description="Seconds between two stack samples"),
+    ] = 0.005,
+    record_manager: Annotated[RecordManager, Depends(get_record_manager)],
+):
+    try:
+        return ProfileSchema(**record_manager.profile(worker, duration, interval))
+    except WorkerNotFound as e:
+        raise WorkerNotFoundException(e.message, e.worker)
+    except WorkerNotResponding as e:
+        raise WorkerNotRespondingException(e.message, e.worker)
+    except WorkerCommandFailed as e:
+        raise WorkerCommandFailedException(e.message, e.worker)
@@ -0,0 +1,47 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+
+from ...core.agent_registry import Agent, AgentRegistry
+from ...core.config import get_recording_config
+from ...core.remote_record_manager import RemoteRecordManager
+from ...schemas.agent import AgentHeartbeatSchema, AgentSchema, AgentSessionSchema
+from ..dependencies import get_agent_registry, get_api_logger
+
+router = APIRouter(prefix="/agent", tags=["Agent"])
+
+
+def to_agent_schema(agent: Agent) -> AgentSchema:
+    return AgentSchema(
+        name=agent.name,
+        url=agent.url,
+        alive=agent.is_alive(),
+        capacity=agent.capacity,
+        load=agent.load,
+        clock_offset=agent.clock_offset,
+        rtt=agent.rtt,
+        sessions={session: AgentSessionSchema(**report) for session, report in agent.sessions.items()},
+    )
+
+
+@router.post("/heartbeat", response_model=AgentSchema, status_code=status.HTTP_200_OK)
+def heartbeat(
+    heartbeat: AgentHeartbeatSchema,
+    registry: Annotated[AgentRegistry, Depends(get_agent_registry)],
+):
+    sessions = {session: report.model_dump() for session, report in heartbeat.sessions.items()}
+    agent = registry.heartbeat(heartbeat.name, heartbeat.url, heartbeat.capacity, heartbeat.load, sessions)
+
+    configs = get_recording_config().sessions
+    for session, report in heartbeat.sessions.items():
+        if session in configs and configs[session].remote:
+            RemoteRecordManager.get_instance(get_api_logger(), session).follow(
+                agent, report.state, report.armed, report.error
+            )
+
+    return to_agent_schema(agent)
+
+
+@router.get("", response_model=list[AgentSchema], status_code=status.HTTP_200_OK)
+def get_agents(registry: Annotated[AgentRegistry, Depends(get_agent_registry)]):
+    return [to_agent_schema(agent) for agent in registry.get_agents()]
@@ -1,25 +1,40 @@
-from datetime import datetime
-from typing import Annotated, Any
-
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
-
-from ...core.exceptions.http_exceptions import FailedToStartCameraException, FailedToStopCameraException
-from ...core.record_manager import FailedToStartRecordingException, FailedToStopRecordingException, RecordManager
+import asyncio
+from datetime import datetime, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from ...core.config import get_recording_config
+from ...core.exceptions.http_exceptions import (
+    WorkerCommandFailedException,
+    WorkerNotFoundException,
+    WorkerNotRespondingException,
+)
+from ...core.job_manager import JobKind, JobManager, JobStage
+from ...core.preview import PreviewSnapshot
+from ...core.record_manager import RecordManager
 from ...core.scheduler import Scheduler
-from ...schemas.camera import CameraStatus
-from ...schemas.exceptions import CameraExceptionSchema
-from ..dependencies import get_record_manager, get_scheduler
+from ...core.worker_control import WorkerCommandFailed, WorkerNotFound, WorkerNotResponding
+from ...schemas.camera import CameraStatus, PanoReconfigurationSchema, PanoSettingsSchema
+from ...schemas.job import JobSchema
+from ...schemas.profile import WorkerExceptionSchema
+from ..dependencies import get_job_manager, get_record_manager, get_scheduler
+from .job import to_job_schema
 
 router = APIRouter(prefix="/camera", tags=["Camera"])
 
-responses: dict[int, dict[str, Any]] = {
-    202: {"model": CameraStatus},
-    500: {
-        "description": "Error during camera start/stop",
-        "model": CameraExceptionSchema,
-    },
-}
+MJPEG_BOUNDARY = "frame"
+
+
+def get_preview(record_manager: RecordManager, worker: str) -> PreviewSnapshot:
+    try:
+        return record_manager.preview(worker)
+    except WorkerNotFound as e:
+        raise WorkerNotFoundException(e.message, e.worker)
+    except WorkerNotResponding as e:
+        raise WorkerNotRespondingException(e.message, e.worker)
 
 
 @router.get("/status", response_model=CameraStatus)
@@ -29,52 +44,168 @@ def get_camera_status(
         Depends(get_record_manager),
     ],
 ):
-    return CameraStatus(recording=record_manager.is_running)
-
-
-@router.post("/start", status_code=status.HTTP_200_OK, response_model=CameraStatus, responses={**responses})
-def start_camera(record_manager: Annotated[RecordManager, Depends(get_record_manager)]):
-    status = CameraStatus(recording=True)
+    snapshot = record_manager.snapshot
+    return CameraStatus(session=record_manager.session, recording=snapshot.is_running, state=snapshot.state)
 
-    if record_manager.is_running:
-        return JSONResponse(status_code=202, content=status.model_dump())
 
-    try:
-        record_manager.start(datetime.now())
-    except FailedToStartRecordingException as e:
-        raise FailedToStartCameraException(e.message)
+@router.post("/start", status_code=status.HTTP_202_ACCEPTED, response_model=JobSchema)
+def start_camera(
+    record_manager: Annotated[RecordManager, Depends(get_record_manager)],
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
+):
+    def start(progress):
+        record_manager.start(datetime.now(), progress=progress)
 
-    return status
+    return to_job_schema(job_manager.submit(JobKind.START, start, record_manager.session))
 
 
-@router.post("/stop", status_code=status.HTTP_200_OK, response_model=CameraStatus, responses={**responses})
+@router.post("/stop", status_code=status.HTTP_202_ACCEPTED, response_model=JobSchema)
 def stop_camera(
     record_manager: Annotated[RecordManager, Depends(get_record_manager)],
     scheduler: Annotated[Scheduler, Depends(get_scheduler)],
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
 ):
-    status = CameraStatus(recording=False)
+    def stop(progress):
+        progress(JobStage.STOPPING)
+        success = scheduler.stop_running_task(record_manager)
+        if not success:
+            record_manager.stop()
+        progress(JobStage.STOPPED)
 
-    if not record_manager.is_running:
-        return JSONResponse(status_code=202, content=status.model_dump())
+    return to_job_schema(job_manager.submit(JobKind.STOP, stop, record_manager.session))
 
-    try:
-        success = scheduler.stop_running_task()
-        if not success:
+
+@router.post("/restart", status_code=status.HTTP_202_ACCEPTED, response_model=JobSchema)
+def restart_camera(
+    record_manager: Annotated[RecordManager, Depends(get_record_manager)],
+    scheduler: Annotated[Scheduler, Depends(get_scheduler)],
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
+):
+    def restart(progress):
+        progress(JobStage.STOPPING)
+        # A scheduled recording is restarted by its task, which stops it again when the schedule ends
+        if not scheduler.restart_running_task(record_manager, datetime.now(), progress=progress):
             record_manager.stop()
-    except FailedToStopRecordingException as e:
-        raise FailedToStopCameraException(e.message)
+            record_manager.start(datetime.now(), progress=progress)
+
+    return to_job_schema(job_manager.submit(JobKind.RESTART, restart, record_manager.session))
 
-    return status
 
+@router.get(
+    "/preview/{worker}",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {"content": {"image/jpeg": {}}, "description": "Latest preview frame of the worker"},
+        status.HTTP_404_NOT_FOUND: {"model": WorkerExceptionSchema},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": WorkerExceptionSchema},
+    },
+)
+def get_camera_preview(
+    *,
+    worker: Annotated[
+        str, Path(description="Name of the recording worker, `pano` for the annotated region of interest or `cam<idx>`")
+    ],
+    record_manager: Annotated[RecordManager, Depends(get_record_manager)],
+):
+    """
+    Latest frame of a recording worker, downscaled and JPEG encoded. All viewers share the same encoded frame.
+    """
+    snapshot = get_preview(record_manager, worker)
+    return Response(
+        snapshot.jpeg,
+        media_type="image/jpeg",
+        headers={
+            "Cache-Control": "no-store",
+            "X-Frame-Time": datetime.fromtimestamp(snapshot.timestamp, timezone.utc).isoformat(),
+        },
+    )
+
+
+@router.get(
+    "/preview/{worker}/stream",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}": {}},
+            "description": "MJPEG stream of the worker's preview, ending with the recording",
+        },
+        status.HTTP_404_NOT_FOUND: {"model": WorkerExceptionSchema},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": WorkerExceptionSchema},
+    },
+)
+async def stream_camera_preview(
+    *,
+    worker: Annotated[
+        str, Path(description="Name of the recording worker, `pano` for the annotated region of interest or `cam<idx>`")
+    ],
+    record_manager: Annotated[RecordManager, Depends(get_record_manager)],
+):
+    # Fails before the stream starts if the worker is not recording
+    first = await run_in_threadpool(get_preview, record_manager, worker)
+    interval = 1 / get_recording_config().preview.fps
+
+    async def frames():
+        snapshot, sequence = first, None
+        while True:
+            if snapshot.sequence != sequence:
+                sequence = snapshot.sequence
+                yield (
+                    f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(snapshot.jpeg)}\r\n\r\n"
+                ).encode() + snapshot.jpeg + b"\r\n"
+
+            await asyncio.sleep(interval)
+            try:
+                snapshot = await run_in_threadpool(record_manager.preview, worker)
+            except WorkerNotFound:
+                return
+            except WorkerNotResponding:
+                continue
+
+    return StreamingResponse(
+        frames(),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.get("/pano", response_model=PanoSettingsSchema, status_code=status.HTTP_200_OK)
+def get_pano_settings(record_manager: Annotated[RecordManager, Depends(get_record_manager)]):
+    """
+    Stream and config of the running panorama worker, the configured ones while the session is not recording.
+    """
+    url, config = record_manager.pano_settings
+    return PanoSettingsSchema(url=url, config=config)
+
+
+@router.put(
+    "/pano",
+    response_model=PanoReconfigurationSchema,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": WorkerExceptionSchema},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": WorkerExceptionSchema},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": WorkerExceptionSchema},
+    },
+)
+def reconfigure_pano(
+    *,
+    settings: PanoSettingsSchema,
+    record_manager: Annotated[RecordManager, Depends(get_record_manager)],
+):
+    """
+    Apply a new stream and config to the panorama worker of a running recording, without stopping it.
 
-@router.post("/restart", status_code=status.HTTP_200_OK, response_model=CameraStatus, responses={**responses})
-def restart_camera(record_manager: Annotated[RecordManager, Depends(get_record_manager)]):
+    A new model is loaded and a new stream connected next to the running ones, the worker switches over between
+    two frames once they are ready. The NDI recordings are not touched. The change lasts until the recording
+    stops, the next one starts with the configured settings.
+    """
     try:
-        record_manager.stop()
-        record_manager.start(datetime.now())
-    except FailedToStopRecordingException as e:
-        raise FailedToStopCameraException(e.message)
-    except FailedToStartRecordingException as e:
-        raise FailedToStartCameraException(e.message)
-
-    return CameraStatus(recording=True)
+        return PanoReconfigurationSchema(**record_manager.reconfigure_pano(settings.url, settings.config))
+    except WorkerNotFound as e:
+        raise WorkerNotFoundException(e.message, e.worker)
+    except WorkerNotResponding as e:
+        raise WorkerNotRespondingException(e.message, e.worker)
+    except WorkerCommandFailed as e:
+        raise WorkerCommandFailedException(e.message, e.worker)
@@ -0,0 +1,45 @@
+import asyncio
+import json
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from ...core.event_bus import EventBus
+
+router = APIRouter(prefix="/event", tags=["Event"])
+
+KEEPALIVE_INTERVAL: float = 15.0
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}, "description": "Server-sent event stream"}},
+)
+async def stream_events(
+    types: Annotated[
+        list[str] | None,
+        Query(
+            description="Only stream these event types",
+            examples=[["recording_state", "schedule", "job", "ptz_preset", "throughput"]],
+        ),
+    ] = None,
+):
+    event_bus = EventBus.get_instance()
+    subscription = event_bus.subscribe(None if not types else set(types))
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,50 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, Query, status
+
+from ...core.exceptions.http_exceptions import JobNotFoundException
+from ...core.job_manager import Job, JobManager, JobNotFound
+from ...schemas.job import JobNotFoundExceptionSchema, JobSchema
+from ..dependencies import get_job_manager
+
+router = APIRouter(prefix="/job", tags=["Job"])
+
+
+def to_job_schema(job: Job) -> JobSchema:
+    return JobSchema(
+        id=job.id,
+        kind=job.kind,
+        session=job.session,
+        state=job.state,
+        stage=job.stage,
+        error=job.error,
+        version=job.version,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.get(
+    "/{id}",
+    response_model=JobSchema,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_404_NOT_FOUND: {"model": JobNotFoundExceptionSchema}},
+)
+def get_job(
+    *,
+    id: Annotated[str, Path(description="ID of the job to get")],
+    wait: Annotated[
+        float,
+        Query(ge=0, le=30, description="Seconds to wait for the job to be updated past `version`"),
+    ] = 0,
+    version: Annotated[
+        int,
+        Query(description="Last version of the job seen by the client"),
+    ] = -1,
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
+):
+    try:
+        job = job_manager.wait(id, version, wait) if wait > 0 else job_manager.get(id)
+        return to_job_schema(job)
+    except JobNotFound as e:
+        raise JobNotFoundException(id=e.id)
@@ -0,0 +1,59 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, Query, status
+
+from ...core.exceptions.http_exceptions import ProcessingJobNotFoundException
+from ...core.processing_queue import ProcessingJob, ProcessingJobNotFound, ProcessingQueue
+from ...schemas.processing import ProcessingJobNotFoundExceptionSchema, ProcessingJobSchema, ProcessingStatusSchema
+from ..dependencies import get_processing_queue
+
+router = APIRouter(prefix="/processing", tags=["Processing"])
+
+
+def to_processing_job_schema(job: ProcessingJob) -> ProcessingJobSchema:
+    return ProcessingJobSchema(
+        id=job.id,
+        session=job.session,
+        recording_id=job.recording_id,
+        recording_dir=job.recording_dir,
+        step=job.step.name,
+        state=job.state,
+        commands_done=job.commands_done,
+        commands_total=job.commands_total,
+        error=job.error,
+        version=job.version,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.get("/", response_model=ProcessingStatusSchema, status_code=status.HTTP_200_OK)
+def get_processing_status(
+    *,
+    session: Annotated[
+        str | None,
+        Query(description="Only list the jobs of this recording session"),
+    ] = None,
+    processing_queue: Annotated[ProcessingQueue, Depends(get_processing_queue)],
+):
+    return ProcessingStatusSchema(
+        paused=processing_queue.is_paused,
+        jobs=[to_processing_job_schema(job) for job in processing_queue.get_jobs(session)],
+    )
+
+
+@router.get(
+    "/{id}",
+    response_model=ProcessingJobSchema,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_404_NOT_FOUND: {"model": ProcessingJobNotFoundExceptionSchema}},
+)
+def get_processing_job(
+    *,
+    id: Annotated[str, Path(description="ID of the processing job to get")],
+    processing_queue: Annotated[ProcessingQueue, Depends(get_processing_queue)],
+):
+    try:
+        return to_processing_job_schema(processing_queue.get(id))
+    except ProcessingJobNotFound as e:
+        raise ProcessingJobNotFoundException(id=e.id)
@@ -0,0 +1,287 @@
+import os
+import subprocess
+from datetime import datetime, timezone
+from typing import Annotated
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, Path, Query, Response, status
+from fastapi.responses import FileResponse
+
+from ...core.config import get_recording_config
+from ...core.exceptions.http_exceptions import (
+    ClipFailedException,
+    InvalidScheduleCursorException,
+    RecordingNotFoundException,
+)
+from ...core.recording_catalog import CatalogRecording, RecordingCatalog, RecordingFileNotFound, RecordingNotFound
+from ...core.timeline import CLIPS_DIR_NAME, TimelineNotFound, cut_clips, load_timeline
+from ...core.utils.cursor import decode_cursor, encode_cursor
+from ...core.utils.timezone import to_utc
+from ...schemas.recording import (
+    ClipFailedExceptionSchema,
+    ClipRequestSchema,
+    ClipSchema,
+    PresetIntervalSchema,
+    RecordingDetailSchema,
+    RecordingFileSchema,
+    RecordingNotFoundExceptionSchema,
+    RecordingSchema,
+    TimelineEventSchema,
+    TimelineFileSchema,
+    TimelineSchema,
+)
+from ...schemas.schedule import InvalidScheduleCursorExceptionSchema
+from ..dependencies import get_recording_catalog
+
+router = APIRouter(prefix="/recording", tags=["Recording"])
+
+
+class RecordingFileResponse(FileResponse):
+    # Recordings are tens of gigabytes, larger reads keep the event loop out of the way of the disk
+    chunk_size = 1024 * 1024
+
+
+def to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def get_catalog_recording(catalog: RecordingCatalog, id: int) -> CatalogRecording:
+    try:
+        return catalog.get(id)
+    except RecordingNotFound as e:
+        raise RecordingNotFoundException(e.message, e.id)
+
+
+def to_recording_schema(recording: CatalogRecording) -> RecordingSchema:
+    return RecordingSchema(
+        id=recording.id,
+        session=recording.session,
+        name=recording.name,
+        state=recording.state,
+        start_time=recording.start_time,
+        end_time=recording.end_time,
+        duration=recording.duration,
+        schedule_id=recording.schedule_id,
+        cameras=recording.cameras,
+        size_bytes=recording.size_bytes,
+        health=recording.health,
+    )
+
+
+@router.get(
+    "/",
+    response_model=list[RecordingSchema],
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_400_BAD_REQUEST: {"model": InvalidScheduleCursorExceptionSchema}},
+)
+def get_recordings(
+    *,
+    start: Annotated[
+        datetime | None,
+        Query(alias="from", description="Only list recordings started at or after this time"),
+    ] = None,
+    end: Annotated[
+        datetime | None,
+        Query(alias="to", description="Only list recordings started at or before this time"),
+    ] = None,
+    cursor: Annotated[
+        str | None,
+        Query(description="Cursor from the X-Next-Cursor header of the previous page"),
+    ] = None,
+    limit: Annotated[
+        int | None,
+        Query(ge=1, le=1000, description="Maximum number of recordings to return"),
+    ] = None,
+    session: Annotated[
+        str | None,
+        Query(description="Only list the recordings of this recording session"),
+    ] = None,
+    response: Response,
+    catalog: Annotated[RecordingCatalog, Depends(get_recording_catalog)],
+):
+    before = None
+    if cursor is not None:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError:
+            raise InvalidScheduleCursorException(cursor)
+
+    recordings = catalog.get_recordings(
+        session=session,
+        start=None if start is None else to_utc(start),
+        end=None if end is None else to_utc(end),
+        before=before,
+        limit=limit,
+    )
+
+    if limit is not None and len(recordings) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(recordings[-1].start_time, recordings[-1].id)
+
+    return [to_recording_schema(recording) for recording in recordings]
+
+
+@router.get(
+    "/{id}",
+    response_model=RecordingDetailSchema,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_404_NOT_FOUND: {"model": RecordingNotFoundExceptionSchema}},
+)
+def get_recording(
+    *,
+    id: Annotated[int, Path(description="ID of the recording to get")],
+    catalog: Annotated[RecordingCatalog, Depends(get_recording_catalog)],
+):
+    recording = get_catalog_recording(catalog, id)
+    return RecordingDetailSchema(
+        **to_recording_schema(recording).model_dump(),
+        files=[RecordingFileSchema(**file._asdict()) for file in recording.files],
+    )
+
+
+@router.get(
+    "/{id}/files/{name}",
+    response_class=RecordingFileResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {"description": "The file, or the requested range of it with status 206"},
+        status.HTTP_404_NOT_FOUND: {"model": RecordingNotFoundExceptionSchema},
+    },
+)
+def download_recording_file(
+    *,
+    id: Annotated[int, Path(description="ID of the recording")],
+    name: Annotated[str, Path(description="Name of the file in the recording")],
+    catalog: Annotated[RecordingCatalog, Depends(get_recording_catalog)],
+):
+    try:
+        path = catalog.get_file_path(id, name)
+    except RecordingNotFound as e:
+        raise RecordingNotFoundException(e.message, e.id)
+    except RecordingFileNotFound as e:
+        raise RecordingNotFoundException(e.message, e.id, e.name)
+
+    accel_prefix = get_recording_config().download_accel_prefix
+    if accel_prefix is not None:
+        # The proxy sends the file with sendfile and handles the Range header itself
+        relative_path = path.removeprefix(catalog.root).lstrip("/")
+        return Response(
+            headers={
+                "X-Accel-Redirect": f"{accel_prefix.rstrip('/')}/{quote(relative_path)}",
+                "Content-Disposition": f"attachment; filename*=utf-8''{quote(name)}",
+            }
+        )
+
+    return RecordingFileResponse(path, filename=name)
+
+
+@router.get(
+    "/{id}/timeline",
+    response_model=TimelineSchema,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_404_NOT_FOUND: {"model": RecordingNotFoundExceptionSchema}},
+)
+def get_recording_timeline(
+    *,
+    id: Annotated[int, Path(description="ID of the recording")],
+    kind: Annotated[
+        list[str] | None,
+        Query(description="Only list events of these kinds"),
+    ] = None,
+    preset: Annotated[
+        int | None,
+        Query(description="Only list the intervals spent on this preset"),
+    ] = None,
+    catalog: Annotated[RecordingCatalog, Depends(get_recording_catalog)],
+):
+    recording = get_catalog_recording(catalog, id)
+    try:
+        timeline = load_timeline(recording.path)
+    except TimelineNotFound as e:
+        raise RecordingNotFoundException(e.message, id)
+
+    return TimelineSchema(
+        events=[
+            TimelineEventSchema(time=to_datetime(event.time), kind=event.kind, data=event.data)
+            for event in timeline.events
+            if kind is None or event.kind in kind
+        ],
+        presets=[
+            PresetIntervalSchema(
+                preset=interval.preset, start=to_datetime(interval.start), end=to_datetime(interval.end)
+            )
+            for interval in timeline.preset_intervals()
+            if preset is None or interval.preset == preset
+        ],
+        files=[
+            TimelineFileSchema(
+                name=file.name,
+                camera=file.camera,
+                segment=file.segment,
+                start=to_datetime(file.start),
+                duration=file.duration,
+                keyframes=len(file.keyframes),
+            )
+            for file in timeline.files
+        ],
+    )
+
+
+@router.post(
+    "/{id}/clips",
+    response_model=list[ClipSchema],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": RecordingNotFoundExceptionSchema},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ClipFailedExceptionSchema},
+    },
+)
+def create_clips(
+    *,
+    id: Annotated[int, Path(description="ID of the recording")],
+    request: ClipRequestSchema,
+    catalog: Annotated[RecordingCatalog, Depends(get_recording_catalog)],
+):
+    """
+    Cut a time range out of the camera files with stream copy, one clip per camera file overlapping it.
+    """
+    recording = get_catalog_recording(catalog, id)
+    try:
+        clips = cut_clips(
+            recording.path, to_utc(request.start).timestamp(), to_utc(request.end).timestamp(), request.cameras
+        )
+    except TimelineNotFound as e:
+        raise RecordingNotFoundException(e.message, id)
+    except subprocess.CalledProcessError as e:
+        raise ClipFailedException(f"ffmpeg failed to cut a clip: {e.stderr.decode(errors='replace').strip()}", id)
+
+    return [
+        ClipSchema(
+            name=clip.name,
+            camera=clip.camera,
+            segment=clip.segment,
+            start=to_datetime(clip.start),
+            end=to_datetime(clip.end),
+            size_bytes=os.path.getsize(clip.path),
+        )
+        for clip in clips
+    ]
+
+
+@router.get(
+    "/{id}/clips/{name}",
+    response_class=RecordingFileResponse,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_404_NOT_FOUND: {"model": RecordingNotFoundExceptionSchema}},
+)
+def download_clip(
+    *,
+    id: Annotated[int, Path(description="ID of the recording")],
+    name: Annotated[str, Path(description="Name of the clip")],
+    catalog: Annotated[RecordingCatalog, Depends(get_recording_catalog)],
+):
+    recording = get_catalog_recording(catalog, id)
+    path = f"{recording.path}/{CLIPS_DIR_NAME}/{name}"
+    if os.path.basename(name) != name or not os.path.isfile(path):
+        raise RecordingNotFoundException(f"Recording {id} has no clip named {name}", id, name)
+
+    return RecordingFileResponse(path, filename=name)
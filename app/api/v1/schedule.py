@@ -1,19 +1,27 @@
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query, status
+from fastapi import APIRouter, Depends, Header, Path, Query, Response, status
 
 from ...core.exceptions.http_exceptions import (
     DuplicateScheduleIdException,
+    InsufficientStorageException,
+    InvalidScheduleCursorException,
     OverlappingScheduleException,
     ScheduledTaskIsInThePastException,
     ScheduleNotFoundException,
+    SessionNotFoundException,
 )
-from ...core.record_manager import RecordManager
+from ...core.record_manager import SessionNotFound
 from ...core.scheduler import Scheduler, TaskNotFound, TaskOverlapsWithOtherTask, TaskWithSameIdExists
+from ...core.storage import InsufficientStorage
+from ...core.utils.cursor import decode_cursor, encode_cursor
 from ...core.utils.remaining_time import get_formatted_remaining_time
+from ...core.utils.timezone import to_utc
+from ...schemas.camera import SessionNotFoundExceptionSchema
 from ...schemas.schedule import (
     DuplicateScheduleExceptionSchema,
+    InvalidScheduleCursorExceptionSchema,
     Schedule,
     ScheduledTaskIsInThePastExceptionSchema,
     ScheduleMessage,
@@ -22,7 +30,8 @@ from ...schemas.schedule import (
     ScheduleRemovedMessage,
 )
 from ...schemas.scheduled_task import ScheduledTaskSchema
-from ..dependencies import get_record_manager, get_schedule, get_scheduler
+from ...schemas.storage import InsufficientStorageExceptionSchema
+from ..dependencies import get_schedule, get_scheduler, get_session_managers, resolve_scheduled_task
 
 router = APIRouter(prefix="/schedule", tags=["Schedule"])
 
@@ -31,16 +40,72 @@ router = APIRouter(prefix="/schedule", tags=["Schedule"])
     "/",
     response_model=list[ScheduledTaskSchema],
     status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "The schedule did not change since the given ETag"},
+        status.HTTP_400_BAD_REQUEST: {"model": InvalidScheduleCursorExceptionSchema},
+    },
 )
-def get_tasks(scheduler: Annotated[Scheduler, Depends(get_scheduler)]):
+def get_tasks(
+    *,
+    start: Annotated[
+        datetime | None,
+        Query(alias="from", description="Only list tasks that end at or after this time"),
+    ] = None,
+    end: Annotated[
+        datetime | None,
+        Query(alias="to", description="Only list tasks that start at or before this time"),
+    ] = None,
+    cursor: Annotated[
+        str | None,
+        Query(description="Cursor from the X-Next-Cursor header of the previous page"),
+    ] = None,
+    limit: Annotated[
+        int | None,
+        Query(ge=1, le=1000, description="Maximum number of tasks to return"),
+    ] = None,
+    session: Annotated[
+        str | None,
+        Query(description="Only list the tasks of this recording session"),
+    ] = None,
+    if_none_match: Annotated[str | None, Header(description="ETag of the last response")] = None,
+    response: Response,
+    scheduler: Annotated[Scheduler, Depends(get_scheduler)],
+):
+    # The listing only changes with the schedule or the recording states, all of which are versioned
+    sequences = ".".join(str(manager.snapshot.sequence) for manager in get_session_managers())
+    etag = f'W/"{scheduler.version}.{sequences}"'
+    if if_none_match is not None and (if_none_match.strip() == "*" or etag in if_none_match.split(", ")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise InvalidScheduleCursorException(cursor)
+
+    tasks = scheduler.get_tasks(
+        start=None if start is None else to_utc(start),
+        end=None if end is None else to_utc(end),
+        after=after,
+        limit=limit,
+        session=session,
+    )
+
+    if limit is not None and len(tasks) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(tasks[-1].schedule.start_time, tasks[-1].id)
+
     return [
         ScheduledTaskSchema(
             id=task.id,
             schedule=task.schedule,
             is_running=task.is_running(),
             is_force_stopped=task.is_force_stopped(),
+            occurrence=task.occurrence,
         )
-        for task in scheduler.get_tasks()
+        for task in tasks
     ]
 
 
@@ -62,6 +127,7 @@ def get_task(
             schedule=task.schedule,
             is_running=task.is_running(),
             is_force_stopped=task.is_force_stopped(),
+            occurrence=task.occurrence,
         )
     except TaskNotFound as e:
         raise ScheduleNotFoundException(id=e.id)
@@ -76,20 +142,29 @@ def get_task(
             "description": "Error during setting schedule",
             "model": ScheduledTaskIsInThePastExceptionSchema,
         },
+        status.HTTP_404_NOT_FOUND: {"model": SessionNotFoundExceptionSchema},
         status.HTTP_409_CONFLICT: {
             "description": "Task with same id exists or overlaps with existing task",
             "model": DuplicateScheduleExceptionSchema | ScheduleOverlapsExceptionSchema,
         },
+        status.HTTP_507_INSUFFICIENT_STORAGE: {
+            "description": "The recordings of the schedule would not fit on the recordings disk",
+            "model": InsufficientStorageExceptionSchema,
+        },
     },
 )
 def set_schedule(
     schedule: Annotated[Schedule, Depends(get_schedule)],
     scheduler: Annotated[Scheduler, Depends(get_scheduler)],
-    record_manager: Annotated[RecordManager, Depends(get_record_manager)],
 ):
     if schedule.start_time < datetime.now(timezone.utc):
         raise ScheduledTaskIsInThePastException(schedule.start_time)
 
+    try:
+        record_manager = resolve_scheduled_task(schedule)
+    except SessionNotFound as e:
+        raise SessionNotFoundException(e.message, e.session)
+
     try:
         id: int = scheduler.add_task(schedule=schedule, task=record_manager)
         remaining_time: timedelta = schedule.start_time - datetime.now(timezone.utc)
@@ -104,6 +179,8 @@ def set_schedule(
         raise DuplicateScheduleIdException(e.id)
     except TaskOverlapsWithOtherTask as e:
         raise OverlappingScheduleException(e.message, e.existing_task_id)
+    except InsufficientStorage as e:
+        raise InsufficientStorageException(e.message, e.required_bytes, e.available_bytes)
 
 
 @router.delete(
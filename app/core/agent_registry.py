@@ -0,0 +1,187 @@
+import logging
+import time
+from threading import Lock, Thread
+
+from typing_extensions import Self
+
+from .utils.http import HttpRequestFailed, request, request_json
+
+
+class NoAgentAvailable(Exception):
+    def __init__(self, message: str, session: str):
+        self.message = message
+        self.session = session
+        super().__init__(self.message)
+
+
+class Agent:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url.rstrip("/")
+        self.sessions: dict[str, dict] = {}
+        self.capacity = 1
+        self.load = 0
+        # Agent clock minus coordinator clock, and the round trip time of the sample it was taken from
+        self.clock_offset = 0.0
+        self.rtt: float | None = None
+        self.clock_synced_at: float | None = None
+        # Set while a clock sync with the agent runs, so heartbeats do not start another one
+        self.clock_syncing = False
+        self.last_seen = time.monotonic()
+
+    def __str__(self):
+        return f'Agent(name={self.name}, url={self.url}, load={self.load}/{self.capacity})'
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def utilization(self) -> float:
+        return self.load / self.capacity
+
+    def is_alive(self) -> bool:
+        return time.monotonic() - self.last_seen < AgentRegistry.AGENT_TIMEOUT
+
+    def to_agent_time(self, timestamp: float) -> float:
+        return timestamp + self.clock_offset
+
+
+class AgentRegistry:
+    """
+    Recording agents known to the coordinator, kept up to date by their heartbeats.
+
+    The clock offset of an agent is estimated like NTP does: of a few time requests, the one with the shortest
+    round trip is taken and the agent's clock is assumed to have been read halfway through it. Deadlines sent to
+    an agent are converted to its clock with that offset.
+    """
+
+    __instance: Self | None = None
+    __key = object()
+
+    AGENT_TIMEOUT: float = 15.0
+    CLOCK_SAMPLES: int = 5
+    CLOCK_RESYNC_INTERVAL: float = 300.0
+    METRICS_TIMEOUT: float = 1.0
+
+    @classmethod
+    def get_instance(cls, logger: logging.Logger) -> Self:
+        if cls.__instance is None:
+            cls.__instance = cls(cls.__key, logger)
+        return cls.__instance
+
+    def __init__(self, key, logger: logging.Logger):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        self.__logger = logger
+        self.__agents: dict[str, Agent] = {}
+        self.__lock = Lock()
+
+    def heartbeat(self, name: str, url: str, capacity: int, load: int, sessions: dict[str, dict]) -> Agent:
+        """
+        Register an agent or refresh it, resyncing its clock when it is new, moved or due.
+
+        The clock is synced in the background, the samples taking longer than the agent waits for the reply.
+        """
+        with self.__lock:
+            agent = self.__agents.get(name)
+            if agent is None or agent.url != url.rstrip("/"):
+                agent = Agent(name, url)
+                self.__agents[name] = agent
+                self.__logger.info(f"Registered recording agent {agent}")
+
+            agent.capacity = capacity
+            agent.load = load
+            agent.sessions = sessions
+            agent.last_seen = time.monotonic()
+            resync = not agent.clock_syncing and (
+                agent.clock_synced_at is None or time.monotonic() - agent.clock_synced_at > self.CLOCK_RESYNC_INTERVAL
+            )
+            if resync:
+                agent.clock_syncing = True
+
+        if resync:
+            Thread(target=self.__sync_clock_in_background, args=(agent,), daemon=True).start()
+
+        return agent
+
+    def __sync_clock_in_background(self, agent: Agent):
+        try:
+            self.sync_clock(agent)
+        except Exception as e:
+            self.__logger.error(f"Clock sync with {agent.name} failed: {e}")
+        finally:
+            with self.__lock:
+                agent.clock_syncing = False
+
+    def sync_clock(self, agent: Agent):
+        best: tuple[float, float] | None = None
+        for _ in range(self.CLOCK_SAMPLES):
+            sent = time.time()
+            try:
+                agent_time = request_json(f"{agent.url}/agent/v1/time", timeout=2.0)["time"]
+            except HttpRequestFailed as e:
+                self.__logger.warning(f"Clock sync with {agent.name} failed: {e.message}")
+                return
+            received = time.time()
+
+            rtt = received - sent
+            if best is None or rtt < best[0]:
+                best = (rtt, agent_time - (sent + received) / 2)
+
+        agent.rtt, agent.clock_offset = best
+        agent.clock_synced_at = time.monotonic()
+        self.__logger.info(
+            f"Clock of {agent.name}: offset {agent.clock_offset * 1000:.1f} ms, rtt {agent.rtt * 1000:.1f} ms"
+        )
+
+    def get_agents(self) -> list[Agent]:
+        with self.__lock:
+            return sorted(self.__agents.values(), key=lambda agent: agent.name)
+
+    def get_agent(self, name: str) -> Agent | None:
+        return self.__agents.get(name)
+
+    def pick(self, session: str) -> Agent:
+        """
+        Choose the least utilized live agent configured with the session.
+
+        The chosen agent's load is bumped right away, so sessions assigned before its next heartbeat spread out.
+
+        Raises:
+            NoAgentAvailable: If no live agent can record the session.
+        """
+        with self.__lock:
+            candidates = [agent for agent in self.__agents.values() if agent.is_alive() and session in agent.sessions]
+            if not candidates:
+                raise NoAgentAvailable(f"No live recording agent can record session {session}", session)
+
+            agent = min(candidates, key=lambda agent: (agent.utilization, agent.name))
+            agent.load += 1
+            return agent
+
+    def send(self, agent: Agent, method: str, path: str, body: dict | None = None) -> dict:
+        """
+        Raises:
+            HttpRequestFailed: If the agent cannot be reached or rejects the request.
+        """
+        return request_json(f"{agent.url}{path}", method, body)
+
+    def collect_metrics(self) -> list[tuple[str, dict[str, str]]]:
+        """
+        The metrics exposition of every live agent reachable in time, with the labels identifying the agent.
+        """
+        expositions = []
+        for agent in self.get_agents():
+            if not agent.is_alive():
+                continue
+
+            try:
+                text = request(f"{agent.url}/metrics", timeout=self.METRICS_TIMEOUT).decode()
+            except HttpRequestFailed as e:
+                self.__logger.warning(f"Cannot collect the metrics of {agent.name}: {e.message}")
+                continue
+
+            expositions.append((text, {"agent": agent.name}))
+
+        return expositions
@@ -0,0 +1,117 @@
+import glob
+import os
+import re
+
+
+def parse_cpu_list(cpu_list: str) -> list[int]:
+    """
+    Parse a kernel CPU list like `0-3,8,10-11`.
+    """
+    cpus = []
+    for part in cpu_list.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def available_cpus() -> list[int]:
+    return sorted(os.sched_getaffinity(0))
+
+
+def numa_nodes() -> list[list[int]]:
+    """
+    The CPUs this process may run on grouped by NUMA node, a single group where the topology is not exposed.
+    """
+    cpus = set(available_cpus())
+    nodes = []
+    paths = glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")
+    for path in sorted(paths, key=lambda path: int(re.search(r"node(\d+)", path).group(1))):
+        with open(path) as file:
+            node = sorted(cpus.intersection(parse_cpu_list(file.read())))
+        if node:
+            nodes.append(node)
+
+    return nodes or [sorted(cpus)]
+
+
+def partition_nodes(parts: int, nodes: list[list[int]] | None = None) -> list[list[list[int]]]:
+    """
+    Split the CPUs, in node order, into contiguous and nearly equal blocks, one for each recording session.
+
+    Returns:
+        The CPUs of every block grouped by NUMA node, empty blocks if there are fewer CPUs than blocks.
+    """
+    nodes = nodes if nodes is not None else numa_nodes()
+    flat = [(node_idx, cpu) for node_idx, node in enumerate(nodes) for cpu in node]
+    size, extra = divmod(len(flat), parts)
+
+    blocks = []
+    start = 0
+    for idx in range(parts):
+        end = start + size + (1 if idx < extra else 0)
+        block: dict[int, list[int]] = {}
+        for node_idx, cpu in flat[start:end]:
+            block.setdefault(node_idx, []).append(cpu)
+        blocks.append(list(block.values()))
+        start = end
+
+    return blocks
+
+
+def plan_placement(receivers: int, nodes: list[list[int]] | None = None) -> tuple[list[int], list[list[int]]] | None:
+    """
+    Split the CPUs into disjoint sets for the panorama worker and every receiver.
+
+    The panorama worker gets an equal share of the first node. Receivers then get equal shares carved out of one
+    node each, in proportion to the node sizes, so a receiver and its ffmpeg child, which inherits the
+    affinity, stay on one memory node.
+
+    Returns:
+        The CPUs of the panorama worker and of every receiver, None if there are fewer CPUs than workers.
+    """
+    nodes = nodes if nodes is not None else numa_nodes()
+    nodes = [node for node in nodes if node]
+    total = sum(len(node) for node in nodes)
+    if receivers < 1 or total < receivers + 1:
+        return None
+
+    share = total // (receivers + 1)
+    pano = nodes[0][:share]
+    remaining = [node[share:] if idx == 0 else node for idx, node in enumerate(nodes)]
+
+    # Receivers per node in proportion to its free CPUs, largest remainders first
+    free = sum(len(node) for node in remaining)
+    quotas = [receivers * len(node) / free for node in remaining]
+    counts = [int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(remaining)), key=lambda idx: quotas[idx] - counts[idx], reverse=True)
+    for idx in by_remainder[: receivers - sum(counts)]:
+        counts[idx] += 1
+
+    chunks = []
+    leftover = []
+    for node, count in zip(remaining, counts):
+        if count == 0:
+            leftover.extend(node)
+            continue
+        size, extra = divmod(len(node), count)
+        start = 0
+        for idx in range(count):
+            end = start + size + (1 if idx < extra else 0)
+            chunks.append(node[start:end])
+            start = end
+
+    # CPUs of nodes too small for a receiver of their own are shared out across nodes
+    for idx, cpu in enumerate(leftover):
+        chunks[idx % len(chunks)].append(cpu)
+
+    return pano, chunks
+
+
+def pin_to_cpus(cpus: list[int] | None):
+    """
+    Restrict the calling process, and the children it starts afterwards, to the given CPUs.
+    """
+    if cpus:
+        os.sched_setaffinity(0, cpus)
@@ -0,0 +1,208 @@
+import json
+import os
+
+import numpy as np
+
+DIR_NAME = "detections"
+VERSION = 1
+
+# One row per analyzed panorama frame
+FRAME_COLUMNS: dict[str, tuple[str, tuple[int, ...]]] = {
+    "timestamp": ("<f8", ()),
+    # Rows of the frame's detections in the box columns
+    "box_start": ("<u8", ()),
+    "box_count": ("<u2", ()),
+    "bucket_counts": ("<u2", (3,)),
+    # Most populated bucket of the frame, and the bucket leading the PTZ policy's votes
+    "bucket": ("i1", ()),
+    "mode": ("i1", ()),
+    # Preset sent to the PTZ cameras after the frame, -1 if it did not change
+    "preset": ("i1", ()),
+}
+# One row per detection scoring at least the log's minimum score
+BOX_COLUMNS: dict[str, tuple[str, tuple[int, ...]]] = {
+    "boxes": ("<f4", (4,)),
+    "labels": ("<i2", ()),
+    "scores": ("<f4", ()),
+}
+
+
+def _row_size(dtype: str, shape: tuple[int, ...]) -> int:
+    return np.dtype(dtype).itemsize * int(np.prod(shape, dtype=np.int64))
+
+
+class DetectionLogWriter:
+    """
+    Appends the detections and PTZ decisions of the panorama worker to one file per column.
+
+    Rows are copied into preallocated chunks and a chunk is written with a single write per column once full, so a
+    frame costs a few array copies. The box columns are written before the frame columns, a frame never refers to
+    boxes that are not on disk. A restarted worker appends to the same files after dropping the rows a kill cut off.
+    """
+
+    def __init__(self, recording_dir: str, min_score: float = 0.3, chunk_frames: int = 256, chunk_boxes: int = 16384):
+        self.path = f"{recording_dir}/{DIR_NAME}"
+        self.min_score = min_score
+        os.makedirs(self.path, exist_ok=True)
+
+        with open(f"{self.path}/columns.json", "w") as file:
+            json.dump(
+                {
+                    "version": VERSION,
+                    "frames": {name: [dtype, list(shape)] for name, (dtype, shape) in FRAME_COLUMNS.items()},
+                    "boxes": {name: [dtype, list(shape)] for name, (dtype, shape) in BOX_COLUMNS.items()},
+                },
+                file,
+            )
+
+        frame_count = self.__truncate(FRAME_COLUMNS)
+        self.__box_offset = self.__truncate(BOX_COLUMNS)
+        self.frames_written = frame_count
+
+        self.__frames = {
+            name: np.empty((chunk_frames, *shape), dtype) for name, (dtype, shape) in FRAME_COLUMNS.items()
+        }
+        self.__boxes = {name: np.empty((chunk_boxes, *shape), dtype) for name, (dtype, shape) in BOX_COLUMNS.items()}
+        self.__frame_files = {name: open(f"{self.path}/{name}.bin", "ab") for name in FRAME_COLUMNS}
+        self.__box_files = {name: open(f"{self.path}/{name}.bin", "ab") for name in BOX_COLUMNS}
+        self.__frame_rows = 0
+        self.__box_rows = 0
+
+    def __truncate(self, columns: dict[str, tuple[str, tuple[int, ...]]]) -> int:
+        """
+        Cut the columns to the rows all of them hold completely and return that number of rows.
+        """
+        paths = {name: f"{self.path}/{name}.bin" for name in columns}
+        rows = min(
+            os.path.getsize(path) // _row_size(*columns[name]) if os.path.exists(path) else 0
+            for name, path in paths.items()
+        )
+        for name, path in paths.items():
+            if os.path.exists(path):
+                os.truncate(path, rows * _row_size(*columns[name]))
+
+        return rows
+
+    def append(
+        self,
+        timestamp: float,
+        boxes: np.ndarray,
+        labels: np.ndarray,
+        scores: np.ndarray,
+        bucket_counts: np.ndarray,
+        bucket: int,
+        mode: int,
+        preset: int,
+    ):
+        """
+        Log one analyzed frame with the detections the model returned for it.
+        """
+        keep = scores >= self.min_score
+        boxes, labels, scores = boxes[keep], labels[keep], scores[keep]
+        count = len(scores)
+
+        chunk_boxes = len(self.__boxes["scores"])
+        if self.__box_rows + count > chunk_boxes:
+            self.__flush_boxes()
+            # A frame never has more detections than the model's outputs, which a chunk is far larger than
+            count = min(count, chunk_boxes)
+
+        row = self.__box_rows
+        self.__boxes["boxes"][row : row + count] = boxes[:count]
+        self.__boxes["labels"][row : row + count] = labels[:count]
+        self.__boxes["scores"][row : row + count] = scores[:count]
+        self.__box_rows += count
+
+        row = self.__frame_rows
+        self.__frames["timestamp"][row] = timestamp
+        self.__frames["box_start"][row] = self.__box_offset
+        self.__frames["box_count"][row] = count
+        self.__frames["bucket_counts"][row] = bucket_counts
+        self.__frames["bucket"][row] = bucket
+        self.__frames["mode"][row] = mode
+        self.__frames["preset"][row] = preset
+        self.__box_offset += count
+        self.__frame_rows += 1
+
+        if self.__frame_rows == len(self.__frames["timestamp"]):
+            self.flush()
+
+    def flush(self):
+        self.__flush_boxes()
+        for name, file in self.__frame_files.items():
+            file.write(self.__frames[name][: self.__frame_rows].tobytes())
+            file.flush()
+        self.frames_written += self.__frame_rows
+        self.__frame_rows = 0
+
+    def close(self):
+        self.flush()
+        for file in (*self.__frame_files.values(), *self.__box_files.values()):
+            file.close()
+
+    def __flush_boxes(self):
+        for name, file in self.__box_files.items():
+            file.write(self.__boxes[name][: self.__box_rows].tobytes())
+            file.flush()
+        self.__box_rows = 0
+
+
+class DetectionLog:
+    """
+    Memory-mapped view of the detection log of a recording, for analysis of a whole game without loading it.
+
+    Every column is a read-only numpy array: frame columns have a row per analyzed frame, box columns a row per
+    logged detection. The boxes of frame i are the box rows box_start[i] to box_start[i] + box_count[i].
+    """
+
+    def __init__(self, recording_dir: str):
+        self.path = f"{recording_dir}/{DIR_NAME}"
+        with open(f"{self.path}/columns.json") as file:
+            layout = json.load(file)
+        if layout["version"] != VERSION:
+            raise ValueError(f"Unsupported detection log version: {layout['version']}")
+
+        self.columns: dict[str, np.ndarray] = {}
+        for group in ("frames", "boxes"):
+            columns = {name: self.__map(name, dtype, tuple(shape)) for name, (dtype, shape) in layout[group].items()}
+            # A log being written can be a chunk ahead in one column, only the complete rows are exposed
+            rows = min(len(column) for column in columns.values())
+            self.columns.update({name: column[:rows] for name, column in columns.items()})
+
+    def __map(self, name: str, dtype: str, shape: tuple[int, ...]) -> np.ndarray:
+        path = f"{self.path}/{name}.bin"
+        rows = os.path.getsize(path) // _row_size(dtype, shape)
+        if rows == 0:
+            return np.empty((0, *shape), dtype)
+
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows, *shape))
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def frame_boxes(self, index: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Boxes, labels and scores logged for one frame.
+        """
+        start = int(self.columns["box_start"][index])
+        end = start + int(self.columns["box_count"][index])
+        return self.columns["boxes"][start:end], self.columns["labels"][start:end], self.columns["scores"][start:end]
+
+    def between(self, start: float, end: float) -> slice:
+        """
+        Frame rows logged between two Unix times.
+        """
+        timestamps = self.columns["timestamp"]
+        return slice(int(np.searchsorted(timestamps, start)), int(np.searchsorted(timestamps, end, side="right")))
+
+    def preset_changes(self) -> np.ndarray:
+        """
+        Frame rows after which a preset was sent to the PTZ cameras.
+        """
+        return np.flatnonzero(self.columns["preset"] >= 0)
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timezone
+from itertools import count
+from threading import Lock
+from typing import Any
+
+from typing_extensions import Self
+
+
+class Subscription:
+    MAX_PENDING: int = 256
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, types: set[str] | None = None):
+        self.loop = loop
+        self.types = types
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=self.MAX_PENDING)
+        self.dropped = 0
+
+    def wants(self, type: str) -> bool:
+        return self.types is None or type in self.types
+
+    def put(self, event: dict[str, Any]):
+        # Runs on the event loop. A slow client loses its oldest events instead of blocking the publishers.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventBus:
+    """
+    Fans out events published from any thread to the subscribed streaming clients.
+
+    Publishing is a no-op without subscribers and never blocks: events are handed to the event loop of each
+    subscriber with call_soon_threadsafe.
+    """
+
+    __instance: Self | None = None
+    __key = object()
+
+    @classmethod
+    def get_instance(cls) -> Self:
+        if cls.__instance is None:
+            cls.__instance = cls(cls.__key)
+        return cls.__instance
+
+    def __init__(self, key):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        self.__subscriptions: list[Subscription] = []
+        self.__lock = Lock()
+        self.__sequence = count()
+
+    def subscribe(self, types: set[str] | None = None) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), types)
+        with self.__lock:
+            self.__subscriptions = self.__subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.__lock:
+            self.__subscriptions = [s for s in self.__subscriptions if s is not subscription]
+
+    def publish(self, type: str, data: dict[str, Any]):
+        subscriptions = self.__subscriptions
+        if not subscriptions:
+            return
+
+        event = {
+            "id": next(self.__sequence),
+            "type": type,
+            "time": datetime.now(timezone.utc).isoformat(),
+            "data": data,
+        }
+        for subscription in subscriptions:
+            if not subscription.wants(type):
+                continue
+
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The event loop of the subscriber is closed
+                self.unsubscribe(subscription)
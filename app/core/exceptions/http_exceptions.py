@@ -3,12 +3,19 @@ from http import HTTPStatus
 
 from fastapi import HTTPException, status
 
+from ...schemas.camera import SessionNotFoundDetailSchema
+from ...schemas.job import JobNotFoundDetailSchema
+from ...schemas.processing import ProcessingJobNotFoundDetailSchema
+from ...schemas.profile import WorkerDetailSchema
+from ...schemas.recording import ClipFailedDetailSchema, RecordingNotFoundDetailSchema
 from ...schemas.schedule import (
     DuplicateScheduleDetailSchema,
+    InvalidScheduleCursorDetailSchema,
     OverlappingScheduleDetailSchema,
     ScheduledTaskIsInThePastDetailSchema,
     ScheduleNotFoundDetailSchema,
 )
+from ...schemas.storage import InsufficientStorageDetailSchema
 
 
 class CustomException(HTTPException):
@@ -94,3 +101,111 @@ class OverlappingScheduleException(HTTPException):
             status_code=status.HTTP_409_CONFLICT,
             detail=detail.model_dump(),
         )
+
+
+class InvalidScheduleCursorException(HTTPException):
+    def __init__(self, cursor: str):
+        detail = InvalidScheduleCursorDetailSchema(error="Invalid pagination cursor", cursor=cursor)
+
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail.model_dump(),
+        )
+
+
+class JobNotFoundException(HTTPException):
+    def __init__(self, id: str):
+        detail = JobNotFoundDetailSchema(
+            error="Job with the given id not found",
+            id=id,
+        )
+
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail.model_dump(),
+        )
+
+
+class WorkerNotFoundException(HTTPException):
+    def __init__(self, message: str, worker: str):
+        detail = WorkerDetailSchema(error=message, worker=worker)
+
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail.model_dump(),
+        )
+
+
+class WorkerNotRespondingException(HTTPException):
+    def __init__(self, message: str, worker: str):
+        detail = WorkerDetailSchema(error=message, worker=worker)
+
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=detail.model_dump(),
+        )
+
+
+class WorkerCommandFailedException(HTTPException):
+    def __init__(self, message: str, worker: str):
+        detail = WorkerDetailSchema(error=message, worker=worker)
+
+        super().__init__(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=detail.model_dump(),
+        )
+
+
+class SessionNotFoundException(HTTPException):
+    def __init__(self, message: str, session: str):
+        detail = SessionNotFoundDetailSchema(error=message, session=session)
+
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail.model_dump(),
+        )
+
+
+class RecordingNotFoundException(HTTPException):
+    def __init__(self, message: str, id: int, name: str | None = None):
+        detail = RecordingNotFoundDetailSchema(error=message, id=id, name=name)
+
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail.model_dump(),
+        )
+
+
+class ClipFailedException(HTTPException):
+    def __init__(self, message: str, id: int):
+        detail = ClipFailedDetailSchema(error=message, id=id)
+
+        super().__init__(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=detail.model_dump(),
+        )
+
+
+class InsufficientStorageException(HTTPException):
+    def __init__(self, message: str, required_bytes: int, available_bytes: int):
+        detail = InsufficientStorageDetailSchema(
+            error=message, required_bytes=required_bytes, available_bytes=available_bytes
+        )
+
+        super().__init__(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail=detail.model_dump(),
+        )
+
+
+class ProcessingJobNotFoundException(HTTPException):
+    def __init__(self, id: str):
+        detail = ProcessingJobNotFoundDetailSchema(
+            error="Processing job with the given id not found",
+            id=id,
+        )
+
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail.model_dump(),
+        )
@@ -0,0 +1,170 @@
+from datetime import datetime
+from random import random
+from typing import Iterator
+
+
+class _Node:
+    __slots__ = ("key", "end", "max_end", "priority", "left", "right")
+
+    def __init__(self, key: tuple[datetime, int], end: datetime):
+        self.key = key
+        self.end = end
+        # Latest end of the subtree, which lets a query skip subtrees ending before it
+        self.max_end = end
+        self.priority = random()
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+
+    def update(self):
+        max_end = self.end
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+
+def _split(node: _Node | None, key: tuple[datetime, int]) -> tuple[_Node | None, _Node | None]:
+    """
+    Split a subtree into the nodes ordered before the key and the others.
+    """
+    if node is None:
+        return None, None
+
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        node.update()
+        return node, right
+
+    left, node.left = _split(node.left, key)
+    node.update()
+    return left, node
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    """
+    Merge two subtrees, every key of the left one being ordered before the keys of the right one.
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _remove(node: _Node | None, key: tuple[datetime, int]) -> _Node | None:
+    if node is None:
+        raise KeyError(f"Interval with id {key[1]} does not exist")
+
+    if key == node.key:
+        return _merge(node.left, node.right)
+
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    node.update()
+    return node
+
+
+class IntervalIndex:
+    """
+    Closed time intervals kept sorted by (start, id).
+
+    The intervals are stored in a treap ordered by (start, id) where every node also holds the latest end of its
+    subtree. Queries skip the subtrees ending before them and stop at the first interval starting after them, so
+    finding the k intervals intersecting a range takes O((k + 1) log n) expected time however long some intervals
+    are, and insertions and removals O(log n).
+    """
+
+    def __init__(self):
+        self.__root: _Node | None = None
+        self.__ends: dict[int, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self.__ends)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self.__ends
+
+    def add(self, id: int, start: datetime, end: datetime):
+        if id in self.__ends:
+            raise KeyError(f"Interval with id {id} already exists")
+
+        key = (start, id)
+        left, right = _split(self.__root, key)
+        self.__root = _merge(_merge(left, _Node(key, end)), right)
+        self.__ends[id] = end
+
+    def remove(self, id: int, start: datetime):
+        self.__root = _remove(self.__root, (start, id))
+        del self.__ends[id]
+
+    def upper_bound(self) -> datetime | None:
+        """
+        The latest end of the stored intervals, None if the index is empty.
+        """
+        return None if self.__root is None else self.__root.max_end
+
+    def overlapping(self, start: datetime, end: datetime) -> Iterator[int]:
+        """
+        Yield the ids of the intervals intersecting [start, end] in (start, id) order.
+        """
+        return self.range(start, end)
+
+    def first_overlap(self, start: datetime, end: datetime) -> int | None:
+        return next(self.overlapping(start, end), None)
+
+    def range(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: tuple[datetime, int] | None = None,
+    ) -> Iterator[int]:
+        """
+        Yield the ids of the intervals intersecting [start, end] in (start, id) order, resuming after the given
+        (start, id) key when one is given. Open bounds are not limited.
+        """
+        return (node.key[1] for node in self.__walk(start, end, after))
+
+    def intervals(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[tuple[int, datetime, datetime]]:
+        """
+        Yield (id, start, end) of the intervals intersecting [start, end] in (start, id) order.
+        """
+        return ((node.key[1], node.key[0], node.end) for node in self.__walk(start, end, None))
+
+    def __walk(
+        self, start: datetime | None, end: datetime | None, after: tuple[datetime, int] | None
+    ) -> Iterator[_Node]:
+        stack: list[_Node] = []
+        node = self.__root
+        while True:
+            while node is not None:
+                if start is not None and node.max_end < start:
+                    node = None
+                elif after is not None and node.key <= after:
+                    # The node and its left subtree belong to the previous pages
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+
+            if not stack:
+                return
+
+            node = stack.pop()
+            if end is not None and node.key[0] > end:
+                return
+            if start is None or node.end >= start:
+                yield node
+            node = node.right
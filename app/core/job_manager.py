@@ -0,0 +1,180 @@
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from enum import Enum
+from threading import Condition
+from typing import Callable
+from uuid import uuid4
+
+from typing_extensions import Self
+
+from .event_bus import EventBus
+
+
+class JobNotFound(Exception):
+    def __init__(self, message: str, id: str):
+        self.message = message
+        self.id = id
+        super().__init__(self.message)
+
+
+class JobKind(str, Enum):
+    START = "start"
+    STOP = "stop"
+    RESTART = "restart"
+
+
+class JobState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobStage(str, Enum):
+    QUEUED = "queued"
+    DISCOVERING = "discovering"
+    PTZ_INIT = "ptz_init"
+    WORKERS_STARTING = "workers_starting"
+    RECORDING = "recording"
+    STOPPING = "stopping"
+    STOPPED = "stopped"
+
+
+class Job:
+    def __init__(self, kind: JobKind, session: str):
+        self.id = uuid4().hex
+        self.kind = kind
+        self.session = session
+        self.state = JobState.PENDING
+        self.stage = JobStage.QUEUED
+        self.error: str | None = None
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = self.created_at
+        self.version = 0
+
+    def __str__(self):
+        return (
+            f'Job(id={self.id}, kind={self.kind.value}, session={self.session}, state={self.state.value}, '
+            f'stage={self.stage.value})'
+        )
+
+    def __repr__(self):
+        return str(self)
+
+    def is_active(self) -> bool:
+        return self.state in (JobState.PENDING, JobState.RUNNING)
+
+
+class JobManager:
+    """
+    Runs camera start/stop jobs in the background, one at a time per recording session.
+
+    A request for a job kind that is already pending or running in the same session returns the existing job
+    instead of queueing a duplicate. Every update bumps the version of the job and wakes up the clients waiting for it.
+    """
+
+    __instance: Self | None = None
+    __key = object()
+
+    MAX_FINISHED_JOBS: int = 100
+
+    @classmethod
+    def get_instance(cls, logger: logging.Logger) -> Self:
+        if cls.__instance is None:
+            cls.__instance = cls(cls.__key, logger)
+        return cls.__instance
+
+    def __init__(self, key, logger: logging.Logger):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        self.__logger = logger
+
+        self.__jobs: OrderedDict[str, Job] = OrderedDict()
+        self.__condition = Condition()
+        self.__executors: dict[str, ThreadPoolExecutor] = {}
+
+    def submit(self, kind: JobKind, work: Callable[[Callable[[JobStage], None]], None], session: str) -> Job:
+        """
+        Queue a job, or return the active job of the same kind and session.
+
+        Args:
+            kind (JobKind): Kind of the job, used to coalesce duplicate requests.
+            work (Callable): Does the work, receives a callback to report the stage it reached.
+            session (str): Recording session the job acts on, jobs of different sessions run concurrently.
+
+        Returns:
+            Job: The queued or the already active job.
+        """
+        with self.__condition:
+            for job in self.__jobs.values():
+                if job.kind == kind and job.session == session and job.is_active():
+                    return job
+
+            job = Job(kind, session)
+            self.__jobs[job.id] = job
+            self.__prune()
+
+            if session not in self.__executors:
+                self.__executors[session] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"job-{session}")
+            executor = self.__executors[session]
+
+        executor.submit(self.__run, job, work)
+        return job
+
+    def get(self, id: str) -> Job:
+        with self.__condition:
+            if id not in self.__jobs:
+                raise JobNotFound(f'Job with id {id} does not exist', id=id)
+
+            return self.__jobs[id]
+
+    def wait(self, id: str, version: int, timeout: float) -> Job:
+        """
+        Block until the job is updated past the given version, the job finished, or the timeout expired.
+        """
+        with self.__condition:
+            job = self.get(id)
+            self.__condition.wait_for(lambda: job.version > version or not job.is_active(), timeout)
+            return job
+
+    def __run(self, job: Job, work: Callable[[Callable[[JobStage], None]], None]):
+        self.__update(job, state=JobState.RUNNING)
+        try:
+            work(lambda stage: self.__update(job, stage=stage))
+        except Exception as e:
+            self.__logger.error(f"{job} failed: {e}")
+            self.__update(job, state=JobState.FAILED, error=getattr(e, "message", str(e)))
+        else:
+            self.__update(job, state=JobState.SUCCEEDED)
+
+    def __update(
+        self, job: Job, state: JobState | None = None, stage: JobStage | None = None, error: str | None = None
+    ):
+        with self.__condition:
+            job.state = state or job.state
+            job.stage = stage or job.stage
+            job.error = error or job.error
+            job.updated_at = datetime.now(timezone.utc)
+            job.version += 1
+            self.__condition.notify_all()
+
+        EventBus.get_instance().publish(
+            "job",
+            {
+                "id": job.id,
+                "kind": job.kind.value,
+                "session": job.session,
+                "state": job.state.value,
+                "stage": job.stage.value,
+                "error": job.error,
+                "version": job.version,
+            },
+        )
+
+    def __prune(self):
+        finished = [id for id, job in self.__jobs.items() if not job.is_active()]
+        for id in finished[: max(len(finished) - self.MAX_FINISHED_JOBS, 0)]:
+            del self.__jobs[id]
@@ -0,0 +1,239 @@
+from bisect import bisect_left
+from threading import Lock
+
+from multiprocess.shared_memory import SharedMemory
+
+COUNTERS: dict[str, str] = {
+    "frames_captured": "Frames received from the source",
+    "frames_written": "Frames written to the encoder",
+    "frames_dropped": "Frames dropped before reaching the worker, as reported by NDI",
+    "capture_timeouts": "Captures that returned no video frame",
+    "preset_changes": "PTZ preset changes sent to the cameras",
+    "worker_restarts": "Restarts of the worker by the supervisor",
+}
+GAUGES: dict[str, str] = {
+    "last_frame_timestamp_seconds": "Unix time of the last frame handled by the worker",
+}
+HISTOGRAMS: dict[str, str] = {
+    "pipe_write_seconds": "Time spent writing a frame into the encoder pipe",
+    "preprocess_seconds": "Time spent bringing a decoded panorama frame to the detector's input",
+    "inference_seconds": "Time spent running the detector on a panorama frame",
+    "ptz_command_seconds": "Time spent sending a preset call to all PTZ cameras",
+    "ptz_reaction_seconds": "Time from the oldest vote in the PTZ policy's window for a bucket to the switch to it",
+}
+BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+PREFIX = "oxcam_"
+
+# Slot layout: counters, gauges, then per histogram one count per bucket (the last one is +Inf), sum and count
+_COUNTER_OFFSETS = {name: idx for idx, name in enumerate(COUNTERS)}
+_GAUGE_OFFSETS = {name: len(COUNTERS) + idx for idx, name in enumerate(GAUGES)}
+_HISTOGRAM_SIZE = len(BUCKETS) + 3
+_HISTOGRAM_OFFSETS = {name: len(COUNTERS) + len(GAUGES) + idx * _HISTOGRAM_SIZE for idx, name in enumerate(HISTOGRAMS)}
+SLOT_SIZE = len(COUNTERS) + len(GAUGES) + len(HISTOGRAMS) * _HISTOGRAM_SIZE
+
+_registries: list["MetricsRegistry"] = []
+_registries_lock = Lock()
+
+
+class MetricsWriter:
+    """
+    Writes the metrics of one worker into its own slot of a MetricsRegistry.
+
+    Every slot has a single writer, so updates are plain stores into shared memory without any locking.
+    """
+
+    def __init__(self, shm_name: str, slot: int):
+        # Workers share the resource tracker of the parent, which stays the only one unlinking the segment
+        self.__shm = SharedMemory(name=shm_name)
+
+        self.__values = self.__shm.buf.cast("d")
+        self.__base = slot * SLOT_SIZE
+
+    def inc(self, name: str, value: float = 1.0):
+        self.__values[self.__base + _COUNTER_OFFSETS[name]] += value
+
+    def set_counter(self, name: str, value: float):
+        self.__values[self.__base + _COUNTER_OFFSETS[name]] = value
+
+    def set_gauge(self, name: str, value: float):
+        self.__values[self.__base + _GAUGE_OFFSETS[name]] = value
+
+    def get_gauge(self, name: str) -> float:
+        return self.__values[self.__base + _GAUGE_OFFSETS[name]]
+
+    def observe(self, name: str, value: float):
+        offset = self.__base + _HISTOGRAM_OFFSETS[name]
+        self.__values[offset + bisect_left(BUCKETS, value)] += 1
+        self.__values[offset + len(BUCKETS) + 1] += value
+        self.__values[offset + len(BUCKETS) + 2] += 1
+
+    def close(self):
+        self.__values.release()
+        self.__shm.close()
+
+
+class NullMetricsWriter:
+    """
+    Stands in for a MetricsWriter when a worker runs without a metrics registry.
+    """
+
+    def inc(self, name: str, value: float = 1.0):
+        pass
+
+    def set_counter(self, name: str, value: float):
+        pass
+
+    def set_gauge(self, name: str, value: float):
+        pass
+
+    def get_gauge(self, name: str) -> float:
+        return 0.0
+
+    def observe(self, name: str, value: float):
+        pass
+
+    def close(self):
+        pass
+
+
+def attach_metrics_writer(handle: tuple[str, int] | None) -> MetricsWriter | NullMetricsWriter:
+    return NullMetricsWriter() if handle is None else MetricsWriter(*handle)
+
+
+class MetricsRegistry:
+    """
+    Shared memory segment holding one metrics slot per recording worker, created by the parent process.
+
+    Workers attach a MetricsWriter to their slot with the (shm_name, slot) handle; the parent reads every slot
+    when rendering the Prometheus exposition.
+    """
+
+    def __init__(self, labels: list[dict[str, str]]):
+        self.labels = labels
+        self.__shm = SharedMemory(create=True, size=max(len(labels), 1) * SLOT_SIZE * 8)
+        self.__values = self.__shm.buf.cast("d")
+        for idx in range(len(self.__values)):
+            self.__values[idx] = 0.0
+
+        with _registries_lock:
+            _registries.append(self)
+
+    def handle(self, slot: int) -> tuple[str, int]:
+        return self.__shm.name, slot
+
+    def read(self, slot: int) -> list[float]:
+        base = slot * SLOT_SIZE
+        return self.__values[base : base + SLOT_SIZE].tolist()
+
+    def read_gauge(self, slot: int, name: str) -> float:
+        return self.__values[slot * SLOT_SIZE + _GAUGE_OFFSETS[name]]
+
+    def read_counter(self, slot: int, name: str) -> float:
+        return self.__values[slot * SLOT_SIZE + _COUNTER_OFFSETS[name]]
+
+    def inc(self, slot: int, name: str, value: float = 1.0):
+        """
+        Increment a counter the parent keeps about a worker, workers never write those.
+        """
+        self.__values[slot * SLOT_SIZE + _COUNTER_OFFSETS[name]] += value
+
+    def close(self):
+        with _registries_lock:
+            if self in _registries:
+                _registries.remove(self)
+
+            self.__values.release()
+            self.__shm.close()
+            self.__shm.unlink()
+
+
+def sum_counter(name: str) -> float:
+    """
+    Sum a counter over the workers of every live registry.
+    """
+    offset = _COUNTER_OFFSETS[name]
+    with _registries_lock:
+        return sum(registry.read(slot)[offset] for registry in _registries for slot in range(len(registry.labels)))
+
+
+def _format_labels(labels: dict[str, str], extra: dict[str, str] | None = None) -> str:
+    merged = {**labels, **(extra or {})}
+    return "{" + ",".join(f'{key}="{value}"' for key, value in merged.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def merge_metrics(expositions: list[tuple[str, dict[str, str]]]) -> str:
+    """
+    Merge expositions of this module's format into one, adding the given labels to the samples of each.
+
+    Samples are regrouped under their metric family, which the text format requires to be contiguous.
+    """
+    families: dict[str, tuple[list[str], list[str]]] = {}
+    for text, labels in expositions:
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# "):
+                family = line.split(" ", 3)[2]
+                comments, _ = families.setdefault(family, ([], []))
+                if line not in comments:
+                    comments.append(line)
+            elif line and family is not None:
+                extra = ",".join(f'{key}="{value}"' for key, value in labels.items())
+                if extra and "{" in line:
+                    name, _, rest = line.partition("{")
+                    line = f"{name}{{{extra},{rest}"
+                elif extra:
+                    name, _, value = line.partition(" ")
+                    line = f"{name}{{{extra}}} {value}"
+                families[family][1].append(line)
+
+    lines = [line for comments, samples in families.values() for line in comments + samples]
+    return "\n".join(lines) + "\n"
+
+
+def render_metrics() -> str:
+    """
+    Render the metrics of every live registry in the Prometheus text exposition format.
+    """
+    # Read under the lock, a registry closed meanwhile would have released its shared memory
+    with _registries_lock:
+        slots = [
+            (registry.labels[slot], registry.read(slot))
+            for registry in _registries
+            for slot in range(len(registry.labels))
+        ]
+
+    lines = []
+    for name, description in COUNTERS.items():
+        lines += [f"# HELP {PREFIX}{name}_total {description}", f"# TYPE {PREFIX}{name}_total counter"]
+        offset = _COUNTER_OFFSETS[name]
+        lines += [
+            f"{PREFIX}{name}_total{_format_labels(labels)} {_format_value(values[offset])}" for labels, values in slots
+        ]
+
+    for name, description in GAUGES.items():
+        lines += [f"# HELP {PREFIX}{name} {description}", f"# TYPE {PREFIX}{name} gauge"]
+        offset = _GAUGE_OFFSETS[name]
+        lines += [f"{PREFIX}{name}{_format_labels(labels)} {_format_value(values[offset])}" for labels, values in slots]
+
+    for name, description in HISTOGRAMS.items():
+        lines += [f"# HELP {PREFIX}{name} {description}", f"# TYPE {PREFIX}{name} histogram"]
+        offset = _HISTOGRAM_OFFSETS[name]
+        for labels, values in slots:
+            cumulative = 0.0
+            for idx, bound in enumerate(BUCKETS + (float("inf"),)):
+                cumulative += values[offset + idx]
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, {'le': le})} {_format_value(cumulative)}")
+            lines.append(
+                f"{PREFIX}{name}_sum{_format_labels(labels)} {_format_value(values[offset + len(BUCKETS) + 1])}"
+            )
+            lines.append(
+                f"{PREFIX}{name}_count{_format_labels(labels)} {_format_value(values[offset + len(BUCKETS) + 2])}"
+            )
+
+    return "\n".join(lines) + "\n"
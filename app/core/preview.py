@@ -0,0 +1,203 @@
+import time
+from threading import Lock
+from typing import NamedTuple
+
+import numpy as np
+from multiprocess.shared_memory import SharedMemory
+
+from .config import PreviewConfig
+
+# Slot header, as doubles: sequence (odd while the worker writes), frame time, height, width, requested until
+_SEQUENCE, _TIMESTAMP, _HEIGHT, _WIDTH, _REQUESTED_UNTIL = range(5)
+HEADER_SIZE = 64
+
+
+def _slot_size(max_width: int, max_height: int) -> int:
+    return HEADER_SIZE + max_width * max_height * 3
+
+
+class PreviewSnapshot(NamedTuple):
+    jpeg: bytes
+    # Unix time the worker took the frame at
+    timestamp: float
+    sequence: int
+
+
+class PreviewWriter:
+    """
+    Publishes downscaled frames of one worker into its slot of a PreviewRegistry.
+
+    Frames are only published while a viewer asked for the preview recently, and at most `fps` times per second,
+    so a worker nobody watches pays one clock read per frame.
+    """
+
+    def __init__(self, shm_name: str, slot: int, max_width: int, max_height: int, fps: float):
+        self.__shm = SharedMemory(name=shm_name)
+        self.max_width = max_width
+        self.max_height = max_height
+        self.__interval = 1 / fps
+        self.__published_at = 0.0
+
+        base = slot * _slot_size(max_width, max_height)
+        self.__values = self.__shm.buf[base : base + HEADER_SIZE].cast("d")
+        self.__frame = np.ndarray(
+            (max_height, max_width, 3), np.uint8, buffer=self.__shm.buf, offset=base + HEADER_SIZE
+        )
+
+    def wanted(self) -> bool:
+        """
+        Whether the next frame should be published.
+        """
+        now = time.monotonic()
+        return time.time() < self.__values[_REQUESTED_UNTIL] and now - self.__published_at >= self.__interval
+
+    def publish(self, frame: np.ndarray, timestamp: float | None = None):
+        """
+        Downscale the frame by an integer step to fit the slot and copy it in.
+        """
+        height, width = frame.shape[:2]
+        step = max(-(-width // self.max_width), -(-height // self.max_height), 1)
+        preview = frame[::step, ::step, :3]
+        height, width = preview.shape[:2]
+
+        self.__values[_SEQUENCE] += 1
+        self.__frame[:height, :width] = preview
+        self.__values[_TIMESTAMP] = time.time() if timestamp is None else timestamp
+        self.__values[_HEIGHT] = height
+        self.__values[_WIDTH] = width
+        self.__values[_SEQUENCE] += 1
+        self.__published_at = time.monotonic()
+
+    def close(self):
+        del self.__frame
+        self.__values.release()
+        self.__shm.close()
+
+
+class NullPreviewWriter:
+    """
+    Stands in for a PreviewWriter when a worker runs without a preview registry.
+    """
+
+    def wanted(self) -> bool:
+        return False
+
+    def publish(self, frame: np.ndarray, timestamp: float | None = None):
+        pass
+
+    def close(self):
+        pass
+
+
+def attach_preview_writer(handle: tuple[str, int, int, int, float] | None) -> PreviewWriter | NullPreviewWriter:
+    return NullPreviewWriter() if handle is None else PreviewWriter(*handle)
+
+
+class PreviewRegistry:
+    """
+    Shared memory segment holding the latest preview frame of every recording worker, created by the parent.
+
+    Workers attach a PreviewWriter to their slot and publish while the parent marks the slot as requested. The
+    parent encodes a frame to JPEG once, when the first viewer asks after the worker published it, and serves
+    that JPEG to every other viewer, so the number of viewers changes neither the workers' nor the encoding work.
+    """
+
+    # Attempts at copying a frame the worker is not overwriting at the same time
+    READ_ATTEMPTS: int = 5
+
+    def __init__(self, names: list[str], config: PreviewConfig):
+        self.names = names
+        self.config = config
+        self.__slot_size = _slot_size(config.max_width, config.max_height)
+        self.__shm = SharedMemory(create=True, size=max(len(names), 1) * self.__slot_size)
+        self.__values = [
+            self.__shm.buf[slot * self.__slot_size : slot * self.__slot_size + HEADER_SIZE].cast("d")
+            for slot in range(len(names))
+        ]
+        for values in self.__values:
+            for idx in range(len(values)):
+                values[idx] = 0.0
+
+        self.__lock = Lock()
+        self.__closed = False
+        self.__encode_locks = [Lock() for _ in names]
+        self.__cache: list[PreviewSnapshot | None] = [None] * len(names)
+
+    def handle(self, slot: int) -> tuple[str, int, int, int, float]:
+        return self.__shm.name, slot, self.config.max_width, self.config.max_height, self.config.fps
+
+    def snapshot(self, slot: int, timeout: float) -> PreviewSnapshot | None:
+        """
+        The latest preview of a worker, keeping the worker publishing for `linger` more seconds.
+
+        Returns:
+            PreviewSnapshot | None: None if the worker published no frame within the timeout, or the registry
+            was closed meanwhile.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.__lock:
+                if self.__closed:
+                    return None
+                values = self.__values[slot]
+                values[_REQUESTED_UNTIL] = time.time() + self.config.linger
+                sequence = int(values[_SEQUENCE])
+
+            if sequence > 0:
+                break
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(min(0.05, 1 / self.config.fps))
+
+        with self.__encode_locks[slot]:
+            cached = self.__cache[slot]
+            if cached is not None and cached.sequence >= sequence:
+                return cached
+
+            frame = self.__read(slot)
+            if frame is None:
+                return cached
+            image, timestamp, sequence = frame
+
+            # Imported here, so the API does not load cv2 until the first preview
+            import cv2
+
+            ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.config.jpeg_quality])
+            if not ok:
+                return cached
+
+            self.__cache[slot] = PreviewSnapshot(jpeg.tobytes(), timestamp, sequence)
+            return self.__cache[slot]
+
+    def __read(self, slot: int) -> tuple[np.ndarray, float, int] | None:
+        """
+        Copy the frame out of the slot, retrying while the worker overwrites it.
+        """
+        with self.__lock:
+            if self.__closed:
+                return None
+
+            values = self.__values[slot]
+            for _ in range(self.READ_ATTEMPTS):
+                sequence = int(values[_SEQUENCE])
+                if sequence % 2 == 0:
+                    height, width, timestamp = int(values[_HEIGHT]), int(values[_WIDTH]), values[_TIMESTAMP]
+                    frame = np.ndarray(
+                        (self.config.max_height, self.config.max_width, 3),
+                        np.uint8,
+                        buffer=self.__shm.buf,
+                        offset=slot * self.__slot_size + HEADER_SIZE,
+                    )[:height, :width].copy()
+                    if int(values[_SEQUENCE]) == sequence:
+                        return frame, timestamp, sequence
+                time.sleep(0.001)
+
+        return None
+
+    def close(self):
+        with self.__lock:
+            self.__closed = True
+            for values in self.__values:
+                values.release()
+            self.__shm.close()
+            self.__shm.unlink()
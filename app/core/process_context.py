@@ -0,0 +1,33 @@
+import multiprocess
+from multiprocess import forkserver
+from multiprocess.context import BaseContext
+
+# Modules the fork server imports once, so recording workers start with cv2, onnxruntime and NDIlib loaded
+PRELOAD_MODULES: list[str] = ["main"]
+
+_context: BaseContext | None = None
+
+
+def get_worker_context() -> BaseContext:
+    """
+    Context the recording workers and everything shared with them (events, queues) are created from.
+
+    Workers are forked from a fork server instead of the API process, so they neither inherit the API's threads
+    and sockets nor pay for importing the heavy modules on every start.
+    """
+    global _context
+
+    if _context is None:
+        context = multiprocess.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        _context = context
+
+    return _context
+
+
+def start_worker_server():
+    """
+    Start the fork server ahead of the first recording, importing the preloaded modules in the background.
+    """
+    get_worker_context()
+    forkserver.ensure_running()
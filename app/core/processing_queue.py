@@ -0,0 +1,327 @@
+import logging
+import os
+import shutil
+import signal
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from enum import Enum
+from threading import Condition, Event, Thread
+from time import monotonic
+from uuid import uuid4
+
+from typing_extensions import Self
+
+from .config import ProcessingStep, get_recording_config
+from .event_bus import EventBus
+from .metrics import sum_counter
+from .recording_catalog import CAMERA_FILE_PATTERN, RecordingCatalog
+
+
+def low_priority(command: list[str]) -> list[str]:
+    """
+    Prefix a command to run under the configured niceness and, where available, the idle I/O scheduling class.
+    """
+    config = get_recording_config().processing
+    prefix = ["nice", "-n", str(config.nice)]
+    if config.idle_io and shutil.which("ionice") is not None:
+        prefix += ["ionice", "-c", "3"]
+
+    return prefix + command
+
+
+class ProcessingJobNotFound(Exception):
+    def __init__(self, message: str, id: str):
+        self.message = message
+        self.id = id
+        super().__init__(self.message)
+
+
+class ProcessingState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    # Suspended while a live recording drops frames
+    PAUSED = "paused"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ProcessingJob:
+    def __init__(self, session: str, recording_id: int | None, recording_dir: str, step: ProcessingStep):
+        self.id = uuid4().hex
+        self.session = session
+        self.recording_id = recording_id
+        self.recording_dir = recording_dir
+        self.step = step
+        self.state = ProcessingState.PENDING
+        self.error: str | None = None
+        self.commands_done = 0
+        self.commands_total = 0
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = self.created_at
+        self.version = 0
+        self.process: subprocess.Popen | None = None
+
+    def __str__(self):
+        return (
+            f'ProcessingJob(id={self.id}, session={self.session}, recording={os.path.basename(self.recording_dir)}, '
+            f'step={self.step.name}, state={self.state.value})'
+        )
+
+    def __repr__(self):
+        return str(self)
+
+    def is_active(self) -> bool:
+        return self.state in (ProcessingState.PENDING, ProcessingState.RUNNING, ProcessingState.PAUSED)
+
+
+class ProcessingQueue:
+    """
+    Runs the configured processing steps on the recordings scheduled tasks stopped.
+
+    Every step of a recording is a job, queued once the previous step of the recording succeeded. Jobs run their
+    commands as subprocesses on a pool of `concurrency` threads, under nice and, where available, the idle I/O
+    scheduling class, so they only get the CPU and disk time the recordings leave over.
+
+    While any recording of this host drops frames, the running commands are suspended with SIGSTOP and no new one
+    is started, until no frame was dropped for `resume_after` seconds.
+    """
+
+    __instance: Self | None = None
+    __key = object()
+
+    INTERVAL: float = 1.0
+    MAX_FINISHED_JOBS: int = 100
+
+    @classmethod
+    def get_instance(cls, logger: logging.Logger) -> Self:
+        if cls.__instance is None:
+            cls.__instance = cls(cls.__key, logger)
+        return cls.__instance
+
+    def __init__(self, key, logger: logging.Logger):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        self.__logger = logger
+
+        self.__jobs: OrderedDict[str, ProcessingJob] = OrderedDict()
+        self.__condition = Condition()
+        self.__executor: ThreadPoolExecutor | None = None
+        self.__monitor: Thread | None = None
+        self.__stop_event = Event()
+        self.__paused = False
+        self.__resume_at = 0.0
+        self.__drops = 0.0
+
+    @property
+    def is_paused(self) -> bool:
+        return self.__paused
+
+    def submit(self, session: str, recording_dir: str, recording_id: int | None = None) -> ProcessingJob | None:
+        """
+        Queue the processing of a finished recording.
+
+        Returns:
+            ProcessingJob | None: The job of the first step, None if no step is configured.
+        """
+        steps = get_recording_config().processing.steps
+        if not steps:
+            return None
+
+        return self.__submit(session, recording_dir, recording_id, steps)
+
+    def get(self, id: str) -> ProcessingJob:
+        with self.__condition:
+            if id not in self.__jobs:
+                raise ProcessingJobNotFound(f'Processing job with id {id} does not exist', id=id)
+
+            return self.__jobs[id]
+
+    def get_jobs(self, session: str | None = None) -> list[ProcessingJob]:
+        """
+        The jobs kept, oldest first.
+        """
+        with self.__condition:
+            return [job for job in self.__jobs.values() if session is None or job.session == session]
+
+    def stop(self):
+        """
+        Stop the monitor and terminate the running commands, the pending jobs are dropped.
+        """
+        self.__stop_event.set()
+        with self.__condition:
+            self.__paused = False
+            self.__condition.notify_all()
+            running = [job.process for job in self.__jobs.values() if job.process is not None]
+
+        for process in running:
+            self.__signal(process, signal.SIGCONT)
+            self.__signal(process, signal.SIGTERM)
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+        if self.__monitor is not None:
+            self.__monitor.join()
+
+    def __submit(
+        self, session: str, recording_dir: str, recording_id: int | None, steps: list[ProcessingStep]
+    ) -> ProcessingJob:
+        job = ProcessingJob(session, recording_id, recording_dir, steps[0])
+        with self.__condition:
+            self.__jobs[job.id] = job
+            self.__prune()
+
+            if self.__executor is None:
+                concurrency = get_recording_config().processing.concurrency
+                self.__executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="processing")
+                self.__monitor = Thread(target=self.__watch_drops, daemon=True)
+                self.__monitor.start()
+
+        self.__publish(job)
+        self.__executor.submit(self.__run, job, steps[1:])
+        return job
+
+    def __run(self, job: ProcessingJob, next_steps: list[ProcessingStep]):
+        try:
+            commands = self.__commands(job)
+            self.__update(job, state=ProcessingState.RUNNING, commands_total=len(commands))
+            with open(f"{job.recording_dir}/processing_{job.step.name}.log", "ab") as log:
+                for command in commands:
+                    self.__execute(job, command, log)
+                    self.__update(job, commands_done=job.commands_done + 1)
+        except Exception as e:
+            self.__logger.error(f"{job} failed: {e}")
+            self.__update(job, state=ProcessingState.FAILED, error=str(e))
+            return
+
+        self.__update(job, state=ProcessingState.SUCCEEDED)
+        if job.recording_id is not None:
+            RecordingCatalog.get_instance().refresh(job.recording_id)
+        if next_steps and not self.__stop_event.is_set():
+            self.__submit(job.session, job.recording_dir, job.recording_id, next_steps)
+
+    def __commands(self, job: ProcessingJob) -> list[list[str]]:
+        values = {
+            "dir": job.recording_dir,
+            "session": job.session,
+            "name": os.path.basename(job.recording_dir),
+        }
+        if not job.step.per_camera:
+            return [low_priority([argument.format_map(values) for argument in job.step.command])]
+
+        files = sorted(name for name in os.listdir(job.recording_dir) if CAMERA_FILE_PATTERN.match(name))
+        return [
+            low_priority(
+                [
+                    argument.format_map(
+                        {
+                            **values,
+                            "file": f"{job.recording_dir}/{name}",
+                            "stem": os.path.splitext(name)[0],
+                            "camera": CAMERA_FILE_PATTERN.match(name)[1],
+                        }
+                    )
+                    for argument in job.step.command
+                ]
+            )
+            for name in files
+        ]
+
+    def __execute(self, job: ProcessingJob, command: list[str], log):
+        with self.__condition:
+            self.__condition.wait_for(lambda: not self.__paused)
+            if self.__stop_event.is_set():
+                raise RuntimeError("Processing was stopped")
+
+            # Its own process group, so suspending it reaches the processes it starts
+            job.process = subprocess.Popen(
+                command, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+            )
+
+        returncode = job.process.wait()
+        with self.__condition:
+            job.process = None
+
+        if returncode != 0:
+            raise RuntimeError(f"{job.step.command[0]} exited with {returncode}")
+
+    def __watch_drops(self):
+        while not self.__stop_event.wait(self.INTERVAL):
+            try:
+                self.__check_drops()
+            except Exception as e:
+                # A failed check is retried, so a queue paused before it still resumes
+                self.__logger.error(f"Checking the dropped frames failed: {e}")
+
+    def __check_drops(self):
+        config = get_recording_config().processing
+        drops = sum_counter("frames_dropped")
+        # The counters restart with every recording, only increases are drops
+        dropping = drops > self.__drops
+        self.__drops = drops
+
+        now = monotonic()
+        if dropping and config.pause_on_drops:
+            self.__resume_at = now + config.resume_after
+            if not self.__paused:
+                self.__logger.warning("Live recording drops frames, suspending processing")
+                self.__set_paused(True)
+        elif self.__paused and now >= self.__resume_at:
+            self.__logger.info("No frames dropped for %s s, resuming processing", config.resume_after)
+            self.__set_paused(False)
+
+    def __set_paused(self, paused: bool):
+        with self.__condition:
+            self.__paused = paused
+            self.__condition.notify_all()
+            # The processes are taken under the lock, a command exiting meanwhile clears job.process
+            running = [
+                (job, job.process)
+                for job in self.__jobs.values()
+                if job.process is not None or job.state == ProcessingState.PAUSED
+            ]
+
+        for job, process in running:
+            if process is not None:
+                self.__signal(process, signal.SIGSTOP if paused else signal.SIGCONT)
+            with self.__condition:
+                # A job finishing meanwhile keeps its final state
+                if job.is_active():
+                    self.__update(job, state=ProcessingState.PAUSED if paused else ProcessingState.RUNNING)
+
+    @staticmethod
+    def __signal(process: subprocess.Popen, signum: int):
+        try:
+            os.killpg(process.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def __update(self, job: ProcessingJob, **changes):
+        with self.__condition:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.updated_at = datetime.now(timezone.utc)
+            job.version += 1
+
+        self.__publish(job)
+
+    def __publish(self, job: ProcessingJob):
+        EventBus.get_instance().publish(
+            "processing",
+            {
+                "id": job.id,
+                "session": job.session,
+                "recording": job.recording_id,
+                "step": job.step.name,
+                "state": job.state.value,
+                "error": job.error,
+                "version": job.version,
+            },
+        )
+
+    def __prune(self):
+        finished = [id for id, job in self.__jobs.items() if not job.is_active()]
+        for id in finished[: max(len(finished) - self.MAX_FINISHED_JOBS, 0)]:
+            del self.__jobs[id]
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from types import FrameType
+
+MAX_DURATION: float = 60.0
+TOP_ALLOCATIONS: int = 20
+
+
+def _collapse(frame: FrameType) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+
+    return ";".join(reversed(stack))
+
+
+def profile_main_thread(duration: float, interval: float = 0.005) -> dict:
+    """
+    Sample the stack of the main thread of this process and trace its allocations for the given duration.
+
+    Meant to be run from a control thread of a recording worker, so the profiled loop keeps running untouched
+    apart from the interpreter switching to the sampler every interval.
+
+    Returns:
+        The collapsed stacks with their sample counts, ready for flamegraph tools, and the top allocation
+        sites made during the window that were still alive at its end.
+    """
+    duration = min(duration, MAX_DURATION)
+    thread_id = threading.main_thread().ident
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    stacks = Counter()
+    samples = 0
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                stacks[_collapse(frame)] += 1
+                samples += 1
+            del frame
+            time.sleep(interval)
+
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    allocations = [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+    ]
+
+    return {
+        "samples": samples,
+        "stacks": dict(stacks.most_common()),
+        "allocations": allocations,
+    }
+
+
+def save_profile(directory: str, worker: str, profile: dict) -> tuple[str, str]:
+    """
+    Write a profile into `directory/profiles` as collapsed stacks and an allocation report.
+
+    Returns:
+        The paths of the collapsed stacks and of the allocation report.
+    """
+    profile_dir = f"{directory}/profiles"
+    os.makedirs(profile_dir, exist_ok=True)
+
+    name = f"{worker}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    stacks_path = f"{profile_dir}/{name}.folded"
+    allocations_path = f"{profile_dir}/{name}_allocations.txt"
+
+    with open(stacks_path, "w") as file:
+        file.writelines(f"{stack} {count}\n" for stack, count in profile["stacks"].items())
+
+    with open(allocations_path, "w") as file:
+        file.writelines(
+            f"{allocation['size_bytes']:>12} B {allocation['count']:>8} blocks  {allocation['location']}\n"
+            for allocation in profile["allocations"]
+        )
+
+    return stacks_path, allocations_path
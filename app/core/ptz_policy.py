@@ -0,0 +1,122 @@
+from collections import Counter, deque
+from typing import NamedTuple, Protocol
+
+import numpy as np
+
+from .config import PtzPolicyConfig, PtzPolicyKind
+
+# Preset the cameras are sent to when a recording starts
+INITIAL_PRESET = 1
+
+
+class PtzDecision(NamedTuple):
+    # Bucket to follow, which is also the preset number called
+    bucket: int
+    # Time of the oldest vote for the bucket still in the window, where its reaction latency starts
+    onset: float
+
+
+class PtzPolicy(Protocol):
+    # Bucket the cameras follow
+    position: int
+    # Bucket leading the votes after the last update, which the cameras switch to once the policy allows
+    leader: int
+
+    def update(self, timestamp: float, bucket_counts: np.ndarray) -> PtzDecision | None:
+        """
+        Take the players counted in each bucket of an analyzed frame.
+
+        Returns:
+            PtzDecision | None: The bucket to switch to, None to stay.
+        """
+        ...
+
+
+class ModePolicy:
+    """
+    Every frame votes for its most populated bucket and the cameras follow the most voted bucket of the last
+    `window` frames, switching whenever it changes.
+    """
+
+    def __init__(self, config: PtzPolicyConfig, position: int = INITIAL_PRESET):
+        self.window = config.window
+        self.position = position
+        self.leader = position
+        self.__votes: deque[tuple[float, int]] = deque()
+        self.__tally = Counter()
+
+    def update(self, timestamp: float, bucket_counts: np.ndarray) -> PtzDecision | None:
+        bucket = int(np.argmax(bucket_counts))
+        self.__votes.append((timestamp, bucket))
+        self.__tally[bucket] += 1
+        if len(self.__votes) > self.window:
+            _, oldest = self.__votes.popleft()
+            self.__tally[oldest] -= 1
+            if self.__tally[oldest] == 0:
+                del self.__tally[oldest]
+
+        # Ties go to the bucket counted first, as they always did
+        self.leader = self.__tally.most_common(1)[0][0]
+        if self.leader == self.position:
+            return None
+
+        self.position = self.leader
+        return PtzDecision(self.leader, _onset(self.__votes, self.leader))
+
+
+class HysteresisPolicy:
+    """
+    Frames with at least `min_players` players vote for their most populated bucket, emptier ones abstain.
+
+    The cameras switch to the most voted bucket of the last `window` frames once it holds `min_share` of the
+    window, leads the followed bucket by `margin` votes, and the cameras stayed `dwell_seconds` on their preset.
+    A play around a bucket boundary splits the votes and keeps the cameras where they are.
+    """
+
+    def __init__(self, config: PtzPolicyConfig, position: int = INITIAL_PRESET):
+        self.config = config
+        self.position = position
+        self.leader = position
+        self.__votes: deque[tuple[float, int | None]] = deque(maxlen=config.window)
+        self.__switched_at = float("-inf")
+
+    def update(self, timestamp: float, bucket_counts: np.ndarray) -> PtzDecision | None:
+        config = self.config
+        vote = int(np.argmax(bucket_counts)) if bucket_counts.sum() >= max(config.min_players, 1) else None
+        self.__votes.append((timestamp, vote))
+
+        tally = Counter(bucket for _, bucket in self.__votes if bucket is not None)
+        if not tally:
+            return None
+
+        leader, votes = tally.most_common(1)[0]
+        # A tie keeps the cameras where they are
+        if tally[self.position] == votes:
+            leader = self.position
+        self.leader = leader
+
+        if (
+            leader == self.position
+            or votes < config.min_share * config.window
+            or votes - tally[self.position] < config.margin
+            or timestamp - self.__switched_at < config.dwell_seconds
+        ):
+            return None
+
+        self.position = leader
+        self.__switched_at = timestamp
+        return PtzDecision(leader, _onset(self.__votes, leader))
+
+
+def _onset(votes: deque, bucket: int) -> float:
+    return next(timestamp for timestamp, vote in votes if vote == bucket)
+
+
+POLICIES: dict[PtzPolicyKind, type] = {
+    PtzPolicyKind.MODE: ModePolicy,
+    PtzPolicyKind.HYSTERESIS: HysteresisPolicy,
+}
+
+
+def create_ptz_policy(config: PtzPolicyConfig, position: int = INITIAL_PRESET) -> PtzPolicy:
+    return POLICIES[config.policy](config, position)
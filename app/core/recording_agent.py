@@ -0,0 +1,158 @@
+import logging
+import time
+from datetime import datetime
+from threading import Event, Lock, Timer
+
+from typing_extensions import Self
+
+from .config import AgentConfig, get_recording_config
+from .record_manager import RecordManager
+from .utils.http import HttpRequestFailed, request_json
+
+
+class AgentNotConfigured(Exception):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class RecordingAgent:
+    """
+    Records the sessions the coordinator assigns to this host.
+
+    Start and stop commands carry deadlines on this host's clock. They are armed as timers, so the recording
+    starts and stops on time without further messages from the coordinator. The state of every configured
+    session is reported to the coordinator with each heartbeat.
+    """
+
+    __instance: Self | None = None
+    __key = object()
+
+    @classmethod
+    def get_instance(cls, logger: logging.Logger) -> Self:
+        """
+        Raises:
+            AgentNotConfigured: If the recording config has no agent section.
+        """
+        if cls.__instance is None:
+            config = get_recording_config().agent
+            if config is None:
+                raise AgentNotConfigured("The recording config has no agent section")
+            cls.__instance = cls(cls.__key, logger, config)
+        return cls.__instance
+
+    def __init__(self, key, logger: logging.Logger, config: AgentConfig):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        self.__logger = logger
+        self.config = config
+        self.__start_timers: dict[str, Timer] = {}
+        self.__stop_timers: dict[str, Timer] = {}
+        self.__lock = Lock()
+
+    def start(self, session: str, start_at: float | None, stop_at: float | None, owner: int | None):
+        """
+        Arm the recording of a session, replacing the deadlines of an earlier command.
+
+        Raises:
+            SessionNotFound: If the session is not configured on this agent.
+        """
+        record_manager = RecordManager.get_instance(self.__logger, session)
+        now = time.time()
+        start_at = now if start_at is None else start_at
+        with self.__lock:
+            self.__cancel(session)
+            self.__start_timers[session] = self.__arm(
+                start_at - now, self.__start_session, record_manager, start_at, owner
+            )
+            if stop_at is not None:
+                self.__stop_timers[session] = self.__arm(stop_at - now, self.__stop_session, record_manager, owner)
+
+        self.__logger.info(f"Session {session} armed to record from {start_at} until {stop_at}")
+
+    def stop(self, session: str, stop_at: float | None, owner: int | None):
+        """
+        Disarm a session and stop its recording at stop_at, now if missing.
+
+        Raises:
+            SessionNotFound: If the session is not configured on this agent.
+        """
+        record_manager = RecordManager.get_instance(self.__logger, session)
+        now = time.time()
+        with self.__lock:
+            self.__cancel(session)
+            self.__stop_timers[session] = self.__arm(
+                (now if stop_at is None else stop_at) - now, self.__stop_session, record_manager, owner
+            )
+
+    def is_armed(self, session: str) -> bool:
+        timer = self.__start_timers.get(session)
+        return timer is not None and timer.is_alive()
+
+    @property
+    def load(self) -> int:
+        """
+        Number of cameras recording on this agent.
+        """
+        return sum(
+            len(record_manager.processes)
+            for record_manager in RecordManager.get_instances(self.__logger)
+            if record_manager.is_running
+        )
+
+    def status(self) -> dict:
+        sessions = {}
+        for record_manager in RecordManager.get_instances(self.__logger):
+            snapshot = record_manager.snapshot
+            sessions[record_manager.session] = {
+                "state": snapshot.state.value,
+                "armed": self.is_armed(record_manager.session),
+                "owner": snapshot.owner,
+                "error": snapshot.error,
+            }
+
+        return {
+            "name": self.config.name,
+            "url": self.config.url,
+            "capacity": self.config.capacity,
+            "load": self.load,
+            "sessions": sessions,
+        }
+
+    def send_heartbeats(self, stop_event: Event):
+        """
+        Report the status of this agent to the coordinator until the event is set.
+        """
+        url = f"{self.config.coordinator_url.rstrip('/')}/api/v1/agent/heartbeat"
+        while not stop_event.is_set():
+            try:
+                request_json(url, "POST", self.status())
+            except HttpRequestFailed as e:
+                self.__logger.warning(f"Heartbeat failed: {e.message}")
+
+            stop_event.wait(self.config.heartbeat_interval)
+
+    def __arm(self, delay: float, function, *args) -> Timer:
+        timer = Timer(max(delay, 0.0), function, args)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def __cancel(self, session: str):
+        for timers in (self.__start_timers, self.__stop_timers):
+            timer = timers.pop(session, None)
+            if timer is not None:
+                timer.cancel()
+
+    def __start_session(self, record_manager: RecordManager, start_at: float, owner: int | None):
+        try:
+            record_manager.start(datetime.fromtimestamp(start_at), owner=owner)
+        except Exception as e:
+            self.__logger.error(f"Failed to start session {record_manager.session}: {getattr(e, 'message', e)}")
+
+    def __stop_session(self, record_manager: RecordManager, owner: int | None):
+        try:
+            record_manager.stop(owner=owner)
+        except Exception as e:
+            self.__logger.error(f"Failed to stop session {record_manager.session}: {getattr(e, 'message', e)}")
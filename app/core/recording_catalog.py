@@ -0,0 +1,422 @@
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from threading import Lock
+from typing import NamedTuple
+
+from typing_extensions import Self
+
+from .config import DEFAULT_SESSION, get_recording_config
+from .utils.dir_creator import RECORDING_DIR, get_state_dir
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DIR_NAME_FORMAT = "%Y%m%d_%H%M"
+CAMERA_FILE_PATTERN = re.compile(r"^cam(\d+)(?:_seg(\d+))?\.mp4$")
+
+
+def _to_us(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+class RecordingNotFound(Exception):
+    def __init__(self, message: str, id: int):
+        self.message = message
+        self.id = id
+        super().__init__(self.message)
+
+
+class RecordingFileNotFound(Exception):
+    def __init__(self, message: str, id: int, name: str):
+        self.message = message
+        self.id = id
+        self.name = name
+        super().__init__(self.message)
+
+
+class CatalogState(str, Enum):
+    RECORDING = "recording"
+    COMPLETE = "complete"
+    # Was recording when the API went down
+    INTERRUPTED = "interrupted"
+
+
+class CatalogFile(NamedTuple):
+    name: str
+    size_bytes: int
+    modified_at: datetime
+    camera: int | None
+    segment: int | None
+
+
+class CatalogRecording(NamedTuple):
+    id: int
+    session: str
+    name: str
+    path: str
+    state: CatalogState
+    start_time: datetime
+    end_time: datetime | None
+    schedule_id: int | None
+    cameras: int
+    size_bytes: int
+    health: dict[str, dict[str, float]]
+    files: list[CatalogFile] | None = None
+
+    @property
+    def duration(self) -> timedelta | None:
+        return None if self.end_time is None else self.end_time - self.start_time
+
+
+class RecordingCatalog:
+    """
+    Index of the recording directories in an SQLite database running in WAL mode.
+
+    The record managers add a recording when it starts and complete it with its files and health counters
+    when it stops, so the tree is never walked to list recordings. `sync` reconciles the catalog with the
+    recording directories on startup: it only lists the session directories and scans the files of the
+    recordings it did not know or whose directory changed since.
+    """
+
+    __instance: Self | None = None
+    __key = object()
+
+    @classmethod
+    def get_instance(cls) -> Self:
+        if cls.__instance is None:
+            cls.__instance = cls(cls.__key)
+        return cls.__instance
+
+    def __init__(self, key, path: str | None = None, root: str = RECORDING_DIR):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        path = path or f"{get_state_dir()}/catalog.db"
+        self.root = root
+
+        self.__lock = Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute("PRAGMA foreign_keys=ON")
+        self.__connection.execute("""
+            CREATE TABLE IF NOT EXISTS recordings (
+                id INTEGER PRIMARY KEY,
+                session TEXT NOT NULL,
+                name TEXT NOT NULL,
+                state TEXT NOT NULL,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER,
+                schedule_id INTEGER,
+                cameras INTEGER NOT NULL DEFAULT 0,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                health TEXT NOT NULL DEFAULT '{}',
+                dir_mtime_ns INTEGER,
+                UNIQUE (session, name)
+            )
+            """)
+        self.__connection.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                recording_id INTEGER NOT NULL REFERENCES recordings(id) ON DELETE CASCADE,
+                name TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                camera INTEGER,
+                segment INTEGER,
+                PRIMARY KEY (recording_id, name)
+            )
+            """)
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS recordings_start_time ON recordings(start_time, id)")
+
+    def begin(self, session: str, path: str, start_time: datetime, schedule_id: int | None) -> int:
+        """
+        Add a starting recording, or restart the one already using the directory.
+        """
+        name = os.path.basename(path)
+        with self.__lock:
+            return self.__connection.execute(
+                """
+                INSERT INTO recordings (session, name, state, start_time, schedule_id) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (session, name) DO UPDATE
+                SET state = excluded.state, end_time = NULL, schedule_id = excluded.schedule_id
+                RETURNING id
+                """,
+                (session, name, CatalogState.RECORDING.value, _to_us(start_time.astimezone(timezone.utc)), schedule_id),
+            ).fetchone()[0]
+
+    def finish(self, id: int, end_time: datetime, health: dict[str, dict[str, float]]):
+        """
+        Complete a recording with its health counters and the files it left.
+        """
+        with self.__lock:
+            row = self.__connection.execute("SELECT session, name FROM recordings WHERE id = ?", (id,)).fetchone()
+            if row is None:
+                return
+
+            self.__connection.execute(
+                "UPDATE recordings SET state = ?, end_time = ?, health = ? WHERE id = ?",
+                (
+                    CatalogState.COMPLETE.value,
+                    _to_us(end_time.astimezone(timezone.utc)),
+                    json.dumps(health),
+                    id,
+                ),
+            )
+            self.__scan(id, self.__path(*row))
+
+    def refresh(self, id: int):
+        """
+        Rescan the files of a recording, after something else than its recording wrote into its directory.
+        """
+        with self.__lock:
+            row = self.__connection.execute("SELECT session, name FROM recordings WHERE id = ?", (id,)).fetchone()
+            if row is not None:
+                self.__scan(id, self.__path(*row))
+
+    def sync(self) -> int:
+        """
+        Reconcile the catalog with the recording directories, meant to run on startup before any recording.
+
+        Recordings of the layout before sessions, directly in the recordings directory, are moved into the default
+        session first.
+
+        Returns:
+            The number of recordings added, rescanned or removed.
+        """
+        changes = 0
+        with self.__lock:
+            self.__move_unsessioned()
+            known = {
+                (session, name): (id, state, dir_mtime_ns)
+                for id, session, name, state, dir_mtime_ns in self.__connection.execute(
+                    "SELECT id, session, name, state, dir_mtime_ns FROM recordings"
+                )
+            }
+
+            found = set()
+            for session in self.__list_dirs(self.root):
+                for name in self.__list_dirs(f"{self.root}/{session}"):
+                    path = f"{self.root}/{session}/{name}"
+                    found.add((session, name))
+                    id, state, dir_mtime_ns = known.get((session, name), (None, None, None))
+                    if id is None:
+                        id = self.__discover(session, name)
+                        if id is None:
+                            continue
+                    elif state == CatalogState.RECORDING.value:
+                        # No recording survives a restart of the API
+                        self.__connection.execute(
+                            "UPDATE recordings SET state = ? WHERE id = ?", (CatalogState.INTERRUPTED.value, id)
+                        )
+                    elif os.stat(path).st_mtime_ns == dir_mtime_ns:
+                        continue
+
+                    self.__scan(id, path)
+                    changes += 1
+
+            for key in known.keys() - found:
+                self.__connection.execute("DELETE FROM recordings WHERE id = ?", (known[key][0],))
+                changes += 1
+
+        return changes
+
+    def remove(self, id: int):
+        with self.__lock:
+            self.__connection.execute("DELETE FROM recordings WHERE id = ?", (id,))
+
+    def size_bytes(self) -> int:
+        """
+        Size of all catalogued recordings, running recordings count once they stopped.
+        """
+        with self.__lock:
+            return self.__connection.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM recordings").fetchone()[0]
+
+    def get_recordings(
+        self,
+        session: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        before: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+    ) -> list[CatalogRecording]:
+        """
+        Return the recordings started within [start, end], newest first.
+
+        Args:
+            before (tuple[datetime, int] | None): (start_time, id) of the last recording of the previous page.
+        """
+        conditions, params = [], []
+        if session is not None:
+            conditions.append("session = ?")
+            params.append(session)
+        if start is not None:
+            conditions.append("start_time >= ?")
+            params.append(_to_us(start))
+        if end is not None:
+            conditions.append("start_time <= ?")
+            params.append(_to_us(end))
+        if before is not None:
+            conditions.append("(start_time, id) < (?, ?)")
+            params.extend((_to_us(before[0]), before[1]))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.__lock:
+            rows = self.__connection.execute(
+                f"""
+                SELECT id, session, name, state, start_time, end_time, schedule_id, cameras, size_bytes, health
+                FROM recordings {where}
+                ORDER BY start_time DESC, id DESC
+                LIMIT ?
+                """,
+                (*params, -1 if limit is None else limit),
+            ).fetchall()
+
+        return [self.__to_recording(row) for row in rows]
+
+    def get(self, id: int) -> CatalogRecording:
+        """
+        Raises:
+            RecordingNotFound: If there is no recording with the given id.
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                """
+                SELECT id, session, name, state, start_time, end_time, schedule_id, cameras, size_bytes, health
+                FROM recordings WHERE id = ?
+                """,
+                (id,),
+            ).fetchone()
+            if row is None:
+                raise RecordingNotFound(f"Recording with id {id} does not exist", id)
+
+            files = [
+                CatalogFile(name, size_bytes, _from_us(mtime_ns // 1000), camera, segment)
+                for name, size_bytes, mtime_ns, camera, segment in self.__connection.execute(
+                    """
+                    SELECT name, size_bytes, mtime_ns, camera, segment FROM files
+                    WHERE recording_id = ? ORDER BY name
+                    """,
+                    (id,),
+                )
+            ]
+
+        return self.__to_recording(row)._replace(files=files)
+
+    def get_file_path(self, id: int, name: str) -> str:
+        """
+        Path of a catalogued file of a recording, names not in the catalog are never resolved.
+
+        Raises:
+            RecordingNotFound: If there is no recording with the given id.
+            RecordingFileNotFound: If the recording has no file with the given name.
+        """
+        recording = self.get(id)
+        if not any(file.name == name for file in recording.files):
+            raise RecordingFileNotFound(f"Recording {id} has no file named {name}", id, name)
+
+        return f"{recording.path}/{name}"
+
+    def __path(self, session: str, name: str) -> str:
+        return f"{self.root}/{session}/{name}"
+
+    def __to_recording(self, row) -> CatalogRecording:
+        id, session, name, state, start_time, end_time, schedule_id, cameras, size_bytes, health = row
+        return CatalogRecording(
+            id=id,
+            session=session,
+            name=name,
+            path=self.__path(session, name),
+            state=CatalogState(state),
+            start_time=_from_us(start_time),
+            end_time=None if end_time is None else _from_us(end_time),
+            schedule_id=schedule_id,
+            cameras=cameras,
+            size_bytes=size_bytes,
+            health=json.loads(health),
+        )
+
+    @staticmethod
+    def __list_dirs(path: str) -> list[str]:
+        try:
+            return [entry.name for entry in os.scandir(path) if entry.is_dir()]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def __parse_start_time(name: str) -> datetime | None:
+        """
+        The start time a recording directory is named after, in local time, None for other directories.
+        """
+        try:
+            return datetime.strptime(name, _DIR_NAME_FORMAT).astimezone(timezone.utc)
+        except ValueError:
+            return None
+
+    def __move_unsessioned(self):
+        sessions = get_recording_config().sessions
+        for name in self.__list_dirs(self.root):
+            if name in sessions or self.__parse_start_time(name) is None:
+                continue
+
+            path = self.__path(DEFAULT_SESSION, name)
+            if os.path.exists(path):
+                continue
+
+            os.makedirs(f"{self.root}/{DEFAULT_SESSION}", exist_ok=True)
+            os.rename(f"{self.root}/{name}", path)
+
+    def __discover(self, session: str, name: str) -> int | None:
+        """
+        Add a recording found on disk, the directory name being its local start time.
+        """
+        start_time = self.__parse_start_time(name)
+        if start_time is None:
+            return None
+
+        return self.__connection.execute(
+            "INSERT INTO recordings (session, name, state, start_time) VALUES (?, ?, ?, ?) RETURNING id",
+            (session, name, CatalogState.COMPLETE.value, _to_us(start_time)),
+        ).fetchone()[0]
+
+    def __scan(self, id: int, path: str):
+        files = []
+        try:
+            dir_mtime_ns = os.stat(path).st_mtime_ns
+            for entry in os.scandir(path):
+                if not entry.is_file():
+                    continue
+
+                stat = entry.stat()
+                match = CAMERA_FILE_PATTERN.match(entry.name)
+                camera, segment = (int(match[1]), int(match[2] or 0)) if match else (None, None)
+                files.append((id, entry.name, stat.st_size, stat.st_mtime_ns, camera, segment))
+        except FileNotFoundError:
+            return
+
+        self.__connection.execute("DELETE FROM files WHERE recording_id = ?", (id,))
+        self.__connection.executemany(
+            "INSERT INTO files (recording_id, name, size_bytes, mtime_ns, camera, segment) VALUES (?, ?, ?, ?, ?, ?)",
+            files,
+        )
+
+        videos = [file for file in files if file[4] is not None]
+        self.__connection.execute(
+            """
+            UPDATE recordings SET cameras = ?, size_bytes = ?, dir_mtime_ns = ?,
+            end_time = COALESCE(end_time, ?)
+            WHERE id = ?
+            """,
+            (
+                len({file[4] for file in videos}),
+                sum(file[2] for file in files),
+                dir_mtime_ns,
+                max((file[3] // 1000 for file in videos), default=None),
+                id,
+            ),
+        )
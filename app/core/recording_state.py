@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import NamedTuple
+
+
+class RecordingState(str, Enum):
+    IDLE = "idle"
+    STARTING = "starting"
+    RECORDING = "recording"
+    STOPPING = "stopping"
+    FAILED = "failed"
+
+
+# Transitions the RecordManager is allowed to make
+TRANSITIONS: dict[RecordingState, tuple[RecordingState, ...]] = {
+    RecordingState.IDLE: (RecordingState.STARTING,),
+    RecordingState.FAILED: (RecordingState.STARTING, RecordingState.STOPPING),
+    RecordingState.STARTING: (RecordingState.RECORDING, RecordingState.FAILED),
+    RecordingState.RECORDING: (RecordingState.STOPPING,),
+    RecordingState.STOPPING: (RecordingState.IDLE, RecordingState.FAILED),
+}
+
+
+class RecordingSnapshot(NamedTuple):
+    """
+    Immutable view of the recording state.
+
+    A new snapshot is built for every transition and published with a single attribute assignment, so readers
+    never need a lock and never see a half updated state.
+    """
+
+    state: RecordingState
+    since: datetime
+    sequence: int = 0
+    owner: int | None = None
+    start_time: datetime | None = None
+    error: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.state in (RecordingState.STARTING, RecordingState.RECORDING)
+
+    def transition(self, state: RecordingState, **changes) -> "RecordingSnapshot":
+        if state not in TRANSITIONS[self.state]:
+            raise ValueError(f"Invalid recording state transition: {self.state.value} -> {state.value}")
+
+        return self._replace(state=state, since=datetime.now(timezone.utc), sequence=self.sequence + 1, **changes)
+
+
+def initial_snapshot() -> RecordingSnapshot:
+    return RecordingSnapshot(state=RecordingState.IDLE, since=datetime.now(timezone.utc))
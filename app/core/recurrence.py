@@ -0,0 +1,161 @@
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+from zoneinfo import ZoneInfo
+
+from ..schemas.schedule import Recurrence
+
+# Upper bound of how far a UTC instant can move relative to the local wall clock across a DST change
+_DST_MARGIN = timedelta(hours=3)
+
+
+class RecurrenceRule:
+    """
+    Occurrences of a recurring schedule, computed on demand.
+
+    Occurrences repeat on the local wall clock of the rule's time zone, so a weekly 18:00 slot stays at 18:00
+    across DST changes. Every weekday of a weekly rule forms an arithmetic series
+    `base + k * period` on the wall clock, which lets lookups jump straight to the candidate occurrences of a
+    time range instead of walking the whole season.
+
+    Occurrences are numbered from 0 in chronological order, `count` limits that numbering and exceptions only
+    hide occurrences, like EXDATE in RFC 5545.
+    """
+
+    def __init__(self, start_time: datetime, end_time: datetime, recurrence: Recurrence):
+        self.recurrence = recurrence
+        self.duration = end_time - start_time
+
+        self.__tz = ZoneInfo(recurrence.timezone)
+        self.__period = timedelta(days=recurrence.interval * (7 if recurrence.frequency == "weekly" else 1))
+
+        anchor = start_time.astimezone(self.__tz).replace(tzinfo=None)
+        weekdays = recurrence.by_weekday or [anchor.weekday()]
+        self.__bases = [anchor + timedelta(days=(weekday - anchor.weekday()) % 7) for weekday in weekdays]
+        self.__bases.sort()
+        self.__exceptions = set(recurrence.exceptions)
+
+    @property
+    def period(self) -> timedelta:
+        return self.__period
+
+    @property
+    def first_start(self) -> datetime:
+        return self.__to_utc(self.__bases[0])
+
+    @property
+    def last_start(self) -> datetime | None:
+        """
+        Start of the last occurrence ignoring exceptions, None if the rule never ends.
+        """
+        if self.recurrence.count is None and self.recurrence.until is None:
+            return None
+
+        if self.recurrence.count is not None:
+            last = self.occurrence(self.recurrence.count - 1)[0]
+            if self.recurrence.until is None or last <= self.recurrence.until:
+                return last
+
+        return self.recurrence.until
+
+    def occurrence(self, n: int) -> tuple[datetime, datetime]:
+        k, j = divmod(n, len(self.__bases))
+        start_time = self.__to_utc(self.__bases[j] + k * self.__period)
+        return start_time, start_time + self.duration
+
+    def is_valid(self, n: int) -> bool:
+        if n < 0 or (self.recurrence.count is not None and n >= self.recurrence.count):
+            return False
+
+        start_time, _ = self.occurrence(n)
+        if self.recurrence.until is not None and start_time > self.recurrence.until:
+            return False
+
+        return start_time not in self.__exceptions
+
+    def occurrences(self, after: datetime | None = None) -> Iterator[tuple[int, datetime, datetime]]:
+        """
+        Yield (n, start_time, end_time) of the occurrences that end after the given time, in order.
+        """
+        n = 0 if after is None else self.__first_index_ending_after(after)
+        while self.recurrence.count is None or n < self.recurrence.count:
+            start_time, end_time = self.occurrence(n)
+            if self.recurrence.until is not None and start_time > self.recurrence.until:
+                return
+
+            if start_time not in self.__exceptions:
+                yield n, start_time, end_time
+
+            n += 1
+
+    def next_occurrence(self, after: datetime) -> tuple[int, datetime, datetime] | None:
+        return next(self.occurrences(after), None)
+
+    def first_overlap(self, start: datetime, end: datetime) -> tuple[int, datetime, datetime] | None:
+        """
+        Return the first occurrence intersecting [start, end], None if there is none.
+        """
+        local_start = start.astimezone(self.__tz).replace(tzinfo=None) - self.duration - _DST_MARGIN
+        local_end = end.astimezone(self.__tz).replace(tzinfo=None) + _DST_MARGIN
+
+        candidates = []
+        for j, base in enumerate(self.__bases):
+            first = max(math.ceil((local_start - base) / self.__period), 0)
+            last = math.floor((local_end - base) / self.__period)
+            candidates.extend(k * len(self.__bases) + j for k in range(first, last + 1))
+
+        for n in sorted(candidates):
+            if not self.is_valid(n):
+                continue
+
+            occurrence_start, occurrence_end = self.occurrence(n)
+            if occurrence_start <= end and start <= occurrence_end:
+                return n, occurrence_start, occurrence_end
+
+        return None
+
+    def first_overlap_with_rule(self, other: "RecurrenceRule") -> tuple[int, datetime, datetime] | None:
+        """
+        Return the first occurrence of this rule intersecting an occurrence of the other one.
+
+        Both rules repeat on whole days, so once both have started and all exceptions are behind, the pair
+        repeats every lcm(period, other.period). Only the occurrences up to that point (and at least a year, to
+        see both DST phases) have to be checked against the other rule.
+        """
+        exceptions = self.recurrence.exceptions + other.recurrence.exceptions
+        horizon = max([self.first_start, other.first_start] + exceptions)
+        horizon += max(self.__lcm(self.__period, other.period), timedelta(days=366)) + self.duration + other.duration
+
+        for bound in (self.last_start, other.last_start):
+            if bound is not None:
+                horizon = min(horizon, bound + self.duration + other.duration)
+
+        for n, start_time, end_time in self.occurrences(other.first_start):
+            if start_time > horizon:
+                return None
+
+            if other.first_overlap(start_time, end_time) is not None:
+                return n, start_time, end_time
+
+        return None
+
+    def __first_index_ending_after(self, after: datetime) -> int:
+        local_after = after.astimezone(self.__tz).replace(tzinfo=None) - self.duration - _DST_MARGIN
+
+        first = []
+        for j, base in enumerate(self.__bases):
+            k = max(math.ceil((local_after - base) / self.__period), 0)
+            first.append(k * len(self.__bases) + j)
+
+        n = min(first)
+        while self.occurrence(n)[1] <= after:
+            n += 1
+
+        return n
+
+    def __to_utc(self, local: datetime) -> datetime:
+        return local.replace(tzinfo=self.__tz).astimezone(timezone.utc)
+
+    @staticmethod
+    def __lcm(a: timedelta, b: timedelta) -> timedelta:
+        return timedelta(days=math.lcm(a.days, b.days))
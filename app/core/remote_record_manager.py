@@ -0,0 +1,195 @@
+import logging
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Callable
+
+from typing_extensions import Self
+
+from .agent_registry import Agent, AgentRegistry
+from .config import PanoConfig, get_recording_config
+from .event_bus import EventBus
+from .job_manager import JobStage
+from .record_manager import SessionNotFound
+from .recording_state import RecordingSnapshot, RecordingState, initial_snapshot
+from .schedulable import Schedulable
+from .utils.http import HttpRequestFailed
+from .worker_control import WorkerNotFound
+
+
+class RemoteRecordManager(Schedulable):
+    """
+    Records a remote session on one of the registered recording agents.
+
+    Every start picks the least utilized live agent and sends it the start and stop deadlines converted to the
+    agent's clock, so the agent starts and stops on time even if a later command from the coordinator is lost.
+    Scheduled starts are sent START_LEAD ahead of the deadline. The recording state mirrors what the assigned
+    agent reports in its heartbeats.
+    """
+
+    __instances: dict[str, Self] = {}
+    __instances_lock = Lock()
+    __key = object()
+
+    START_LEAD: timedelta = timedelta(seconds=3)
+
+    @classmethod
+    def get_instance(cls, logger: logging.Logger, session: str) -> Self:
+        """
+        Raises:
+            SessionNotFound: If the session is not configured as a remote session.
+        """
+        with cls.__instances_lock:
+            if session not in cls.__instances:
+                config = get_recording_config().sessions.get(session)
+                if config is None or not config.remote:
+                    raise SessionNotFound(f"Remote recording session {session} is not configured", session)
+                cls.__instances[session] = cls(cls.__key, logger, session)
+            return cls.__instances[session]
+
+    def __init__(self, key, logger: logging.Logger, session: str):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        self.__logger = logger
+        self.session = session
+        self.agent: Agent | None = None
+        # Whether the assigned agent reported the session as taken since, reports sent before it got the
+        # start command still say idle
+        self.__confirmed = False
+
+        self.__snapshot: RecordingSnapshot = initial_snapshot()
+        self.__transition_lock = Lock()
+
+    def start(
+        self,
+        start_time: datetime,
+        *args,
+        owner: int | None = None,
+        progress: Callable[[JobStage], None] | None = None,
+        end_time: datetime | None = None,
+        **kwargs,
+    ):
+        """
+        Assign the session to an agent and have it record from start_time, until end_time if given.
+        """
+        progress = progress or (lambda stage: None)
+        registry = AgentRegistry.get_instance(self.__logger)
+        with self.__transition_lock:
+            if self.__snapshot.is_running:
+                progress(JobStage.RECORDING)
+                return
+
+            self.__publish(RecordingState.STARTING, owner=owner, start_time=start_time, error=None)
+            try:
+                agent = registry.pick(self.session)
+                body = {
+                    "start_at": agent.to_agent_time(max(start_time.timestamp(), time.time())),
+                    "stop_at": None if end_time is None else agent.to_agent_time(end_time.timestamp()),
+                    "owner": owner,
+                }
+                registry.send(agent, "POST", f"/agent/v1/sessions/{self.session}/start", body)
+            except Exception as e:
+                self.__publish(RecordingState.FAILED, error=getattr(e, "message", str(e)))
+                raise
+
+            self.agent = agent
+            self.__confirmed = False
+            self.__publish(RecordingState.RECORDING)
+            progress(JobStage.RECORDING)
+            self.__logger.info(f"Session {self.session} assigned to {agent}")
+
+    def stop(self, *args, owner: int | None = None, **kwargs):
+        with self.__transition_lock:
+            snapshot = self.__snapshot
+            if not snapshot.is_running and snapshot.state != RecordingState.FAILED:
+                return
+
+            if owner is not None and snapshot.owner != owner:
+                return
+
+            self.__publish(RecordingState.STOPPING)
+            agent = self.agent
+            if agent is not None:
+                try:
+                    body = {"stop_at": agent.to_agent_time(time.time()), "owner": snapshot.owner}
+                    AgentRegistry.get_instance(self.__logger).send(
+                        agent, "POST", f"/agent/v1/sessions/{self.session}/stop", body
+                    )
+                except HttpRequestFailed as e:
+                    self.__publish(RecordingState.FAILED, error=e.message)
+                    raise
+
+            self.agent = None
+            self.__publish(RecordingState.IDLE, owner=None)
+
+    def follow(self, agent: Agent, state: RecordingState, armed: bool, error: str | None):
+        """
+        Mirror the state of the session reported by the agent it is assigned to.
+
+        Reports are ignored while the agent still waits for the start deadline, it is idle until then.
+        """
+        with self.__transition_lock:
+            if self.agent is not agent or self.__snapshot.state != RecordingState.RECORDING:
+                return
+
+            if armed or state != RecordingState.IDLE:
+                self.__confirmed = True
+            if armed or not self.__confirmed:
+                return
+
+            if state in (RecordingState.IDLE, RecordingState.FAILED):
+                self.__publish(RecordingState.STOPPING)
+                self.__publish(state, owner=None, error=error)
+                self.agent = None
+
+    def profile(self, worker: str, duration: float, interval: float) -> dict:
+        raise WorkerNotFound(f"Session {self.session} records on an agent, profile the worker there", worker)
+
+    def preview(self, worker: str):
+        raise WorkerNotFound(f"Session {self.session} records on an agent, preview the worker there", worker)
+
+    @property
+    def pano_settings(self) -> tuple[str, PanoConfig]:
+        config = get_recording_config().sessions[self.session]
+        return config.pano_url, config.pano
+
+    def reconfigure_pano(self, url: str, config: PanoConfig) -> dict:
+        raise WorkerNotFound(f"Session {self.session} records on an agent, reconfigure the worker there", "pano")
+
+    @property
+    def snapshot(self) -> RecordingSnapshot:
+        return self.__snapshot
+
+    @property
+    def is_running(self) -> bool:
+        return self.__snapshot.is_running
+
+    def is_running_for(self, owner: int | None) -> bool:
+        snapshot = self.__snapshot
+        return snapshot.is_running and snapshot.owner == owner
+
+    @property
+    def resources(self) -> frozenset:
+        return frozenset({f"session:{self.session}"}) | get_recording_config().sessions[self.session].resources
+
+    @property
+    def start_lead(self) -> timedelta:
+        return self.START_LEAD
+
+    def __publish(self, state: RecordingState, **changes):
+        snapshot = self.__snapshot.transition(state, **changes)
+        self.__snapshot = snapshot
+
+        EventBus.get_instance().publish(
+            "recording_state",
+            {
+                "state": snapshot.state.value,
+                "since": snapshot.since.isoformat(),
+                "sequence": snapshot.sequence,
+                "session": self.session,
+                "agent": None if self.agent is None else self.agent.name,
+                "owner": snapshot.owner,
+                "error": snapshot.error,
+            },
+        )
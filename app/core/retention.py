@@ -0,0 +1,233 @@
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Callable
+
+from typing_extensions import Self
+
+from .config import RetentionConfig, get_recording_config
+from .event_bus import EventBus
+from .recording_catalog import CatalogRecording, CatalogState, RecordingCatalog
+from .storage import GB
+
+MB = 1000**2
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class RetentionStopped(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Limits the bytes per second of I/O, bursting up to one second worth of bytes after a pause.
+
+    The rate is read on every call, so it follows changes of load while a transfer runs.
+    """
+
+    def __init__(self, rate: Callable[[], float], stop_event: Event):
+        self.__rate = rate
+        self.__stop_event = stop_event
+        self.__tokens = 0.0
+        self.__updated = monotonic()
+
+    def consume(self, amount: int):
+        """
+        Take the given number of bytes from the bucket, waiting until it has refilled enough.
+
+        Raises:
+            RetentionStopped: If the retention worker is stopped while waiting.
+        """
+        rate = self.__rate()
+        now = monotonic()
+        self.__tokens = min(self.__tokens + (now - self.__updated) * rate, rate) - amount
+        self.__updated = now
+        if self.__tokens < 0 and self.__stop_event.wait(-self.__tokens / rate):
+            raise RetentionStopped()
+
+
+class RetentionWorker:
+    """
+    Evicts the oldest recordings in the background, deleting them or moving them to the offload directory.
+
+    A pass evicts recordings older than the maximum age, then the oldest ones while the recordings disk has less
+    than the minimum free space or the recordings exceed the quota. Running recordings are never evicted.
+
+    Every byte read, written or freed goes through a token bucket, which is drained much slower while a session
+    records, so eviction does not take the disk bandwidth the receivers write with.
+    """
+
+    __instance: Self | None = None
+    __lock = Lock()
+    __key = object()
+
+    @classmethod
+    def get_instance(cls, logger: logging.Logger, is_recording: Callable[[], bool] = lambda: False) -> Self:
+        """
+        Args:
+            logger (logging.Logger): Logger of the worker.
+            is_recording (Callable[[], bool]): Whether any session of this host records right now.
+        """
+        with cls.__lock:
+            if cls.__instance is None:
+                cls.__instance = cls(cls.__key, logger, is_recording)
+            return cls.__instance
+
+    def __init__(self, key, logger: logging.Logger, is_recording: Callable[[], bool]):
+        if key is not self.__key:
+            raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
+
+        self.__logger = logger
+        self.__is_recording = is_recording
+        self.__stop_event = Event()
+        self.__wake_event = Event()
+        self.__thread: Thread | None = None
+        self.__bucket = TokenBucket(self.__rate, self.__stop_event)
+
+    def start(self):
+        if self.__thread is not None:
+            return
+
+        self.__stop_event.clear()
+        self.__thread = Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        if self.__thread is None:
+            return
+
+        self.__stop_event.set()
+        self.__wake_event.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def wake(self):
+        """
+        Run a pass right away instead of at the next interval.
+        """
+        self.__wake_event.set()
+
+    def __rate(self) -> float:
+        config = get_recording_config().storage.retention
+        return (config.recording_io_mbps if self.__is_recording() else config.io_mbps) * MB
+
+    def __run(self):
+        while not self.__stop_event.is_set():
+            try:
+                self.run_pass()
+            except RetentionStopped:
+                break
+            except Exception:
+                self.__logger.exception("Retention pass failed")
+
+            self.__wake_event.wait(get_recording_config().storage.retention.interval)
+            self.__wake_event.clear()
+
+    def run_pass(self) -> int:
+        """
+        Evict the recordings the retention policy does not keep.
+
+        Returns:
+            The number of recordings evicted.
+
+        Raises:
+            RetentionStopped: If the worker was stopped during the pass.
+        """
+        storage = get_recording_config().storage
+        config = storage.retention
+        if not config.enabled:
+            return 0
+
+        catalog = RecordingCatalog.get_instance()
+        now = datetime.now(timezone.utc)
+        evicted = 0
+        # Oldest first, the running recordings are skipped
+        for recording in reversed(catalog.get_recordings()):
+            if recording.state == CatalogState.RECORDING:
+                continue
+
+            expired = config.max_age_days is not None and now - recording.start_time > timedelta(
+                days=config.max_age_days
+            )
+            low_on_space = (
+                config.min_free_gb is not None and shutil.disk_usage(catalog.root).free < config.min_free_gb * GB
+            )
+            over_quota = storage.quota_gb is not None and catalog.size_bytes() > storage.quota_gb * GB
+            if not (expired or low_on_space or over_quota):
+                break
+
+            self.__evict(recording, config)
+            evicted += 1
+
+        return evicted
+
+    def __evict(self, recording: CatalogRecording, config: RetentionConfig):
+        action = "deleted"
+        if config.offload_dir is not None:
+            self.__offload(recording, f"{config.offload_dir}/{recording.session}/{recording.name}")
+            action = "offloaded"
+
+        for directory, _, names in os.walk(recording.path):
+            for name in names:
+                self.__delete_file(f"{directory}/{name}")
+        shutil.rmtree(recording.path, ignore_errors=True)
+        RecordingCatalog.get_instance().remove(recording.id)
+
+        self.__logger.info(
+            "Recording %s of session %s %s, %.1f GB freed",
+            recording.name,
+            recording.session,
+            action,
+            recording.size_bytes / GB,
+        )
+        EventBus.get_instance().publish(
+            "retention",
+            {
+                "session": recording.session,
+                "recording": recording.id,
+                "name": recording.name,
+                "action": action,
+                "size_bytes": recording.size_bytes,
+            },
+        )
+
+    def __offload(self, recording: CatalogRecording, target: str):
+        """
+        Copy the recording next to the target and rename it into place, so the target only exists once complete.
+        """
+        partial = f"{target}.partial"
+        buffer = bytearray(CHUNK_SIZE)
+        view = memoryview(buffer)
+        for directory, _, names in os.walk(recording.path):
+            target_directory = os.path.join(partial, os.path.relpath(directory, recording.path))
+            os.makedirs(target_directory, exist_ok=True)
+            for name in names:
+                with open(f"{directory}/{name}", "rb") as source, open(f"{target_directory}/{name}", "wb") as copy:
+                    while read := source.readinto(buffer):
+                        self.__bucket.consume(read)
+                        copy.write(view[:read])
+                    copy.flush()
+                    os.fsync(copy.fileno())
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(partial, target)
+
+    def __delete_file(self, path: str):
+        """
+        Shrink the file chunk by chunk before unlinking it. Unlinking a file of tens of gigabytes at once frees all
+        of its extents in one go, which stalls the writers of the same filesystem.
+        """
+        try:
+            with open(path, "r+b") as file:
+                size = os.fstat(file.fileno()).st_size
+                while size > 0:
+                    step = min(size, CHUNK_SIZE)
+                    self.__bucket.consume(step)
+                    size -= step
+                    file.truncate(size)
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
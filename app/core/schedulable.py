@@ -1,4 +1,6 @@
 import abc
+from datetime import timedelta
+from typing import Hashable
 
 
 class Schedulable(abc.ABC):
@@ -14,3 +16,29 @@ class Schedulable(abc.ABC):
     @abc.abstractmethod
     def is_running(self) -> bool:
         pass
+
+    def is_running_for(self, owner: int | None) -> bool:
+        """
+        Whether the task is running on behalf of the given owner, passed as `owner` to start.
+        """
+        return self.is_running
+
+    @property
+    def resources(self) -> frozenset[Hashable]:
+        """
+        What the task holds while running, tasks sharing a resource cannot be scheduled at overlapping times.
+        """
+        return frozenset({self})
+
+    @property
+    def start_lead(self) -> timedelta:
+        """
+        How long before its start time the task is started, for tasks that take a while to hand over.
+        """
+        return timedelta(0)
+
+    def estimated_bytes(self, duration: timedelta) -> int:
+        """
+        Bytes the task is expected to write to this host's recordings disk when running for the given time.
+        """
+        return 0
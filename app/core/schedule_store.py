@@ -0,0 +1,128 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import NamedTuple
+
+from ..schemas.schedule import Recurrence, Schedule
+from .utils.dir_creator import get_state_dir
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_us(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+class StoredTask(NamedTuple):
+    id: int
+    schedule: Schedule
+    occurrence: int | None
+    force_stopped: bool
+
+
+class ScheduleStore:
+    """
+    Durable storage of the scheduled tasks in an SQLite database running in WAL mode.
+
+    Times are stored as integer microseconds since the epoch so they survive the round trip exactly. A
+    recurring task is stored with its first occurrence and the index of its current one. `active_until` is the
+    end of the last occurrence (NULL if the series never ends) and is indexed, so startup only reads the tasks
+    that can still run.
+    """
+
+    def __init__(self, path: str | None = None):
+        path = path or f"{get_state_dir()}/schedules.db"
+
+        self.__lock = Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute("""
+            CREATE TABLE IF NOT EXISTS schedules (
+                id INTEGER PRIMARY KEY,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER NOT NULL,
+                recurrence TEXT,
+                occurrence INTEGER,
+                force_stopped INTEGER NOT NULL DEFAULT 0,
+                active_until INTEGER,
+                session TEXT NOT NULL DEFAULT 'default'
+            )
+            """)
+        columns = {row[1] for row in self.__connection.execute("PRAGMA table_info(schedules)")}
+        if "session" not in columns:
+            # Databases written before recording sessions existed hold schedules of the default session
+            self.__connection.execute("ALTER TABLE schedules ADD COLUMN session TEXT NOT NULL DEFAULT 'default'")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS schedules_active_until ON schedules(active_until)")
+
+    def save(
+        self,
+        id: int,
+        schedule: Schedule,
+        occurrence: int | None = None,
+        force_stopped: bool = False,
+        active_until: datetime | None = None,
+    ):
+        """
+        Insert or replace a task. The schedule of a recurring task is its first occurrence.
+        """
+        with self.__lock:
+            self.__connection.execute(
+                """
+                INSERT OR REPLACE INTO schedules
+                (id, start_time, end_time, recurrence, occurrence, force_stopped, active_until, session)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    id,
+                    _to_us(schedule.start_time),
+                    _to_us(schedule.end_time),
+                    None if schedule.recurrence is None else schedule.recurrence.model_dump_json(),
+                    occurrence,
+                    int(force_stopped),
+                    None if active_until is None else _to_us(active_until),
+                    schedule.session,
+                ),
+            )
+
+    def delete(self, id: int):
+        with self.__lock:
+            self.__connection.execute("DELETE FROM schedules WHERE id = ?", (id,))
+
+    def max_id(self) -> int | None:
+        with self.__lock:
+            return self.__connection.execute("SELECT MAX(id) FROM schedules").fetchone()[0]
+
+    def load(self, active_after: datetime) -> list[StoredTask]:
+        """
+        Load the tasks that are still active at the given time, ordered by start time.
+        """
+        with self.__lock:
+            rows = self.__connection.execute(
+                """
+                SELECT id, start_time, end_time, recurrence, occurrence, force_stopped, session FROM schedules
+                WHERE active_until >= ? OR active_until IS NULL
+                ORDER BY start_time, id
+                """,
+                (_to_us(active_after),),
+            ).fetchall()
+
+        # The rows were validated before they were written
+        return [
+            StoredTask(
+                id=id,
+                schedule=Schedule.model_construct(
+                    start_time=_from_us(start_time),
+                    end_time=_from_us(end_time),
+                    recurrence=None if recurrence is None else Recurrence.model_validate_json(recurrence),
+                    session=session,
+                ),
+                occurrence=occurrence,
+                force_stopped=bool(force_stopped),
+            )
+            for id, start_time, end_time, recurrence, occurrence, force_stopped, session in rows
+        ]
@@ -1,11 +1,20 @@
+import heapq
 import logging
-from datetime import datetime, timezone
-from threading import Event, Thread
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import count, islice
+from threading import TIMEOUT_MAX, Condition, Event, Lock, Thread
+from typing import Callable, Hashable
 
 from typing_extensions import Self
 
 from ..schemas.schedule import Schedule
+from .event_bus import EventBus
+from .interval_index import IntervalIndex
+from .recurrence import RecurrenceRule
 from .schedulable import Schedulable
+from .schedule_store import ScheduleStore
+from .storage import check_capacity
 
 
 class TaskWithSameIdExists(Exception):
@@ -29,13 +38,54 @@ class TaskOverlapsWithOtherTask(Exception):
         super().__init__(self.message)
 
 
+def _first_overlap(indexes: list[IntervalIndex], start_time: datetime, end_time: datetime) -> int | None:
+    for index in indexes:
+        existing_id = index.first_overlap(start_time, end_time)
+        if existing_id is not None:
+            return existing_id
+
+    return None
+
+
+def _first_occurrence_overlap(rule: RecurrenceRule, indexes: list[IntervalIndex]) -> int | None:
+    """
+    The id of an indexed task an occurrence of the rule overlaps with.
+
+    Every indexed task within the season is checked with RecurrenceRule arithmetic, so the cost does not depend on
+    how far apart the rule and the tasks are.
+    """
+    last_start = rule.last_start
+    season_end = None if last_start is None else last_start + rule.duration
+    for index in indexes:
+        for existing_id, start_time, end_time in index.intervals(rule.first_start, season_end):
+            if rule.first_overlap(start_time, end_time) is not None:
+                return existing_id
+
+    return None
+
+
 class ScheduledTask:
-    def __init__(self, id: int, schedule: Schedule, task: Schedulable):
+    def __init__(
+        self,
+        id: int,
+        schedule: Schedule,
+        task: Schedulable,
+        occurrence: int | None = None,
+        force_stopped: bool = False,
+    ):
         self.id = id
         self.schedule = schedule
+        self.first_schedule = schedule
         self.task = task
-        self._running = False
-        self._force_stopped = False
+        self.resources = task.resources
+        self.recurrence = (
+            None
+            if schedule.recurrence is None
+            else RecurrenceRule(schedule.start_time, schedule.end_time, schedule.recurrence)
+        )
+        self.occurrence = occurrence
+        self._force_stopped = force_stopped
+        self.__lock = Lock()
 
     def __str__(self):
         return f'ScheduledTask(id={self.id}, schedule={self.schedule}, task={self.task})'
@@ -44,88 +94,246 @@ class ScheduledTask:
         return str(self)
 
     def start(self, *args, **kwargs):
-        if self._running:
-            return
+        with self.__lock:
+            if self.is_running() or self._force_stopped:
+                return
+
+            # A start that was queued behind a slow job may only run after the schedule is already over
+            if self.schedule.end_time <= datetime.now(timezone.utc):
+                return
 
-        self._running = True
-        self.task.start(*args, **kwargs)
+            self.task.start(*args, owner=self.id, **kwargs)
 
     def stop(self):
-        if not self._running:
-            return
+        with self.__lock:
+            if not self.is_running():
+                return
+
+            self.task.stop(owner=self.id)
+
+    def restart(self, start_time: datetime, **kwargs) -> bool:
+        """
+        Stop the task and start it again on behalf of this scheduled task, until the end of its schedule.
 
-        self.task.stop()
-        self._running = False
+        Returns:
+            bool: Whether the task was running for this scheduled task.
+        """
+        with self.__lock:
+            if not self.is_running():
+                return False
+
+            self.task.stop(owner=self.id)
+            if self.schedule.end_time > datetime.now(timezone.utc):
+                self.task.start(start_time, owner=self.id, end_time=self.schedule.end_time, **kwargs)
+            return True
 
     def force_stop(self):
         self._force_stopped = True
         self.stop()
 
+    def advance(self, occurrence: int, start_time: datetime, end_time: datetime):
+        with self.__lock:
+            if occurrence != self.occurrence:
+                self._force_stopped = False
+
+            self.occurrence = occurrence
+            self.schedule = self.schedule.model_copy(update={"start_time": start_time, "end_time": end_time})
+
+    @property
+    def start_deadline(self) -> datetime:
+        return self.schedule.start_time - self.task.start_lead
+
     def is_running(self) -> bool:
-        return self._running
+        return self.task.is_running_for(self.id)
 
     def is_force_stopped(self) -> bool:
         return self._force_stopped
 
     def is_due_to_start(self):
-        return self.schedule.start_time <= datetime.now(timezone.utc) and not self._running and not self._force_stopped
+        return (
+            self.schedule.start_time <= datetime.now(timezone.utc) and not self.is_running() and not self._force_stopped
+        )
 
     def is_due_to_stop(self):
-        return self.schedule.end_time <= datetime.now(timezone.utc) and self._running and not self._force_stopped
+        return self.schedule.end_time <= datetime.now(timezone.utc) and self.is_running() and not self._force_stopped
 
 
 class Scheduler:
+    """
+    Event driven scheduler.
+
+    Every task puts a start and an end deadline into a heap. The scheduler thread sleeps until the earliest
+    deadline, or until it is woken up because the heap changed, and hands the due starts and stops over to a
+    worker pool so a slow start of one task cannot delay the deadlines of the others. The start deadline of a
+    task is moved ahead by the start lead of its Schedulable.
+
+    Removed tasks are not searched for in the heap, their entries are dropped when they reach the top.
+
+    Tasks are also kept in an interval index ordered by start time, which is used for time range listing, and
+    in one interval index per resource their Schedulable holds. Only tasks sharing a resource conflict, so the
+    overlap check on insertion looks at the indexes of the new task's resources only and tasks of different
+    recording sessions can run at the same time.
+
+    A recurring task only has its next occurrence materialized: it is indexed and queued like a one-off task,
+    and the following occurrence replaces it once it stopped. Overlaps with the rest of the season are found
+    with RecurrenceRule arithmetic.
+    """
+
     __instance: Self | None = None
     __key = object()
 
+    # Stops sort before starts with the same deadline, so back-to-back tasks hand over cleanly
+    STOP: int = 0
+    START: int = 1
+
     @classmethod
-    def get_instance(cls, logger: logging.Logger) -> Self:
+    def get_instance(
+        cls,
+        logger: logging.Logger,
+        store: ScheduleStore | None = None,
+        task_resolver: Callable[[Schedule], Schedulable] | None = None,
+    ) -> Self:
+        """
+        Return the scheduler, creating and starting it on the first call.
+
+        Args:
+            logger (logging.Logger): Logger of the scheduler.
+            store (ScheduleStore | None): Persists the tasks if given, the stored tasks are restored on creation.
+            task_resolver (Callable[[Schedule], Schedulable] | None): Returns the Schedulable of a restored task.
+
+        Returns:
+            Scheduler: The scheduler instance.
+        """
         if cls.__instance is None:
-            cls.__instance = cls(cls.__key, logger)
+            cls.__instance = cls(cls.__key, logger, store=store)
+            if store is not None and task_resolver is not None:
+                cls.__instance.restore(task_resolver)
             cls.__instance.start()
 
         return cls.__instance
 
-    def __init__(self, key, logger: logging.Logger, check_interval: int = 1, end_event: Event | None = None):
+    def __init__(
+        self,
+        key,
+        logger: logging.Logger,
+        store: ScheduleStore | None = None,
+        max_workers: int = 8,
+        end_event: Event | None = None,
+    ):
         if key is not self.__key:
             raise ValueError("Cannot instantiate a new instance of this class, use get_instance instead")
 
         self.__logger = logger
+        self.__store = store
 
         self.__tasks: dict[int, ScheduledTask] = {}
-        self.__check_interval = check_interval
+        self.__recurring_tasks: dict[int, ScheduledTask] = {}
+        self.__index = IntervalIndex()
+        self.__resource_indexes: dict[Hashable, IntervalIndex] = {}
+        self.__next_id = 0
+        self.__queue: list[tuple[datetime, int, int, int]] = []
+        self.__sequence = count()
+        self.__condition = Condition()
         self.__end_event = end_event or Event()
+        self.__max_workers = max_workers
+        self.__wakeups = 0
+        self.__version = 0
 
         self.__thread: Thread | None = None
+        self.__executor: ThreadPoolExecutor | None = None
 
     def __del__(self):
         self.stop()
 
+    @property
+    def wakeups(self) -> int:
+        return self.__wakeups
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented whenever a task is added, removed or changes state.
+        """
+        return self.__version
+
     def add_task(self, schedule: Schedule, task: Schedulable, id: int | None = None) -> int:
-        if id is None:
-            id = max(self.__tasks.keys(), default=-1) + 1
+        """
+        Raises:
+            TaskWithSameIdExists: If a task with the given id exists.
+            TaskOverlapsWithOtherTask: If the task overlaps with a task sharing one of its resources.
+            InsufficientStorage: If the task does not fit on the recordings disk and the storage policy rejects.
+        """
+        with self.__condition:
+            if id is None:
+                while self.__next_id in self.__tasks:
+                    self.__next_id += 1
+                id = self.__next_id
+
+            if id in self.__tasks:
+                raise TaskWithSameIdExists(f'Task with id {id} already exists', id=id)
+
+            scheduled_task = ScheduledTask(id, schedule, task)
+            existing_id = self.__find_overlap(scheduled_task)
+            if existing_id is not None:
+                raise TaskOverlapsWithOtherTask(f"Task overlaps with other task with id: {existing_id}", existing_id)
+
+            self.__check_storage(scheduled_task)
+            self.__insert(scheduled_task)
+            self.__changed("added", id)
 
-        if id in self.__tasks:
-            raise TaskWithSameIdExists(f'Task with id {id} already exists', id=id)
+        return id
+
+    def restore(self, task_resolver: Callable[[Schedule], Schedulable]):
+        """
+        Load the tasks that can still run from the store.
+
+        Tasks that should be running right now are due immediately, so the recording is resumed as soon as the
+        scheduler starts, unless it was force stopped before the restart.
+        """
+        if self.__store is None:
+            return
 
-        for existing_task in self.__tasks.values():
-            if existing_task.schedule.overlaps(schedule):
-                raise TaskOverlapsWithOtherTask(
-                    f"Task overlaps with other task with id: {existing_task.id}", existing_task.id
+        now = datetime.now(timezone.utc)
+        stored_tasks = self.__store.load(now)
+        with self.__condition:
+            for stored_task in stored_tasks:
+                try:
+                    task = task_resolver(stored_task.schedule)
+                except Exception as e:
+                    self.__logger.error(f"Cannot restore task {stored_task.id}: {getattr(e, 'message', e)}")
+                    continue
+
+                scheduled_task = ScheduledTask(
+                    stored_task.id,
+                    stored_task.schedule,
+                    task,
+                    occurrence=stored_task.occurrence,
+                    force_stopped=stored_task.force_stopped,
                 )
+                self.__insert(scheduled_task, now, persist=False)
 
-        self.__tasks[id] = ScheduledTask(id, schedule, task)
+            self.__next_id = max(self.__next_id, (self.__store.max_id() or -1) + 1)
 
-        return id
+        self.__logger.info(f"Restored {len(stored_tasks)} scheduled tasks")
 
     def remove_task(self, id: int, stop_task: bool = True):
-        if id not in self.__tasks:
-            raise TaskNotFound(f'Task with id {id} does not exist', id=id)
+        with self.__condition:
+            if id not in self.__tasks:
+                raise TaskNotFound(f'Task with id {id} does not exist', id=id)
 
-        if stop_task:
-            self.__tasks[id].stop()
+            scheduled_task = self.__tasks.pop(id)
+            self.__recurring_tasks.pop(id, None)
+            if id in self.__index:
+                self.__unindex(scheduled_task)
+            self.__condition.notify()
+
+            if self.__store is not None:
+                self.__store.delete(id)
 
-        del self.__tasks[id]
+            self.__changed("removed", id)
+
+        if stop_task:
+            scheduled_task.stop()
 
     def get_task(self, id: int) -> ScheduledTask:
         if id not in self.__tasks:
@@ -133,42 +341,278 @@ class Scheduler:
 
         return self.__tasks[id]
 
-    def get_tasks(self) -> list[ScheduledTask]:
-        return list(self.__tasks.values())
+    def get_tasks(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        after: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+        session: str | None = None,
+    ) -> list[ScheduledTask]:
+        """
+        Return the tasks intersecting [start, end] ordered by start time.
+
+        Args:
+            start (datetime | None): Lower bound of the time range, unbounded if None.
+            end (datetime | None): Upper bound of the time range, unbounded if None.
+            after (tuple[datetime, int] | None): (start_time, id) of the last task of the previous page.
+            limit (int | None): Maximum number of tasks to return.
+            session (str | None): Only return the tasks of this recording session if given.
+
+        Returns:
+            list[ScheduledTask]: The matching tasks.
+        """
+        with self.__condition:
+            tasks = (self.__tasks[id] for id in self.__index.range(start, end, after))
+            if session is not None:
+                tasks = (task for task in tasks if task.schedule.session == session)
+            return list(islice(tasks, limit))
 
     def start(self):
         self.__end_event.clear()
+        self.__executor = ThreadPoolExecutor(max_workers=self.__max_workers, thread_name_prefix="scheduler")
         self.__thread = Thread(target=self.__run, daemon=True)
         self.__thread.start()
 
     def stop(self):
         self.__end_event.set()
+        with self.__condition:
+            self.__condition.notify()
+
         if self.__thread is not None and self.__thread.is_alive():
             self.__thread.join()
 
-    def stop_running_task(self) -> bool:
-        for task in self.__tasks.values():
-            if task.is_running():
-                task.force_stop()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+
+        for task in self.get_tasks():
+            task.stop()
+
+    def stop_running_task(self, task: Schedulable | None = None) -> bool:
+        """
+        Force stop the first running task, only considering the tasks of the given Schedulable if one is given.
+        """
+        for scheduled_task in self.get_tasks():
+            if task is not None and scheduled_task.task is not task:
+                continue
+
+            if scheduled_task.is_running():
+                scheduled_task.force_stop()
+                with self.__condition:
+                    self.__save(scheduled_task)
+                    self.__changed("force_stopped", scheduled_task.id)
+                return True
+        return False
+
+    def restart_running_task(self, task: Schedulable, start_time: datetime, **kwargs) -> bool:
+        """
+        Restart the task if a scheduled task runs it, so the scheduled task still stops it at the end of its schedule.
+
+        Returns:
+            bool: Whether a scheduled task was running the task.
+        """
+        for scheduled_task in self.get_tasks():
+            if scheduled_task.task is task and scheduled_task.restart(start_time, **kwargs):
+                with self.__condition:
+                    self.__changed("restarted", scheduled_task.id)
                 return True
         return False
 
+    def __find_overlap(self, scheduled_task: ScheduledTask) -> int | None:
+        indexes = [self.__resource_indexes[r] for r in scheduled_task.resources if r in self.__resource_indexes]
+        recurring_tasks = [
+            existing_task
+            for existing_task in self.__recurring_tasks.values()
+            if not existing_task.resources.isdisjoint(scheduled_task.resources)
+        ]
+
+        rule = scheduled_task.recurrence
+        if rule is None:
+            start_time, end_time = scheduled_task.schedule.start_time, scheduled_task.schedule.end_time
+            existing_id = _first_overlap(indexes, start_time, end_time)
+            if existing_id is not None:
+                return existing_id
+
+            return next(
+                (
+                    task.id
+                    for task in recurring_tasks
+                    if task.recurrence.first_overlap(start_time, end_time) is not None
+                ),
+                None,
+            )
+
+        existing_id = next(
+            (task.id for task in recurring_tasks if rule.first_overlap_with_rule(task.recurrence) is not None), None
+        )
+        if existing_id is not None:
+            return existing_id
+
+        return _first_occurrence_overlap(rule, indexes)
+
+    def __check_storage(self, scheduled_task: ScheduledTask):
+        """
+        Check that the new task fits on the recordings disk together with the tasks that write before it ends.
+
+        Only the next occurrence of recurring tasks is counted, the following ones are written after retention had
+        the time to make room for them.
+        """
+        now = datetime.now(timezone.utc)
+        end_time = scheduled_task.schedule.end_time
+        # Summed by Schedulable, so every one of them is estimated once however many tasks it has
+        durations: dict[Schedulable, timedelta] = {}
+        for task in (scheduled_task, *(self.__tasks[id] for id in self.__index.range(now, end_time))):
+            schedule = task.schedule
+            if schedule.start_time < end_time and schedule.end_time > now:
+                duration = schedule.end_time - max(schedule.start_time, now)
+                durations[task.task] = durations.get(task.task, timedelta(0)) + duration
+
+        required_bytes = sum(task.estimated_bytes(duration) for task, duration in durations.items())
+        check_capacity(required_bytes, f"Task {scheduled_task.id} with the tasks before it", self.__logger)
+
+    def __index_task(self, scheduled_task: ScheduledTask, start_time: datetime, end_time: datetime):
+        self.__index.add(scheduled_task.id, start_time, end_time)
+        for resource in scheduled_task.resources:
+            self.__resource_indexes.setdefault(resource, IntervalIndex()).add(scheduled_task.id, start_time, end_time)
+
+    def __unindex(self, scheduled_task: ScheduledTask):
+        start_time = scheduled_task.schedule.start_time
+        self.__index.remove(scheduled_task.id, start_time)
+        for resource in scheduled_task.resources:
+            index = self.__resource_indexes[resource]
+            index.remove(scheduled_task.id, start_time)
+            if not len(index):
+                del self.__resource_indexes[resource]
+
+    def __insert(self, scheduled_task: ScheduledTask, now: datetime | None = None, persist: bool = True):
+        id = scheduled_task.id
+        schedule = scheduled_task.schedule
+
+        self.__tasks[id] = scheduled_task
+        self.__next_id = max(self.__next_id, id + 1)
+        if scheduled_task.recurrence is None:
+            self.__index_task(scheduled_task, schedule.start_time, schedule.end_time)
+            self.__push(scheduled_task.start_deadline, self.START, id)
+            self.__push(schedule.end_time, self.STOP, id)
+        else:
+            self.__recurring_tasks[id] = scheduled_task
+            self.__materialize(scheduled_task, now or datetime.now(timezone.utc), persist=False)
+
+        if persist:
+            self.__save(scheduled_task)
+
+    def __save(self, scheduled_task: ScheduledTask):
+        if self.__store is None or scheduled_task.id not in self.__tasks:
+            return
+
+        rule = scheduled_task.recurrence
+        if rule is None:
+            active_until = scheduled_task.schedule.end_time
+        else:
+            last_start = rule.last_start
+            active_until = None if last_start is None else last_start + rule.duration
+
+        self.__store.save(
+            scheduled_task.id,
+            scheduled_task.first_schedule,
+            occurrence=scheduled_task.occurrence,
+            force_stopped=scheduled_task.is_force_stopped(),
+            active_until=active_until,
+        )
+
+    def __materialize(self, scheduled_task: ScheduledTask, after: datetime, persist: bool = True):
+        """
+        Replace the current occurrence of a recurring task with the first one ending after the given time.
+        """
+        id = scheduled_task.id
+        occurrence = scheduled_task.recurrence.next_occurrence(after)
+        if occurrence is None:
+            # The series is over, the last occurrence stays listed like a finished one-off task
+            if id not in self.__index:
+                self.__index_task(scheduled_task, scheduled_task.schedule.start_time, scheduled_task.schedule.end_time)
+            return
+
+        if id in self.__index:
+            self.__unindex(scheduled_task)
+
+        n, start_time, end_time = occurrence
+        scheduled_task.advance(n, start_time, end_time)
+        self.__index_task(scheduled_task, start_time, end_time)
+        self.__push(scheduled_task.start_deadline, self.START, id)
+        self.__push(end_time, self.STOP, id)
+
+        if persist:
+            self.__save(scheduled_task)
+            self.__changed("advanced", id)
+
+    def __changed(self, action: str, id: int):
+        self.__version += 1
+        EventBus.get_instance().publish("schedule", {"action": action, "id": id, "version": self.__version})
+
+    def __push(self, deadline: datetime, action: int, id: int):
+        entry = (deadline, action, next(self.__sequence), id)
+        heapq.heappush(self.__queue, entry)
+        if self.__queue[0] is entry:
+            self.__condition.notify()
+
+    def __pop_due(self) -> list[tuple[int, ScheduledTask]]:
+        due = []
+        now = datetime.now(timezone.utc)
+        while self.__queue and self.__queue[0][0] <= now:
+            deadline, action, _, id = heapq.heappop(self.__queue)
+            scheduled_task = self.__tasks.get(id)
+            if scheduled_task is None:
+                continue
+
+            # Entries of an occurrence that has been replaced since are stale
+            if deadline == (
+                scheduled_task.start_deadline if action == self.START else scheduled_task.schedule.end_time
+            ):
+                due.append((action, scheduled_task))
+
+        return due
+
+    def __timeout(self) -> float | None:
+        if not self.__queue:
+            return None
+
+        # Condition.wait raises OverflowError past TIMEOUT_MAX, a deadline further away is waited for in steps
+        timeout = (self.__queue[0][0] - datetime.now(timezone.utc)).total_seconds()
+        return min(max(timeout, 0.0), TIMEOUT_MAX)
+
     def __run(self):
         while not self.__end_event.is_set():
-            for task in self.__tasks.values():
-                if task.is_due_to_start():
-                    try:
-                        task.start(task.schedule.start_time)
-                    except Exception as e:
-                        self.__logger.error(f"Error occured while starting a task: {e}")
-
-                elif task.is_due_to_stop():
-                    try:
-                        task.stop()
-                    except Exception as e:
-                        self.__logger.error(f"ScheduledTask.stop encountered an error: {e}")
-
-            self.__end_event.wait(self.__check_interval)
-
-        for task in self.__tasks.values():
-            task.stop()
+            with self.__condition:
+                due = self.__pop_due()
+                if not due:
+                    self.__condition.wait(self.__timeout())
+                    self.__wakeups += 1
+                    continue
+
+            for action, scheduled_task in due:
+                if action == self.START:
+                    self.__executor.submit(self.__start_task, scheduled_task)
+                else:
+                    self.__executor.submit(self.__stop_task, scheduled_task)
+
+    def __start_task(self, scheduled_task: ScheduledTask):
+        try:
+            schedule = scheduled_task.schedule
+            scheduled_task.start(schedule.start_time, end_time=schedule.end_time)
+        except Exception as e:
+            self.__logger.error(f"Error occured while starting a task: {e}")
+
+        with self.__condition:
+            self.__changed("started", scheduled_task.id)
+
+    def __stop_task(self, scheduled_task: ScheduledTask):
+        try:
+            scheduled_task.stop()
+        except Exception as e:
+            self.__logger.error(f"ScheduledTask.stop encountered an error: {e}")
+
+        with self.__condition:
+            self.__changed("stopped", scheduled_task.id)
+            if scheduled_task.recurrence is not None and self.__tasks.get(scheduled_task.id) is scheduled_task:
+                self.__materialize(scheduled_task, datetime.now(timezone.utc))
@@ -0,0 +1,58 @@
+import logging
+import shutil
+from datetime import timedelta
+
+from .config import SessionConfig, StoragePolicy, get_recording_config
+from .recording_catalog import RecordingCatalog
+from .utils.dir_creator import RECORDING_DIR
+
+GB = 1000**3
+
+
+class InsufficientStorage(Exception):
+    def __init__(self, message: str, required_bytes: int, available_bytes: int):
+        self.message = message
+        self.required_bytes = required_bytes
+        self.available_bytes = available_bytes
+        super().__init__(self.message)
+
+
+def estimate_bytes(config: SessionConfig, cameras: int, duration: timedelta) -> int:
+    """
+    Bytes a recording of the session writes, from the bitrate of its cameras.
+    """
+    return int(config.bitrate_mbps * 1_000_000 / 8 * cameras * max(duration.total_seconds(), 0))
+
+
+def available_bytes() -> int:
+    """
+    Bytes recordings can still be planned into: the free space of the recordings disk above the reserve, capped by
+    what is left of the quota.
+    """
+    storage = get_recording_config().storage
+    available = shutil.disk_usage(RECORDING_DIR).free - int(storage.reserve_gb * GB)
+    if storage.quota_gb is not None:
+        available = min(available, int(storage.quota_gb * GB) - RecordingCatalog.get_instance().size_bytes())
+
+    return max(available, 0)
+
+
+def check_capacity(required_bytes: int, what: str, logger: logging.Logger):
+    """
+    Check that the given number of bytes fits on the recordings disk, warning or failing by the storage policy.
+
+    Raises:
+        InsufficientStorage: If they do not fit and the policy rejects.
+    """
+    available = available_bytes()
+    if required_bytes <= available:
+        return
+
+    message = (
+        f"{what} needs an estimated {required_bytes / GB:.1f} GB of storage, "
+        f"only {available / GB:.1f} GB are available"
+    )
+    if get_recording_config().storage.policy == StoragePolicy.REJECT:
+        raise InsufficientStorage(message, required_bytes, available)
+
+    logger.warning(message)
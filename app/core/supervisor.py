@@ -0,0 +1,246 @@
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from threading import Event, Thread
+from typing import Callable
+
+from multiprocess.connection import wait
+from multiprocess.process import BaseProcess
+from multiprocess.synchronize import Event as ProcessEvent
+
+from .event_bus import EventBus
+from .metrics import MetricsRegistry
+from .process_context import get_worker_context
+
+
+class SupervisedWorker:
+    """
+    A recording worker and what its supervisor knows about it.
+
+    `spawn(segment, stop_event)` starts a new process of the worker, writing into the given segment and stopping
+    when the event is set. Every process gets its own stop event, so a stalled worker can be asked to stop
+    without touching the others.
+    """
+
+    def __init__(self, name: str, slot: int, spawn: Callable[[int, ProcessEvent], BaseProcess]):
+        self.name = name
+        self.slot = slot
+        self.spawn = spawn
+
+        self.process: BaseProcess | None = None
+        self.stop_event: ProcessEvent | None = None
+        self.segment = 0
+        self.restarts = 0
+        self.started_at = 0.0
+        # Consecutive failures without a frame in between, the restart backoff grows with them
+        self.failures = 0
+        self.restart_at: float | None = None
+        # Time of the last frame before the failure, until the restarted worker delivers its first frame
+        self.gap_started_at: float | None = None
+        self.gap_seconds = 0.0
+
+    def start(self, segment: int, stop_event: ProcessEvent | None = None):
+        self.segment = segment
+        self.stop_event = stop_event or get_worker_context().Event()
+        self.started_at = time.time()
+        self.process = self.spawn(segment, self.stop_event)
+
+    def stop(self, timeout: float | None = None):
+        if self.process is None:
+            return
+
+        self.stop_event.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(WorkerSupervisor.ESCALATION_GRACE)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class WorkerSupervisor:
+    """
+    Restarts the recording workers of a session that exited or stalled.
+
+    A worker is alive as long as its process runs and the `last_frame_timestamp_seconds` gauge of its metrics
+    slot keeps moving. A failed worker is stopped, given GRACE seconds to close its encoder, and restarted into
+    a new segment after a backoff that doubles with every consecutive failure up to MAX_BACKOFF, so a failure
+    is healed within STALL_TIMEOUT + GRACE + MAX_BACKOFF at worst.
+
+    Failures, restarts and the gaps they left in the recording, measured to within INTERVAL, are appended to
+    `supervisor.jsonl` in the recording directory.
+    """
+
+    INTERVAL: float = 1.0
+    STALL_TIMEOUT: float = 10.0
+    # Allowed time to the first frame of a process, which includes connecting and loading the model
+    STARTUP_TIMEOUT: float = 30.0
+    GRACE: float = 5.0
+    # Time a worker gets to exit after each escalation step of a stop
+    ESCALATION_GRACE: float = 2.0
+    MIN_BACKOFF: float = 1.0
+    MAX_BACKOFF: float = 30.0
+
+    def __init__(
+        self,
+        workers: list[SupervisedWorker],
+        metrics: MetricsRegistry,
+        recording_dir: str,
+        session: str,
+        logger: logging.Logger,
+    ):
+        self.workers = workers
+        self.__metrics = metrics
+        self.__journal_path = f"{recording_dir}/supervisor.jsonl"
+        self.__session = session
+        self.__logger = logger
+
+        self.__end_event = Event()
+        self.__thread: Thread | None = None
+
+    def start(self):
+        self.__end_event.clear()
+        self.__thread = Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout: float) -> dict[str, dict]:
+        """
+        Stop supervising and stop every worker at once.
+
+        Workers are signalled together and finish their files in parallel. The ones still running when the
+        timeout since the call ran out are terminated, which they handle like a stop, and killed
+        ESCALATION_GRACE later, so the stop returns within the timeout plus twice ESCALATION_GRACE.
+
+        Returns:
+            How long every worker took to exit, the escalation step it exited at and its exit code.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        self.__end_event.set()
+        if self.__thread is not None:
+            # A worker the thread is stopping after a failure is also signalled below
+            self.__thread.join(max(deadline - time.monotonic(), 0.0))
+            self.__thread = None
+
+        pending = {}
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.stop_event.set()
+                pending[worker.process.sentinel] = worker
+
+        report = {}
+        for escalation in ("none", "terminated", "killed"):
+            if escalation != "none":
+                self.__escalate(list(pending.values()), escalation)
+                deadline = time.monotonic() + self.ESCALATION_GRACE
+            self.__collect(pending, deadline, started, escalation, report)
+            if not pending:
+                break
+
+        for worker in pending.values():
+            report[worker.name] = {"stop_seconds": None, "escalation": "stuck", "exitcode": None}
+
+        for worker in self.workers:
+            if worker.name in report:
+                self.__record(worker, "stopped", **report[worker.name])
+
+        return report
+
+    @staticmethod
+    def __escalate(workers: list[SupervisedWorker], escalation: str):
+        for worker in workers:
+            if escalation == "terminated":
+                worker.process.terminate()
+            else:
+                worker.process.kill()
+
+    @staticmethod
+    def __collect(pending: dict, deadline: float, started: float, escalation: str, report: dict[str, dict]):
+        """
+        Wait until the deadline for the pending workers to exit, moving the ones that did into the report.
+        """
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+
+            for sentinel in wait(list(pending), remaining):
+                worker = pending.pop(sentinel)
+                worker.process.join()
+                report[worker.name] = {
+                    "stop_seconds": round(time.monotonic() - started, 3),
+                    "escalation": escalation,
+                    "exitcode": worker.process.exitcode,
+                }
+
+    def get_worker(self, name: str) -> SupervisedWorker | None:
+        return next((worker for worker in self.workers if worker.name == name), None)
+
+    def __run(self):
+        while not self.__end_event.wait(self.INTERVAL):
+            for worker in self.workers:
+                if self.__end_event.is_set():
+                    return
+
+                try:
+                    self.__check(worker)
+                except Exception as e:
+                    self.__logger.error("Supervising %s failed: %s", worker.name, e)
+
+    def __check(self, worker: SupervisedWorker):
+        now = time.time()
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                self.__restart(worker)
+            return
+
+        last_frame = self.__metrics.read_gauge(worker.slot, "last_frame_timestamp_seconds")
+        has_frame = last_frame >= worker.started_at
+        if has_frame and worker.gap_started_at is not None:
+            gap_seconds = last_frame - worker.gap_started_at
+            worker.gap_seconds += gap_seconds
+            self.__record(worker, "recovered", gap_seconds=round(gap_seconds, 3))
+            worker.gap_started_at = None
+            worker.failures = 0
+
+        if not worker.process.is_alive():
+            self.__fail(worker, "exited", last_frame if has_frame else None, exitcode=worker.process.exitcode)
+        elif has_frame and now - last_frame > self.STALL_TIMEOUT:
+            self.__fail(worker, "stalled", last_frame, stalled_seconds=round(now - last_frame, 3))
+        elif not has_frame and now - worker.started_at > self.STARTUP_TIMEOUT:
+            self.__fail(worker, "stalled", None, stalled_seconds=round(now - worker.started_at, 3))
+
+    def __fail(self, worker: SupervisedWorker, reason: str, last_frame: float | None, **details):
+        worker.stop(self.GRACE)
+        if worker.gap_started_at is None:
+            worker.gap_started_at = last_frame or worker.started_at
+
+        worker.failures += 1
+        backoff = min(self.MIN_BACKOFF * 2 ** (worker.failures - 1), self.MAX_BACKOFF)
+        worker.restart_at = time.time() + backoff
+        self.__logger.warning("Worker %s %s, restarting it in %.0f s", worker.name, reason, backoff)
+        self.__record(worker, reason, backoff_seconds=backoff, **details)
+
+    def __restart(self, worker: SupervisedWorker):
+        worker.restart_at = None
+        worker.restarts += 1
+        self.__metrics.inc(worker.slot, "worker_restarts")
+        worker.start(worker.segment + 1)
+        self.__logger.info("Worker %s restarted into segment %d", worker.name, worker.segment)
+        self.__record(worker, "restarted")
+
+    def __record(self, worker: SupervisedWorker, event: str, **details):
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "worker": worker.name,
+            "event": event,
+            "segment": worker.segment,
+            "restarts": worker.restarts,
+            **details,
+        }
+        with open(self.__journal_path, "a") as file:
+            file.write(json.dumps(entry) + "\n")
+
+        EventBus.get_instance().publish("worker", {**entry, "session": self.__session})
@@ -0,0 +1,274 @@
+import json
+import os
+import subprocess
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from threading import Lock
+from typing import NamedTuple
+
+from .processing_queue import low_priority
+from .recording_catalog import CAMERA_FILE_PATTERN
+
+JOURNAL_NAME = "timeline.jsonl"
+INDEX_NAME = "timeline.json"
+CLIPS_DIR_NAME = "clips"
+VERSION = 1
+
+# Supervisor events that mark a gap or a new segment in the camera files
+WORKER_EVENTS = ("exited", "stalled", "restarted", "recovered")
+
+
+class TimelineNotFound(Exception):
+    def __init__(self, message: str, recording_dir: str):
+        self.message = message
+        self.recording_dir = recording_dir
+        super().__init__(self.message)
+
+
+class TimelineEvent(NamedTuple):
+    time: float
+    kind: str
+    data: dict
+
+
+class TimelineFile(NamedTuple):
+    name: str
+    camera: int
+    segment: int
+    # Unix time of the file's first frame, and the keyframes as seconds into the file
+    start: float
+    duration: float
+    keyframes: list[float]
+
+
+class PresetInterval(NamedTuple):
+    preset: int
+    start: float
+    end: float
+
+
+class Clip(NamedTuple):
+    name: str
+    path: str
+    camera: int
+    segment: int
+    start: float
+    end: float
+
+
+class TimelineJournal:
+    """
+    Appends the events of a running recording to the journal the timeline index is built from.
+    """
+
+    def __init__(self, recording_dir: str):
+        self.path = f"{recording_dir}/{JOURNAL_NAME}"
+        self.__lock = Lock()
+
+    def record(self, kind: str, time: float, **data):
+        with self.__lock, open(self.path, "a") as file:
+            file.write(json.dumps({"time": time, "kind": kind, **data}) + "\n")
+
+
+class Timeline(NamedTuple):
+    events: list[TimelineEvent]
+    files: list[TimelineFile]
+    end: float | None
+
+    def preset_intervals(self) -> list[PresetInterval]:
+        """
+        The intervals the PTZ cameras spent on each preset, the last one lasting until the recording stopped.
+        """
+        changes = [event for event in self.events if event.kind == "ptz_preset"]
+        if not changes:
+            return []
+
+        ends = [change.time for change in changes[1:]] + [self.end if self.end is not None else changes[-1].time]
+        return [PresetInterval(int(change.data["preset"]), change.time, end) for change, end in zip(changes, ends)]
+
+
+def _read_jsonl(path: str) -> list[dict]:
+    try:
+        with open(path) as file:
+            return [json.loads(line) for line in file if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _probe_keyframes(path: str) -> tuple[list[float], float]:
+    """
+    Keyframe times and duration of a camera file, read from its packets without decoding any frame.
+    """
+    output = subprocess.run(
+        low_priority(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "packet=pts_time,flags:format=duration",
+                "-of",
+                "csv=p=0",
+                path,
+            ]
+        ),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    keyframes, duration = [], 0.0
+    for line in output.splitlines():
+        fields = line.strip().split(",")
+        if len(fields) >= 2:
+            if "K" in fields[1] and fields[0] not in ("", "N/A"):
+                keyframes.append(float(fields[0]))
+        elif fields[0] not in ("", "N/A"):
+            duration = float(fields[0])
+
+    return sorted(keyframes), duration
+
+
+def build_timeline(recording_dir: str) -> Timeline:
+    """
+    Build the timeline index of a stopped recording and save it next to its files.
+
+    Camera files are placed on the wall clock by the time their receiver wrote the first frame. Receivers write
+    frames at a constant rate, so a camera that dropped frames drifts behind the wall clock by the time it lost.
+
+    Raises:
+        TimelineNotFound: If the recording has no timeline journal.
+    """
+    journal = _read_jsonl(f"{recording_dir}/{JOURNAL_NAME}")
+    if not journal:
+        raise TimelineNotFound(f"Recording {os.path.basename(recording_dir)} has no timeline", recording_dir)
+
+    starts = {entry["file"]: entry["time"] for entry in journal if entry["kind"] == "segment_started"}
+    events = [
+        TimelineEvent(entry["time"], entry["kind"], {k: v for k, v in entry.items() if k not in ("time", "kind")})
+        for entry in journal
+        if entry["kind"] != "segment_started"
+    ]
+    for entry in _read_jsonl(f"{recording_dir}/supervisor.jsonl"):
+        if entry["event"] in WORKER_EVENTS:
+            time = datetime.fromisoformat(entry.pop("time")).timestamp()
+            events.append(TimelineEvent(time, "worker", entry))
+    events.sort(key=lambda event: event.time)
+
+    files = []
+    for name in sorted(starts):
+        match = CAMERA_FILE_PATTERN.match(name)
+        if match is None or not os.path.exists(f"{recording_dir}/{name}"):
+            continue
+        keyframes, duration = _probe_keyframes(f"{recording_dir}/{name}")
+        files.append(TimelineFile(name, int(match[1]), int(match[2] or 0), starts[name], duration, keyframes))
+
+    end = next((event.time for event in reversed(events) if event.kind == "recording_stopped"), None)
+    timeline = Timeline(events, files, end)
+
+    path = f"{recording_dir}/{INDEX_NAME}"
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(
+            {
+                "version": VERSION,
+                "events": [event._asdict() for event in events],
+                "files": [file._asdict() for file in files],
+                "end": end,
+            },
+            file,
+        )
+    os.replace(f"{path}.tmp", path)
+
+    return timeline
+
+
+def load_timeline(recording_dir: str) -> Timeline:
+    """
+    Return the timeline index of a recording, building it if the journal or a camera file changed since.
+
+    Raises:
+        TimelineNotFound: If the recording has no timeline journal.
+    """
+    path = f"{recording_dir}/{INDEX_NAME}"
+    try:
+        index_mtime = os.stat(path).st_mtime_ns
+        sources = [f"{recording_dir}/{JOURNAL_NAME}"] + [
+            entry.path for entry in os.scandir(recording_dir) if CAMERA_FILE_PATTERN.match(entry.name)
+        ]
+        if all(os.stat(source).st_mtime_ns <= index_mtime for source in sources if os.path.exists(source)):
+            with open(path) as file:
+                index = json.load(file)
+            if index["version"] == VERSION:
+                return Timeline(
+                    [TimelineEvent(**event) for event in index["events"]],
+                    [TimelineFile(**file) for file in index["files"]],
+                    index["end"],
+                )
+    except FileNotFoundError:
+        pass
+
+    return build_timeline(recording_dir)
+
+
+def cut_clips(recording_dir: str, start: float, end: float, cameras: list[int] | None = None) -> list[Clip]:
+    """
+    Cut the given wall clock range out of every camera file overlapping it, without re-encoding.
+
+    The range is widened to the keyframe at or before its start and the one at or after its end, so the clips
+    start on a keyframe and stream copy cuts them exactly. Clips already cut are reused.
+
+    Raises:
+        TimelineNotFound: If the recording has no timeline journal.
+        subprocess.CalledProcessError: If ffmpeg failed to cut a clip.
+    """
+    timeline = load_timeline(recording_dir)
+    os.makedirs(f"{recording_dir}/{CLIPS_DIR_NAME}", exist_ok=True)
+
+    clips = []
+    for file in timeline.files:
+        if cameras is not None and file.camera not in cameras:
+            continue
+        if not file.keyframes or start >= file.start + file.duration or end <= file.start:
+            continue
+
+        keyframes = file.keyframes
+        clip_start = keyframes[max(bisect_right(keyframes, start - file.start) - 1, 0)]
+        end_index = bisect_left(keyframes, end - file.start)
+        clip_end = keyframes[end_index] if end_index < len(keyframes) else file.duration
+
+        name = f"{os.path.splitext(file.name)[0]}_{round(clip_start * 1000)}-{round(clip_end * 1000)}.mp4"
+        path = f"{recording_dir}/{CLIPS_DIR_NAME}/{name}"
+        if not os.path.exists(path):
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-y",
+                    "-ss",
+                    f"{clip_start:.6f}",
+                    "-i",
+                    f"{recording_dir}/{file.name}",
+                    "-t",
+                    f"{clip_end - clip_start:.6f}",
+                    "-map",
+                    "0",
+                    "-c",
+                    "copy",
+                    "-avoid_negative_ts",
+                    "make_zero",
+                    "-movflags",
+                    "+faststart",
+                    f"{path}.part.mp4",
+                ],
+                capture_output=True,
+                check=True,
+            )
+            os.replace(f"{path}.part.mp4", path)
+
+        clips.append(Clip(name, path, file.camera, file.segment, file.start + clip_start, file.start + clip_end))
+
+    return clips
@@ -0,0 +1,23 @@
+import base64
+from datetime import datetime
+
+from .timezone import to_utc
+
+
+def encode_cursor(start_time: datetime, id: int) -> str:
+    raw = f"{to_utc(start_time).isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor created by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        start_time_str, id_str = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return to_utc(datetime.fromisoformat(start_time_str)), int(id_str)
+    except (UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
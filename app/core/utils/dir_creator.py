@@ -3,20 +3,26 @@ from datetime import datetime
 
 API_DIR = f"{os.getcwd()}/output/api"
 RECORDING_DIR = f"{os.getcwd()}/output/recordings"
+STATE_DIR = f"{os.getcwd()}/output/state"
 os.makedirs(API_DIR, exist_ok=True)
 os.makedirs(RECORDING_DIR, exist_ok=True)
+os.makedirs(STATE_DIR, exist_ok=True)
 
 
 def get_api_dir() -> str:
     return API_DIR
 
 
-def get_recording_dir_from_date_str(date_str: str) -> str:
-    recording_dir = f"{RECORDING_DIR}/{date_str}"
+def get_state_dir() -> str:
+    return STATE_DIR
+
+
+def get_recording_dir_from_date_str(date_str: str, session: str) -> str:
+    recording_dir = f"{RECORDING_DIR}/{session}/{date_str}"
     os.makedirs(recording_dir, exist_ok=True)
     return recording_dir
 
 
-def get_recording_dir_from_datetime(dt: datetime) -> str:
+def get_recording_dir_from_datetime(dt: datetime, session: str) -> str:
     date_str = f"{dt.astimezone().strftime('%Y%m%d_%H%M')}"
-    return get_recording_dir_from_date_str(date_str)
+    return get_recording_dir_from_date_str(date_str, session)
@@ -0,0 +1,33 @@
+import json
+import urllib.error
+import urllib.request
+
+
+class HttpRequestFailed(Exception):
+    def __init__(self, message: str, url: str):
+        self.message = message
+        self.url = url
+        super().__init__(self.message)
+
+
+def request(url: str, method: str = "GET", body: dict | None = None, timeout: float = 5.0) -> bytes:
+    """
+    Send a request with an optional JSON body and return the response body.
+
+    Raises:
+        HttpRequestFailed: If the server cannot be reached or does not answer with a 2xx status.
+    """
+    data = None if body is None else json.dumps(body).encode()
+    headers = {} if body is None else {"Content-Type": "application/json"}
+    http_request = urllib.request.Request(url, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        raise HttpRequestFailed(f"{method} {url} failed with status {e.code}: {e.read().decode(errors='replace')}", url)
+    except (urllib.error.URLError, OSError) as e:
+        raise HttpRequestFailed(f"{method} {url} failed: {e}", url)
+
+
+def request_json(url: str, method: str = "GET", body: dict | None = None, timeout: float = 5.0) -> dict:
+    return json.loads(request(url, method, body, timeout))
@@ -1,21 +1,30 @@
 import logging
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
+from multiprocess.queues import Queue
+
+from ..process_context import get_worker_context
 from .dir_creator import get_api_dir, get_recording_dir_from_date_str
 
 
-def get_recording_logger(start_time: datetime) -> logging.Logger:
+def get_recording_logger(start_time: datetime, session: str) -> logging.Logger:
     date_str = f"{start_time.astimezone().strftime('%Y%m%d_%H%M')}"
-    logger_name = f"ndi_recording_{date_str}"
+    logger_name = f"ndi_recording_{session}_{date_str}"
 
     logger = logging.getLogger(logger_name)
+    if logger.handlers:
+        return logger
+
     logger.setLevel(logging.DEBUG)
 
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
 
-    dir_path = get_recording_dir_from_date_str(date_str)
-    file_handler = logging.FileHandler(f"{dir_path}/run.log", mode="w")
+    dir_path = get_recording_dir_from_date_str(date_str, session)
+    # A recording resumed after a restart logs into the same directory, after the log of its first part
+    file_handler = logging.FileHandler(f"{dir_path}/run.log", mode="a")
     file_handler.setLevel(logging.DEBUG)
 
     formatter = logging.Formatter(
@@ -37,6 +46,9 @@ def get_api_logger() -> logging.Logger:
     logger_name = f"api_{date_str}"
 
     logger = logging.getLogger(logger_name)
+    if logger.handlers:
+        return logger
+
     logger.setLevel(logging.DEBUG)
 
     console_handler = logging.StreamHandler()
@@ -58,3 +70,63 @@ def get_api_logger() -> logging.Logger:
     logger.addHandler(file_handler)
 
     return logger
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most one record per message template and interval for warnings and below.
+
+    Suppressed records are only counted, and the next record let through for the template reports how many were
+    dropped, so a flapping source shows up as one line per interval instead of one per frame. Errors always pass.
+    """
+
+    def __init__(self, interval: float = 10.0):
+        super().__init__()
+        self.interval = interval
+        self.__last_emitted: dict[tuple[int, str], float] = {}
+        self.__suppressed: dict[tuple[int, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        key = (record.levelno, str(record.msg))
+        now = time.monotonic()
+        if now - self.__last_emitted.get(key, float("-inf")) < self.interval:
+            self.__suppressed[key] = self.__suppressed.get(key, 0) + 1
+            return False
+
+        self.__last_emitted[key] = now
+        if suppressed := self.__suppressed.pop(key, 0):
+            record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+
+        return True
+
+
+def start_log_listener(logger: logging.Logger) -> tuple[Queue, QueueListener]:
+    """
+    Start a listener writing the records sent by recording workers through the handlers of the given logger.
+
+    Returns:
+        The queue to hand to the workers and the listener, which has to be stopped once they have exited.
+    """
+    log_queue = get_worker_context().Queue()
+    listener = QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+    listener.start()
+
+    return log_queue, listener
+
+
+def get_worker_logger(name: str, log_queue: Queue) -> logging.Logger:
+    """
+    Logger for a recording worker process that only enqueues its records for the listener in the parent.
+    """
+    logger = logging.getLogger(f"ndi_recording.{name}")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+
+    handler = QueueHandler(log_queue)
+    handler.addFilter(RateLimitFilter())
+    logger.handlers = [handler]
+
+    return logger
@@ -0,0 +1,101 @@
+import queue
+from threading import Lock, Thread
+from typing import Any, Callable
+
+from multiprocess.queues import Queue
+
+from .process_context import get_worker_context
+
+
+class WorkerNotFound(Exception):
+    def __init__(self, message: str, worker: str):
+        self.message = message
+        self.worker = worker
+        super().__init__(self.message)
+
+
+class WorkerNotResponding(Exception):
+    def __init__(self, message: str, worker: str):
+        self.message = message
+        self.worker = worker
+        super().__init__(self.message)
+
+
+class WorkerCommandFailed(Exception):
+    def __init__(self, message: str, worker: str):
+        self.message = message
+        self.worker = worker
+        super().__init__(self.message)
+
+
+class WorkerControl:
+    """
+    Parent side of the control channel of one recording worker.
+
+    Requests are serialized per worker and matched to their reply by sequence number, so a reply arriving after
+    its request timed out is discarded instead of answering the next one.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        context = get_worker_context()
+        self.__commands = context.Queue()
+        self.__replies = context.Queue()
+        self.__lock = Lock()
+        self.__seq = 0
+
+    @property
+    def channel(self) -> tuple[Queue, Queue]:
+        """
+        The (commands, replies) queues to hand to the worker.
+        """
+        return self.__commands, self.__replies
+
+    def request(self, command: str, timeout: float, **params) -> Any:
+        with self.__lock:
+            self.__seq += 1
+            seq = self.__seq
+            self.__commands.put((seq, command, params))
+
+            while True:
+                try:
+                    reply_seq, ok, result = self.__replies.get(timeout=timeout)
+                except queue.Empty:
+                    raise WorkerNotResponding(f"Worker {self.name} did not answer '{command}' in time", self.name)
+
+                if reply_seq != seq:
+                    continue
+
+                if not ok:
+                    raise WorkerCommandFailed(result, self.name)
+
+                return result
+
+
+def serve_control(channel: tuple[Queue, Queue] | None, handlers: dict[str, Callable[..., Any]]) -> Thread | None:
+    """
+    Answer the commands sent through a WorkerControl from a daemon thread of the worker.
+
+    Handlers run outside the capture loop, which never waits on the control channel.
+    """
+    if channel is None:
+        return None
+
+    commands, replies = channel
+
+    def serve():
+        while (message := commands.get()) is not None:
+            seq, command, params = message
+            handler = handlers.get(command)
+            if handler is None:
+                replies.put((seq, False, f"Unknown command '{command}'"))
+                continue
+
+            try:
+                replies.put((seq, True, handler(**params)))
+            except Exception as e:
+                replies.put((seq, False, str(e)))
+
+    thread = Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
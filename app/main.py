@@ -1,12 +1,36 @@
+from contextlib import asynccontextmanager
+from threading import Thread
+
 from fastapi import FastAPI
 
 from .api import router as api_router
+from .api.dependencies import get_processing_queue, get_recording_catalog, get_retention_worker, get_scheduler
+from .api.metrics import router as metrics_router
+from .core.process_context import start_worker_server
 from .core.utils.custom_unique_id import custom_generate_unique_id
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reconcile the catalog with the disk before the restored schedule can start a recording
+    get_recording_catalog().sync()
+    # Restore the persisted schedule right away instead of on the first request
+    get_scheduler()
+    # Preload the recording workers' modules off the startup path
+    Thread(target=start_worker_server, daemon=True).start()
+    retention = get_retention_worker()
+    retention.start()
+    yield
+    retention.stop()
+    get_processing_queue().stop()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     generate_unique_id_function=custom_generate_unique_id,
     title="OXCAM",
     version="v0.2.0",
     contact={"name": "OX-IT", "email": "viktor.koch@oxit.hu"},
 )
 app.include_router(api_router)
+app.include_router(metrics_router)
@@ -0,0 +1,104 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from ..core.recording_state import RecordingState
+
+
+class AgentSessionSchema(BaseModel):
+    state: Annotated[
+        RecordingState,
+        Field(description="State of the session's recording on the agent", examples=[RecordingState.RECORDING]),
+    ]
+    armed: Annotated[
+        bool,
+        Field(description="Whether the agent waits for the start deadline of the session", examples=[False]),
+    ] = False
+    owner: Annotated[
+        int | None,
+        Field(description="ID of the scheduled task the recording runs for", examples=[None, 3]),
+    ] = None
+    error: Annotated[
+        str | None,
+        Field(description="The reason the recording failed", examples=[None, "Count not find enough sources."]),
+    ] = None
+
+
+class AgentHeartbeatSchema(BaseModel):
+    name: Annotated[
+        str,
+        Field(description="Name of the agent", examples=["recorder-1"]),
+    ]
+    url: Annotated[
+        str,
+        Field(description="URL the coordinator reaches the agent at", examples=["http://192.168.33.20:8100"]),
+    ]
+    capacity: Annotated[
+        int,
+        Field(ge=1, description="Number of cameras the agent can record at once", examples=[8]),
+    ]
+    load: Annotated[
+        int,
+        Field(ge=0, description="Number of cameras the agent records right now", examples=[4]),
+    ]
+    sessions: Annotated[
+        dict[str, AgentSessionSchema],
+        Field(description="The sessions the agent is configured with and their state"),
+    ]
+
+
+class AgentSchema(BaseModel):
+    name: Annotated[
+        str,
+        Field(description="Name of the agent", examples=["recorder-1"]),
+    ]
+    url: Annotated[
+        str,
+        Field(description="URL the coordinator reaches the agent at", examples=["http://192.168.33.20:8100"]),
+    ]
+    alive: Annotated[
+        bool,
+        Field(description="Whether the agent sent a heartbeat recently", examples=[True]),
+    ]
+    capacity: Annotated[
+        int,
+        Field(description="Number of cameras the agent can record at once", examples=[8]),
+    ]
+    load: Annotated[
+        int,
+        Field(description="Number of cameras the agent records", examples=[4]),
+    ]
+    clock_offset: Annotated[
+        float,
+        Field(description="Seconds the agent's clock is ahead of the coordinator's", examples=[0.0042]),
+    ]
+    rtt: Annotated[
+        float | None,
+        Field(description="Round trip time of the clock sample the offset was taken from", examples=[0.0011]),
+    ]
+    sessions: Annotated[
+        dict[str, AgentSessionSchema],
+        Field(description="The sessions the agent is configured with and their state"),
+    ]
+
+
+class AgentTimeSchema(BaseModel):
+    time: Annotated[
+        float,
+        Field(description="UNIX timestamp read from the agent's clock", examples=[1760781600.125]),
+    ]
+
+
+class SessionCommandSchema(BaseModel):
+    start_at: Annotated[
+        float | None,
+        Field(description="UNIX timestamp on the agent's clock to start at, now if missing", examples=[1760781600.0]),
+    ] = None
+    stop_at: Annotated[
+        float | None,
+        Field(description="UNIX timestamp on the agent's clock to stop at, never if missing", examples=[1760785200.0]),
+    ] = None
+    owner: Annotated[
+        int | None,
+        Field(description="ID of the scheduled task the command is sent for", examples=[None, 3]),
+    ] = None
@@ -2,8 +2,18 @@ from typing import Annotated
 
 from pydantic import BaseModel, Field
 
+from ..core.config import DEFAULT_SESSION, PanoConfig
+from ..core.recording_state import RecordingState
+
 
 class CameraStatus(BaseModel):
+    session: Annotated[
+        str,
+        Field(
+            description="Recording session of the status",
+            examples=[DEFAULT_SESSION, "court2"],
+        ),
+    ] = DEFAULT_SESSION
     recording: Annotated[
         bool,
         Field(
@@ -11,3 +21,66 @@ class CameraStatus(BaseModel):
             examples=[True, False],
         ),
     ]
+    state: Annotated[
+        RecordingState,
+        Field(
+            description="State of the recording",
+            examples=[RecordingState.RECORDING, RecordingState.STARTING],
+        ),
+    ] = RecordingState.IDLE
+
+
+class PanoSettingsSchema(BaseModel):
+    url: Annotated[
+        str,
+        Field(
+            description="URL of the panorama stream",
+            examples=["rtsp://192.168.33.103:554/media2/stream.sdp?profile=Profile200"],
+        ),
+    ]
+    config: Annotated[
+        PanoConfig,
+        Field(description="Ingest, detector and PTZ policy of the panorama worker"),
+    ]
+
+
+class PanoReconfigurationSchema(BaseModel):
+    model_swapped: Annotated[
+        bool,
+        Field(description="Whether a new model was loaded and the detector switched over to it", examples=[True]),
+    ]
+    reader_restarted: Annotated[
+        bool,
+        Field(description="Whether the worker connected to the stream anew for the change", examples=[False]),
+    ]
+    load_seconds: Annotated[
+        float,
+        Field(description="Seconds the new model took to load, next to the running one", examples=[4.2]),
+    ]
+
+
+class SessionNotFoundDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(description="The error that occured", examples=["Recording session court3 is not configured"]),
+    ]
+    session: Annotated[
+        str,
+        Field(description="Name of the session", examples=["court3"]),
+    ]
+
+
+class SessionNotFoundExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[404],
+        ),
+    ]
+    detail: Annotated[
+        SessionNotFoundDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
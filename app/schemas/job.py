@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from ..core.config import DEFAULT_SESSION
+from ..core.job_manager import JobKind, JobStage, JobState
+
+
+class JobSchema(BaseModel):
+    id: Annotated[
+        str,
+        Field(description="ID of the job", examples=["4f1c3a0f2c9e4b7d8a6e5d4c3b2a1f0e"]),
+    ]
+    kind: Annotated[
+        JobKind,
+        Field(description="What the job does", examples=[JobKind.START]),
+    ]
+    session: Annotated[
+        str,
+        Field(description="Recording session the job acts on", examples=[DEFAULT_SESSION, "court2"]),
+    ]
+    state: Annotated[
+        JobState,
+        Field(description="State of the job", examples=[JobState.RUNNING]),
+    ]
+    stage: Annotated[
+        JobStage,
+        Field(description="Progress of the job", examples=[JobStage.DISCOVERING, JobStage.RECORDING]),
+    ]
+    error: Annotated[
+        str | None,
+        Field(description="The reason the job failed", examples=[None, "Count not find enough sources."]),
+    ]
+    version: Annotated[
+        int,
+        Field(description="Incremented on every update of the job", examples=[0, 3]),
+    ]
+    created_at: Annotated[
+        datetime,
+        Field(description="Time the job was requested"),
+    ]
+    updated_at: Annotated[
+        datetime,
+        Field(description="Time of the last update of the job"),
+    ]
+
+
+class JobNotFoundDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(description="The error that occured", examples=["Job with the given id not found"]),
+    ]
+    id: Annotated[
+        str,
+        Field(description="The id of the job", examples=["4f1c3a0f2c9e4b7d8a6e5d4c3b2a1f0e"]),
+    ]
+
+
+class JobNotFoundExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[404],
+        ),
+    ]
+    detail: Annotated[
+        JobNotFoundDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
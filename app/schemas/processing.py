@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from ..core.config import DEFAULT_SESSION
+from ..core.processing_queue import ProcessingState
+
+
+class ProcessingJobSchema(BaseModel):
+    id: Annotated[
+        str,
+        Field(description="ID of the processing job", examples=["9b2d6e1f0a3c4d5e8f7a6b5c4d3e2f1a"]),
+    ]
+    session: Annotated[
+        str,
+        Field(description="Recording session of the processed recording", examples=[DEFAULT_SESSION, "court2"]),
+    ]
+    recording_id: Annotated[
+        int | None,
+        Field(description="ID of the processed recording in the catalog", examples=[12]),
+    ]
+    recording_dir: Annotated[
+        str,
+        Field(description="Directory of the processed recording"),
+    ]
+    step: Annotated[
+        str,
+        Field(description="Name of the processing step the job runs", examples=["proxy"]),
+    ]
+    state: Annotated[
+        ProcessingState,
+        Field(description="State of the job", examples=[ProcessingState.RUNNING, ProcessingState.PAUSED]),
+    ]
+    commands_done: Annotated[
+        int,
+        Field(description="Commands of the step that finished, one per camera for per-camera steps", examples=[2]),
+    ]
+    commands_total: Annotated[
+        int,
+        Field(description="Commands the step runs", examples=[4]),
+    ]
+    error: Annotated[
+        str | None,
+        Field(description="The reason the job failed", examples=[None, "ffmpeg exited with 1"]),
+    ]
+    version: Annotated[
+        int,
+        Field(description="Incremented on every update of the job", examples=[0, 3]),
+    ]
+    created_at: Annotated[
+        datetime,
+        Field(description="Time the job was queued"),
+    ]
+    updated_at: Annotated[
+        datetime,
+        Field(description="Time of the last update of the job"),
+    ]
+
+
+class ProcessingStatusSchema(BaseModel):
+    paused: Annotated[
+        bool,
+        Field(description="Whether processing is suspended because a live recording drops frames"),
+    ]
+    jobs: Annotated[
+        list[ProcessingJobSchema],
+        Field(description="The queued, running and last finished jobs, oldest first"),
+    ]
+
+
+class ProcessingJobNotFoundDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(description="The error that occured", examples=["Processing job with the given id not found"]),
+    ]
+    id: Annotated[
+        str,
+        Field(description="The id of the processing job", examples=["9b2d6e1f0a3c4d5e8f7a6b5c4d3e2f1a"]),
+    ]
+
+
+class ProcessingJobNotFoundExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[404],
+        ),
+    ]
+    detail: Annotated[
+        ProcessingJobNotFoundDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
@@ -0,0 +1,77 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+
+class AllocationSiteSchema(BaseModel):
+    location: Annotated[
+        str,
+        Field(description="Source line the memory was allocated on", examples=["/app/main.py:214"]),
+    ]
+    size_bytes: Annotated[
+        int,
+        Field(description="Bytes allocated at the site and still alive at the end of the profile", examples=[6220800]),
+    ]
+    count: Annotated[
+        int,
+        Field(description="Number of memory blocks allocated at the site", examples=[1]),
+    ]
+
+
+class ProfileSchema(BaseModel):
+    worker: Annotated[
+        str,
+        Field(description="Name of the profiled worker", examples=["pano", "cam0"]),
+    ]
+    samples: Annotated[
+        int,
+        Field(description="Number of stack samples taken", examples=[1850]),
+    ]
+    stacks: Annotated[
+        dict[str, int],
+        Field(
+            description="Collapsed stacks of the worker's main thread, root first, with their sample counts",
+            examples=[
+                {"<module> (main.py:1);pano_process (main.py:120);run (onnxruntime_inference_collection.py:220)": 1200}
+            ],
+        ),
+    ]
+    allocations: Annotated[
+        list[AllocationSiteSchema],
+        Field(description="Top allocation sites of the profiled window"),
+    ]
+    stacks_path: Annotated[
+        str,
+        Field(description="Path of the collapsed stacks file in the recording directory"),
+    ]
+    allocations_path: Annotated[
+        str,
+        Field(description="Path of the allocation report in the recording directory"),
+    ]
+
+
+class WorkerDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(description="The error that occured", examples=["No recording worker named cam3"]),
+    ]
+    worker: Annotated[
+        str,
+        Field(description="Name of the worker", examples=["cam3"]),
+    ]
+
+
+class WorkerExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[404, 500, 504],
+        ),
+    ]
+    detail: Annotated[
+        WorkerDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
@@ -0,0 +1,268 @@
+from datetime import datetime, timedelta
+from typing import Annotated
+
+from pydantic import BaseModel, Field, model_validator
+
+from ..core.config import DEFAULT_SESSION
+from ..core.recording_catalog import CatalogState
+
+
+class RecordingFileSchema(BaseModel):
+    name: Annotated[
+        str,
+        Field(description="Name of the file in the recording directory", examples=["cam0.mp4", "run.log"]),
+    ]
+    size_bytes: Annotated[
+        int,
+        Field(description="Size of the file", examples=[21474836480]),
+    ]
+    modified_at: Annotated[
+        datetime,
+        Field(description="Time of the last write of the file"),
+    ]
+    camera: Annotated[
+        int | None,
+        Field(description="Index of the camera for video files", examples=[0, None]),
+    ]
+    segment: Annotated[
+        int | None,
+        Field(description="Segment of the camera's recording, restarted receivers write new ones", examples=[0, 1]),
+    ]
+
+
+class RecordingSchema(BaseModel):
+    id: Annotated[
+        int,
+        Field(description="ID of the recording", examples=[12]),
+    ]
+    session: Annotated[
+        str,
+        Field(description="Recording session of the recording", examples=[DEFAULT_SESSION, "court2"]),
+    ]
+    name: Annotated[
+        str,
+        Field(description="Name of the recording directory", examples=["20251018_1900"]),
+    ]
+    state: Annotated[
+        CatalogState,
+        Field(description="Whether the recording is still running", examples=[CatalogState.COMPLETE]),
+    ]
+    start_time: Annotated[
+        datetime,
+        Field(description="Start time of the recording"),
+    ]
+    end_time: Annotated[
+        datetime | None,
+        Field(description="End time of the recording, missing while it runs"),
+    ]
+    duration: Annotated[
+        timedelta | None,
+        Field(description="Duration of the recording, missing while it runs"),
+    ]
+    schedule_id: Annotated[
+        int | None,
+        Field(description="ID of the scheduled task that started the recording", examples=[3, None]),
+    ]
+    cameras: Annotated[
+        int,
+        Field(description="Number of cameras recorded", examples=[4]),
+    ]
+    size_bytes: Annotated[
+        int,
+        Field(description="Size of all files of the recording", examples=[85899345920]),
+    ]
+    health: Annotated[
+        dict[str, dict[str, float]],
+        Field(
+            description="Counters of every worker at the end of the recording and the seconds lost to restarts",
+            examples=[{"cam0": {"frames_written": 162000, "frames_dropped": 12, "worker_restarts": 0}}],
+        ),
+    ]
+
+
+class RecordingDetailSchema(RecordingSchema):
+    files: Annotated[
+        list[RecordingFileSchema],
+        Field(description="Files of the recording"),
+    ]
+
+
+class RecordingNotFoundDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(description="The error that occured", examples=["Recording with id 12 does not exist"]),
+    ]
+    id: Annotated[
+        int,
+        Field(description="The id of the recording", examples=[12]),
+    ]
+    name: Annotated[
+        str | None,
+        Field(description="Name of the requested file", examples=[None, "cam0.mp4"]),
+    ] = None
+
+
+class RecordingNotFoundExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[404],
+        ),
+    ]
+    detail: Annotated[
+        RecordingNotFoundDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
+
+
+class TimelineEventSchema(BaseModel):
+    time: Annotated[
+        datetime,
+        Field(description="Time of the event"),
+    ]
+    kind: Annotated[
+        str,
+        Field(
+            description="What happened: recording_started, recording_stopped, ptz_preset or worker",
+            examples=["ptz_preset"],
+        ),
+    ]
+    data: Annotated[
+        dict,
+        Field(description="Details of the event", examples=[{"preset": 0}]),
+    ]
+
+
+class PresetIntervalSchema(BaseModel):
+    preset: Annotated[
+        int,
+        Field(description="Preset the PTZ cameras were on, the third of the court play was in", examples=[0]),
+    ]
+    start: Annotated[
+        datetime,
+        Field(description="Time the preset was called"),
+    ]
+    end: Annotated[
+        datetime,
+        Field(description="Time the next preset was called or the recording stopped"),
+    ]
+
+
+class TimelineFileSchema(BaseModel):
+    name: Annotated[
+        str,
+        Field(description="Name of the camera file", examples=["cam0.mp4"]),
+    ]
+    camera: Annotated[
+        int,
+        Field(description="Index of the camera", examples=[0]),
+    ]
+    segment: Annotated[
+        int,
+        Field(description="Segment of the camera's recording", examples=[0]),
+    ]
+    start: Annotated[
+        datetime,
+        Field(description="Time of the file's first frame"),
+    ]
+    duration: Annotated[
+        float,
+        Field(description="Duration of the file in seconds", examples=[7200.0]),
+    ]
+    keyframes: Annotated[
+        int,
+        Field(description="Number of keyframes clips can start at", examples=[864]),
+    ]
+
+
+class TimelineSchema(BaseModel):
+    events: Annotated[
+        list[TimelineEventSchema],
+        Field(description="Events of the recording in time order"),
+    ]
+    presets: Annotated[
+        list[PresetIntervalSchema],
+        Field(description="Intervals the PTZ cameras spent on each preset"),
+    ]
+    files: Annotated[
+        list[TimelineFileSchema],
+        Field(description="Camera files placed on the timeline"),
+    ]
+
+
+class ClipRequestSchema(BaseModel):
+    start: Annotated[
+        datetime,
+        Field(description="Start of the clip, moved back to the keyframe before it"),
+    ]
+    end: Annotated[
+        datetime,
+        Field(description="End of the clip, moved forward to the keyframe after it"),
+    ]
+    cameras: Annotated[
+        list[int] | None,
+        Field(description="Cameras to cut the clip from, all of them if not given", examples=[None, [0, 2]]),
+    ] = None
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.start >= self.end:
+            raise ValueError("start must be before end")
+        return self
+
+
+class ClipSchema(BaseModel):
+    name: Annotated[
+        str,
+        Field(description="Name of the clip, to download it with", examples=["cam0_1812000-1874000.mp4"]),
+    ]
+    camera: Annotated[
+        int,
+        Field(description="Index of the camera", examples=[0]),
+    ]
+    segment: Annotated[
+        int,
+        Field(description="Segment of the camera's recording the clip was cut from", examples=[0]),
+    ]
+    start: Annotated[
+        datetime,
+        Field(description="Time of the clip's first frame"),
+    ]
+    end: Annotated[
+        datetime,
+        Field(description="Time of the clip's end"),
+    ]
+    size_bytes: Annotated[
+        int,
+        Field(description="Size of the clip", examples=[310000000]),
+    ]
+
+
+class ClipFailedDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(description="The error that occured", examples=["ffmpeg failed to cut cam0.mp4: moov atom not found"]),
+    ]
+    id: Annotated[
+        int,
+        Field(description="The id of the recording", examples=[12]),
+    ]
+
+
+class ClipFailedExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[500],
+        ),
+    ]
+    detail: Annotated[
+        ClipFailedDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta, timezone
-from typing import Annotated
+from typing import Annotated, Literal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing_extensions import Self
 
+from ..core.config import DEFAULT_SESSION, SESSION_NAME_PATTERN
 from ..core.utils.timezone import to_utc
 
 
@@ -99,6 +101,17 @@ class OverlappingScheduleDetailSchema(BaseModel):
     ]
 
 
+class InvalidScheduleCursorDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(description="The error that occured", examples=["Invalid pagination cursor"]),
+    ]
+    cursor: Annotated[
+        str,
+        Field(description="The cursor that could not be decoded", examples=["not-a-cursor"]),
+    ]
+
+
 class ScheduledTaskIsInThePastExceptionSchema(BaseModel):
     status_code: Annotated[
         int,
@@ -147,6 +160,22 @@ class ScheduleNotFoundExceptionSchema(BaseModel):
     ]
 
 
+class InvalidScheduleCursorExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[400],
+        ),
+    ]
+    detail: Annotated[
+        InvalidScheduleCursorDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
+
+
 class ScheduleOverlapsExceptionSchema(BaseModel):
     status_code: Annotated[
         int,
@@ -163,6 +192,84 @@ class ScheduleOverlapsExceptionSchema(BaseModel):
     ]
 
 
+class Recurrence(BaseModel):
+    frequency: Annotated[
+        Literal["daily", "weekly"],
+        Field(description="How often the schedule repeats", examples=["weekly"]),
+    ]
+    interval: Annotated[
+        int,
+        Field(ge=1, description="Repeat every `interval` days or weeks", examples=[1, 2]),
+    ] = 1
+    by_weekday: Annotated[
+        list[int] | None,
+        Field(
+            description="Weekdays of a weekly schedule (0 is Monday), must contain the weekday of start_time",
+            examples=[[1, 3]],
+        ),
+    ] = None
+    count: Annotated[
+        int | None,
+        Field(ge=1, description="Number of occurrences, exceptions included", examples=[20]),
+    ] = None
+    until: Annotated[
+        datetime | None,
+        Field(
+            description="No occurrence starts after this time",
+            examples=[(datetime.now(timezone.utc) + timedelta(days=120)).isoformat()],
+        ),
+    ] = None
+    exceptions: Annotated[
+        list[datetime],
+        Field(
+            description="Start times of occurrences that are skipped",
+            examples=[[(datetime.now(timezone.utc) + timedelta(days=7, minutes=15)).isoformat()]],
+        ),
+    ] = []
+    timezone: Annotated[
+        str,
+        Field(description="IANA time zone the schedule repeats in", examples=["Europe/Budapest", "UTC"]),
+    ] = "UTC"
+
+    @field_validator("by_weekday")
+    @classmethod
+    def validate_by_weekday(cls, by_weekday: list[int] | None) -> list[int] | None:
+        if by_weekday is None:
+            return None
+
+        if not by_weekday or any(weekday < 0 or weekday > 6 for weekday in by_weekday):
+            raise ValueError("by_weekday should contain weekdays between 0 (Monday) and 6 (Sunday).")
+
+        return sorted(set(by_weekday))
+
+    @field_validator("until")
+    @classmethod
+    def validate_until(cls, until: datetime | None) -> datetime | None:
+        return None if until is None else to_utc(until)
+
+    @field_validator("exceptions")
+    @classmethod
+    def validate_exceptions(cls, exceptions: list[datetime]) -> list[datetime]:
+        return [to_utc(exception) for exception in exceptions]
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, tz: str) -> str:
+        try:
+            ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone: {tz}")
+
+        return tz
+
+    @model_validator(mode="after")
+    def validate_recurrence(self) -> Self:
+        if self.by_weekday is not None and self.frequency != "weekly":
+            raise ValueError("by_weekday can only be used with a weekly frequency.")
+
+        return self
+
+
 class Schedule(BaseModel):
     start_time: Annotated[
         datetime,
@@ -178,6 +285,18 @@ class Schedule(BaseModel):
             examples=[(datetime.now(timezone.utc) + timedelta(hours=2)).isoformat()],
         ),
     ]
+    recurrence: Annotated[
+        Recurrence | None,
+        Field(description="Repeats the schedule, start_time and end_time being its first occurrence"),
+    ] = None
+    session: Annotated[
+        str,
+        Field(
+            pattern=SESSION_NAME_PATTERN,
+            description="Recording session the schedule records with",
+            examples=[DEFAULT_SESSION, "court2"],
+        ),
+    ] = DEFAULT_SESSION
 
     def overlaps(self, other: Self) -> bool:
         return (
@@ -209,6 +328,18 @@ class SetSchedule(BaseModel):
             ],
         ),
     ]
+    recurrence: Annotated[
+        Recurrence | None,
+        Field(description="Repeats the schedule, start_time and end_time being its first occurrence"),
+    ] = None
+    session: Annotated[
+        str,
+        Field(
+            pattern=SESSION_NAME_PATTERN,
+            description="Recording session the schedule records with",
+            examples=[DEFAULT_SESSION, "court2"],
+        ),
+    ] = DEFAULT_SESSION
 
     @model_validator(mode="before")
     @classmethod
@@ -221,4 +352,28 @@ class SetSchedule(BaseModel):
         if end_time < start_time:
             raise ValueError("end_time should be greater than start_time.")
 
-        return {"start_time": start_time, "end_time": end_time}
+        return {
+            "start_time": start_time,
+            "end_time": end_time,
+            "recurrence": data.get("recurrence"),
+            "session": data.get("session", DEFAULT_SESSION),
+        }
+
+    @model_validator(mode="after")
+    def validate_recurrence(self) -> Self:
+        if self.recurrence is None:
+            return self
+
+        period_days = self.recurrence.interval * (7 if self.recurrence.frequency == "weekly" else 1)
+        weekdays = self.recurrence.by_weekday or [0]
+        gap_days = min([b - a for a, b in zip(weekdays, weekdays[1:])] + [period_days - weekdays[-1] + weekdays[0]])
+
+        if self.recurrence.by_weekday is not None:
+            weekday = self.start_time.astimezone(ZoneInfo(self.recurrence.timezone)).weekday()
+            if weekday not in self.recurrence.by_weekday:
+                raise ValueError("by_weekday should contain the weekday of start_time.")
+
+        if self.end_time - self.start_time >= timedelta(days=gap_days):
+            raise ValueError("A recurring schedule should end before its next occurrence starts.")
+
+        return self
@@ -33,3 +33,10 @@ class ScheduledTaskSchema(BaseModel):
             examples=[False, True],
         ),
     ]
+    occurrence: Annotated[
+        int | None,
+        Field(
+            description="Index of the current occurrence of a recurring schedule",
+            examples=[None, 0, 12],
+        ),
+    ] = None
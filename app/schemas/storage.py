@@ -0,0 +1,39 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+
+class InsufficientStorageDetailSchema(BaseModel):
+    error: Annotated[
+        str,
+        Field(
+            description="The error that occured",
+            examples=[
+                "Task 3 with the tasks before it needs an estimated 144.0 GB of storage, only 90.2 GB are available"
+            ],
+        ),
+    ]
+    required_bytes: Annotated[
+        int,
+        Field(description="Estimated size of the recordings the task has to fit with", examples=[144000000000]),
+    ]
+    available_bytes: Annotated[
+        int,
+        Field(description="Bytes recordings can still be planned into", examples=[90200000000]),
+    ]
+
+
+class InsufficientStorageExceptionSchema(BaseModel):
+    status_code: Annotated[
+        int,
+        Field(
+            description="Status code of the exception",
+            examples=[507],
+        ),
+    ]
+    detail: Annotated[
+        InsufficientStorageDetailSchema,
+        Field(
+            description="The details of the error",
+        ),
+    ]
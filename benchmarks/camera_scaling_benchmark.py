@@ -0,0 +1,87 @@
+"""
+Camera scaling benchmark.
+
+Runs 1..N synthetic receiver workers side by side and reports the throughput every camera sustains. A synthetic
+receiver does what ndi_receiver_process does per frame without NDI or a GPU: it copies the BGR planes out of a
+1080p BGRX frame and writes them into the stdin pipe of a child process standing in for ffmpeg. Each camera
+count is measured with free-floating workers and with the CPU placement used for recordings.
+
+Usage:
+    python -m benchmarks.camera_scaling_benchmark --max-cameras 8 --duration 5
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import multiprocess
+import numpy as np
+
+from app.core.cpu_placement import numa_nodes, pin_to_cpus, plan_placement
+
+WIDTH, HEIGHT = 1920, 1080
+SINK = [
+    sys.executable,
+    "-c",
+    "import sys, shutil; shutil.copyfileobj(sys.stdin.buffer, open('/dev/null', 'wb'), 1 << 20)",
+]
+
+
+def receiver(duration: float, cpus: list[int] | None, results, idx: int):
+    pin_to_cpus(cpus)
+    sink = subprocess.Popen(SINK, stdin=subprocess.PIPE)
+    ndi_frame = np.random.randint(0, 255, (HEIGHT, WIDTH, 4), dtype=np.uint8)
+
+    frames = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        frame = np.copy(ndi_frame[:, :, :3])
+        sink.stdin.write(frame.tobytes())
+        frames += 1
+    elapsed = time.perf_counter() - started
+
+    sink.stdin.close()
+    sink.wait()
+    results[idx] = frames / elapsed
+
+
+def run(cameras: int, duration: float, pinned: bool) -> list[float] | None:
+    placement = plan_placement(cameras) if pinned else None
+    if pinned and placement is None:
+        return None
+
+    receiver_cpus = placement[1] if placement is not None else [None] * cameras
+    context = multiprocess.get_context("forkserver")
+    results = context.Array("d", cameras)
+    processes = [
+        context.Process(target=receiver, args=(duration, receiver_cpus[idx], results, idx)) for idx in range(cameras)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    return list(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-cameras", type=int, default=8, help="Largest number of cameras to run")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds every camera count runs for")
+    args = parser.parse_args()
+
+    print(f"NUMA nodes: {numa_nodes()}")
+    print(f"{'cameras':>7}  {'placement':<9}  {'min fps':>8}  {'mean fps':>8}  {'total fps':>9}")
+    for cameras in range(1, args.max_cameras + 1):
+        for pinned in (False, True):
+            fps = run(cameras, args.duration, pinned)
+            label = "pinned" if pinned else "floating"
+            if fps is None:
+                print(f"{cameras:>7}  {label:<9}  not enough CPUs to pin {cameras} receivers and the panorama")
+                continue
+            print(f"{cameras:>7}  {label:<9}  {min(fps):8.1f}  {sum(fps) / len(fps):8.1f}  {sum(fps):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
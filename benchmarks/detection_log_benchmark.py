@@ -0,0 +1,53 @@
+"""
+Detection log benchmark.
+
+Appends synthetic detector outputs to a detection log the way the panorama worker does and reports the cost per
+frame, then reads the whole log back through the memory-mapped reader.
+
+Usage:
+    python -m benchmarks.detection_log_benchmark --frames 108000 --detections 300
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.detection_log import DetectionLog, DetectionLogWriter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=108000, help="Frames to log, two hours at 15 fps by default")
+    parser.add_argument("--detections", type=int, default=300, help="Detections the model returns per frame")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Shaped like the detector's outputs, with a batch dimension
+    boxes = rng.uniform(0, 2200, (1, args.detections, 4)).astype(np.float32)
+    labels = rng.integers(0, 4, (1, args.detections))
+    scores = rng.uniform(0, 1, (1, args.detections)).astype(np.float32)
+    bucket_counts = np.array([3, 5, 2])
+
+    with tempfile.TemporaryDirectory() as directory:
+        writer = DetectionLogWriter(directory)
+        started = time.perf_counter()
+        for idx in range(args.frames):
+            writer.append(time.time(), boxes, labels, scores, bucket_counts, 1, 1, 1 if idx % 100 == 0 else -1)
+        writer.close()
+        elapsed = time.perf_counter() - started
+        print(f"append: {elapsed / args.frames * 1e6:.1f} us/frame")
+
+        started = time.perf_counter()
+        log = DetectionLog(directory)
+        players = int(np.count_nonzero((log.labels == 2) & (log.scores > 0.5)))
+        changes = len(log.preset_changes())
+        print(
+            f"read: {len(log)} frames, {len(log.scores)} detections, {players} players, {changes} preset changes "
+            f"in {time.perf_counter() - started:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
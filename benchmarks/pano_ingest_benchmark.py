@@ -0,0 +1,65 @@
+"""
+Panorama ingest benchmark.
+
+Reads a panorama stream or file with both ingest modes of the panorama worker and reports the frame rate each
+sustains and the CPU time it costs per frame, the decoder's included. Frames are read as fast as they come, so
+point it at a file or a live stream faster than the analyzed rate.
+
+Usage:
+    python -m benchmarks.pano_ingest_benchmark rtsp://... --frames 300
+"""
+
+import argparse
+import resource
+import time
+
+import numpy as np
+
+from app.core.config import PanoConfig, PanoIngest
+from main import FFmpegPanoramaReader, OpenCVPanoramaReader
+
+
+def cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run(url: str, ingest: PanoIngest, frames: int) -> tuple[int, float, float]:
+    # No rate limit, the benchmark measures how fast frames can be brought to the detector's input
+    config = PanoConfig(ingest=ingest, fps=60)
+    reader = FFmpegPanoramaReader(url, config) if ingest == PanoIngest.FFMPEG else OpenCVPanoramaReader(url, config)
+
+    read = 0
+    started, cpu_started = time.perf_counter(), cpu_seconds()
+    try:
+        while read < frames:
+            frame = reader.read()
+            if frame is None:
+                break
+            np.ascontiguousarray(reader.prepare(frame))
+            read += 1
+    finally:
+        reader.release()
+
+    # The ffmpeg child only shows up in the children's usage once it has been waited for
+    return read, time.perf_counter() - started, cpu_seconds() - cpu_started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url", help="Panorama stream or video file")
+    parser.add_argument("--frames", type=int, default=300, help="Frames to read with every ingest mode")
+    args = parser.parse_args()
+
+    print(f"{'ingest':<8}  {'frames':>6}  {'fps':>7}  {'cpu ms/frame':>12}")
+    for ingest in PanoIngest:
+        read, elapsed, cpu = run(args.url, ingest, args.frames)
+        if not read:
+            print(f"{ingest.value:<8}  no frame could be read")
+            continue
+        print(f"{ingest.value:<8}  {read:>6}  {read / elapsed:7.1f}  {cpu / read * 1000:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
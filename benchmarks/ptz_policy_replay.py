@@ -0,0 +1,148 @@
+"""
+PTZ policy replay.
+
+Replays the bucket counts of a recording's detection log through PTZ policies and reports, for every policy,
+how often it switched presets and how fast it followed the play.
+
+The play is taken to be in the bucket with the most players over a centered window of `--reference-window`
+seconds, and to have moved once a new bucket held that lead for `--hold` seconds. Reaction latency is the time
+from such a move to the policy switching to the new bucket; moves it never followed before the next one are
+missed. Time on target is the share of frames the policy's preset matched the play.
+
+Usage:
+    python -m benchmarks.ptz_policy_replay output/recordings/default/20251019_1900 \\
+        --policy '{"policy": "mode"}' \\
+        --policy '{"policy": "hysteresis", "window": 12, "margin": 3, "dwell_seconds": 3}'
+"""
+
+import argparse
+
+import numpy as np
+
+from app.core.config import PtzPolicyConfig, PtzPolicyKind
+from app.core.detection_log import DetectionLog
+from app.core.ptz_policy import INITIAL_PRESET, create_ptz_policy
+
+
+def reference_targets(
+    timestamps: np.ndarray, bucket_counts: np.ndarray, window: float, hold: float
+) -> tuple[np.ndarray, list[tuple[float, int]]]:
+    """
+    The bucket the play is in at every frame, and the times it moved to another bucket.
+    """
+    cumulative = np.vstack([np.zeros((1, 3)), np.cumsum(bucket_counts, axis=0)])
+    starts = np.searchsorted(timestamps, timestamps - window / 2)
+    ends = np.searchsorted(timestamps, timestamps + window / 2, side="right")
+    totals = cumulative[ends] - cumulative[starts]
+    # Windows without any player keep the leader before them
+    leaders = np.r_[INITIAL_PRESET, np.argmax(totals, axis=1)]
+    filled = np.r_[0, np.where(totals.sum(axis=1) > 0, np.arange(1, len(totals) + 1), 0)]
+    leaders = leaders[np.maximum.accumulate(filled)][1:]
+
+    targets = np.empty(len(timestamps), np.int64)
+    moves = []
+    target, run_start = INITIAL_PRESET, 0
+    # Runs of the same leader, a run shorter than the hold is part of the target before it
+    boundaries = np.flatnonzero(np.diff(leaders)) + 1
+    for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(leaders)]):
+        leader = int(leaders[start])
+        if leader != target and timestamps[end - 1] - timestamps[start] >= hold:
+            targets[run_start:start] = target
+            target, run_start = leader, start
+            moves.append((float(timestamps[start]), leader))
+    targets[run_start:] = target
+
+    return targets, moves
+
+
+def replay(config: PtzPolicyConfig, timestamps: np.ndarray, bucket_counts: np.ndarray) -> np.ndarray:
+    """
+    The preset a policy has the cameras on after every frame.
+    """
+    policy = create_ptz_policy(config)
+    positions = np.empty(len(timestamps), np.int64)
+    for idx, (timestamp, counts) in enumerate(zip(timestamps.tolist(), bucket_counts)):
+        policy.update(timestamp, counts)
+        positions[idx] = policy.position
+
+    return positions
+
+
+def recorded_positions(log: DetectionLog) -> np.ndarray:
+    """
+    The preset the recording's own policy had the cameras on after every frame.
+    """
+    presets = np.asarray(log.preset, np.int64)
+    changes = np.flatnonzero(presets >= 0)
+    positions = np.full(len(presets), INITIAL_PRESET, np.int64)
+    for start, end in zip(changes, np.r_[changes[1:], len(presets)]):
+        positions[start:end] = presets[start]
+
+    return positions
+
+
+def evaluate(
+    positions: np.ndarray, timestamps: np.ndarray, targets: np.ndarray, moves: list[tuple[float, int]]
+) -> dict[str, float]:
+    latencies, missed = [], 0
+    move_times = [time for time, _ in moves] + [float("inf")]
+    for (time, bucket), next_time in zip(moves, move_times[1:]):
+        start, end = np.searchsorted(timestamps, [time, next_time])
+        followed = np.flatnonzero(positions[start:end] == bucket)
+        if len(followed) == 0:
+            missed += 1
+        else:
+            latencies.append(timestamps[start + followed[0]] - time)
+
+    duration = max(timestamps[-1] - timestamps[0], 1e-9)
+    switches = int(np.count_nonzero(np.diff(positions))) + int(positions[0] != INITIAL_PRESET)
+    return {
+        "switches": switches,
+        "switches_per_min": switches / duration * 60,
+        "moves": len(moves),
+        "missed": missed,
+        "latency_p50": float(np.percentile(latencies, 50)) if latencies else float("nan"),
+        "latency_p90": float(np.percentile(latencies, 90)) if latencies else float("nan"),
+        "on_target": float(np.mean(positions == targets)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording_dir", help="Recording directory holding the detection log")
+    parser.add_argument(
+        "--policy",
+        action="append",
+        type=PtzPolicyConfig.model_validate_json,
+        help="PTZ policy config as JSON, can be repeated. Both policies with their defaults if not given",
+    )
+    parser.add_argument("--reference-window", type=float, default=2.0, help="Seconds the play's bucket is taken over")
+    parser.add_argument("--hold", type=float, default=3.0, help="Seconds the play stays in a bucket to count as moved")
+    args = parser.parse_args()
+
+    log = DetectionLog(args.recording_dir)
+    if len(log) == 0:
+        parser.error(f"{args.recording_dir} has no logged frames")
+
+    timestamps = np.asarray(log.timestamp)
+    bucket_counts = np.asarray(log.bucket_counts)
+    targets, moves = reference_targets(timestamps, bucket_counts, args.reference_window, args.hold)
+    policies = args.policy or [PtzPolicyConfig(policy=kind) for kind in PtzPolicyKind]
+
+    rows = [("recorded", evaluate(recorded_positions(log), timestamps, targets, moves))]
+    rows += [
+        (config.model_dump_json(), evaluate(replay(config, timestamps, bucket_counts), timestamps, targets, moves))
+        for config in policies
+    ]
+
+    print(f"{len(log)} frames over {(timestamps[-1] - timestamps[0]) / 60:.1f} min, the play moved {len(moves)} times")
+    print(f"{'switches':>8} {'per min':>8} {'missed':>6} {'p50 s':>6} {'p90 s':>6} {'on target':>9}  policy")
+    for name, result in rows:
+        print(
+            f"{result['switches']:>8} {result['switches_per_min']:>8.2f} {result['missed']:>6} "
+            f"{result['latency_p50']:>6.2f} {result['latency_p90']:>6.2f} {result['on_target']:>9.1%}  {name}"
+        )
+
+
+if __name__ == "__main__":
+    main()
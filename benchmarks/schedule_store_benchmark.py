@@ -0,0 +1,78 @@
+"""
+Schedule store benchmark.
+
+Writes a season worth of schedules into a temporary store and measures how long the scheduler takes to restore
+them on startup.
+
+Usage:
+    python -m benchmarks.schedule_store_benchmark --tasks 5000
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.schedulable import Schedulable
+from app.core.schedule_store import ScheduleStore
+from app.core.scheduler import Scheduler
+from app.schemas.schedule import Recurrence, Schedule
+
+
+class NoopSchedulable(Schedulable):
+    def start(self, *args, **kwargs):
+        pass
+
+    def stop(self, *args, **kwargs):
+        pass
+
+    @property
+    def is_running(self) -> bool:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000, help="Number of one-off schedules")
+    parser.add_argument("--recurring", type=int, default=50, help="Number of weekly recurring schedules")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "schedules.db")
+        store = ScheduleStore(path)
+
+        first_start = datetime.now(timezone.utc) + timedelta(hours=1)
+        write_started = time.perf_counter()
+        for idx in range(args.tasks):
+            start_time = first_start + idx * timedelta(hours=3)
+            end_time = start_time + timedelta(hours=2)
+            store.save(idx, Schedule(start_time=start_time, end_time=end_time), active_until=end_time)
+        for idx in range(args.recurring):
+            start_time = first_start + timedelta(minutes=idx * 2 + 1)
+            schedule = Schedule(
+                start_time=start_time,
+                end_time=start_time + timedelta(minutes=1),
+                recurrence=Recurrence(frequency="weekly", count=30),
+            )
+            store.save(args.tasks + idx, schedule)
+        write_duration = time.perf_counter() - write_started
+
+        noop = NoopSchedulable()
+        restore_started = time.perf_counter()
+        scheduler = Scheduler.get_instance(
+            logging.getLogger("store_benchmark"), store=ScheduleStore(path), task_resolver=lambda schedule: noop
+        )
+        restore_duration = time.perf_counter() - restore_started
+        restored = len(scheduler.get_tasks())
+        scheduler.stop()
+
+    print(f"schedules:  {args.tasks} one-off + {args.recurring} recurring")
+    per_task_us = write_duration / (args.tasks + args.recurring) * 1e6
+    print(f"write:      {write_duration * 1000:.1f} ms ({per_task_us:.1f} us/task)")
+    print(f"restore:    {restore_duration * 1000:.1f} ms ({restored} tasks)")
+
+
+if __name__ == "__main__":
+    main()
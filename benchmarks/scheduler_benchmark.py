@@ -0,0 +1,88 @@
+"""
+Scheduler benchmark.
+
+Schedules a large number of short, back-to-back tasks against a no-op Schedulable and reports how many times the
+scheduler thread woke up and how late each task was started compared to its scheduled start time.
+
+Usage:
+    python -m benchmarks.scheduler_benchmark --tasks 10000 --spacing-ms 2
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.core.schedulable import Schedulable
+from app.core.scheduler import Scheduler
+from app.schemas.schedule import Schedule
+
+
+class RecordingSchedulable(Schedulable):
+    def __init__(self):
+        self.skews: list[float] = []
+        self._owner: int | None = None
+
+    def start(self, start_time: datetime, *args, owner: int | None = None, **kwargs):
+        self.skews.append((datetime.now(timezone.utc) - start_time).total_seconds())
+        self._owner = owner
+
+    def stop(self, *args, owner: int | None = None, **kwargs):
+        if owner is None or owner == self._owner:
+            self._owner = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._owner is not None
+
+    def is_running_for(self, owner: int | None) -> bool:
+        return self._owner is not None and self._owner == owner
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000, help="Number of scheduled tasks")
+    parser.add_argument("--spacing-ms", type=float, default=2.0, help="Time between two consecutive task starts")
+    parser.add_argument("--lead-s", type=float, default=2.0, help="Time until the first task starts")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("scheduler_benchmark")
+    scheduler = Scheduler.get_instance(logger)
+    task = RecordingSchedulable()
+
+    spacing = timedelta(milliseconds=args.spacing_ms)
+    first_start = datetime.now(timezone.utc) + timedelta(seconds=args.lead_s)
+
+    add_started = time.perf_counter()
+    for idx in range(args.tasks):
+        start_time = first_start + idx * spacing
+        scheduler.add_task(Schedule(start_time=start_time, end_time=start_time + spacing / 2), task)
+    add_duration = time.perf_counter() - add_started
+
+    last_end = first_start + args.tasks * spacing
+    wakeups_before = scheduler.wakeups
+    while datetime.now(timezone.utc) < last_end + timedelta(seconds=1) and len(task.skews) < args.tasks:
+        time.sleep(0.1)
+    wakeups = scheduler.wakeups - wakeups_before
+    scheduler.stop()
+
+    skews_ms = [skew * 1000 for skew in task.skews]
+    print(f"tasks:             {args.tasks}")
+    print(f"add_task total:    {add_duration:.3f} s ({add_duration / args.tasks * 1e6:.1f} us/task)")
+    print(f"started:           {len(skews_ms)} ({args.tasks - len(skews_ms)} skipped, window ended before start)")
+    print(f"wakeups:           {wakeups} ({wakeups / max(args.tasks, 1):.2f} per task)")
+    if skews_ms:
+        print(f"start skew mean:   {statistics.fmean(skews_ms):.3f} ms")
+        print(f"start skew p50:    {percentile(skews_ms, 0.50):.3f} ms")
+        print(f"start skew p99:    {percentile(skews_ms, 0.99):.3f} ms")
+        print(f"start skew max:    {max(skews_ms):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
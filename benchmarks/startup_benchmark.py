@@ -0,0 +1,89 @@
+"""
+Startup benchmark.
+
+Measures how long a fresh interpreter takes to import the API application and the recording worker module, and
+how long it takes to get a worker process running with the fork, spawn and forkserver start methods. The fork
+server preloads the worker module like the API does, its own startup is reported separately.
+
+Usage:
+    python -m benchmarks.startup_benchmark --runs 20
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+import multiprocess
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+
+
+def ready(event):
+    event.set()
+
+
+def measure_import(module: str, runs: int) -> list[float] | str:
+    durations = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)], capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return result.stderr.strip().splitlines()[-1]
+        durations.append(float(result.stdout))
+
+    return durations
+
+
+def measure_spawn(method: str, runs: int, preload: list[str]) -> tuple[list[float], float | None]:
+    context = multiprocess.get_context(method)
+    server_startup = None
+    if method == "forkserver":
+        context.set_forkserver_preload(preload)
+        started = time.perf_counter()
+        multiprocess.forkserver.ensure_running()
+        server_startup = time.perf_counter() - started
+
+    durations = []
+    for _ in range(runs):
+        event = context.Event()
+        started = time.perf_counter()
+        process = context.Process(target=ready, args=(event,))
+        process.start()
+        event.wait()
+        durations.append(time.perf_counter() - started)
+        process.join()
+
+    return durations, server_startup
+
+
+def describe(durations: list[float]) -> str:
+    durations = sorted(durations)
+    p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+    return f"median {statistics.median(durations) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Measurements per import and start method")
+    parser.add_argument("--preload", nargs="*", default=["main"], help="Modules the fork server preloads")
+    args = parser.parse_args()
+
+    for module in ("app.main", "main"):
+        durations = measure_import(module, args.runs)
+        if isinstance(durations, str):
+            print(f"import {module:<10} failed: {durations}")
+        else:
+            print(f"import {module:<10} {describe(durations)}")
+
+    for method in ("fork", "spawn", "forkserver"):
+        durations, server_startup = measure_spawn(method, args.runs, args.preload)
+        print(f"start  {method:<10} {describe(durations)}")
+        if server_startup is not None:
+            print(f"       fork server launch {server_startup * 1000:.1f} ms (preloading {', '.join(args.preload)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Synthetic NDI source.
+
+Publishes NDI sources sending a moving 1080p test pattern, so recordings and recording agents can be run without
+cameras. Sources are named `SYNTH <GROUP> CAM<idx>`, give every session its own group and match it with the
+session's source pattern, e.g. `*SYNTH COURT1*`.
+
+Usage:
+    python -m benchmarks.synthetic_ndi_source --group COURT1 --sources 4 --fps 25
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def test_pattern(idx: int) -> np.ndarray:
+    frame = np.zeros((HEIGHT, WIDTH, 4), dtype=np.uint8)
+    bars = np.array(
+        [[192, 192, 192], [0, 192, 192], [192, 192, 0], [0, 192, 0], [192, 0, 192], [0, 0, 192], [192, 0, 0]],
+        dtype=np.uint8,
+    )
+    bar_width = WIDTH // len(bars)
+    for bar, color in enumerate(bars):
+        frame[:, bar * bar_width : (bar + 1) * bar_width, :3] = color
+    # Cameras of a group differ by the height of a black band
+    frame[: (idx + 1) * 40, :, :3] = 0
+    frame[:, :, 3] = 255
+
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--group", default="COURT1", help="Group name the sources are named after")
+    parser.add_argument("--sources", type=int, default=2, help="Number of sources to publish")
+    parser.add_argument("--fps", type=float, default=25.0, help="Frames per second every source sends")
+    args = parser.parse_args()
+
+    import NDIlib as ndi
+
+    if not ndi.initialize():
+        raise SystemExit("Failed to initialize NDI.")
+
+    senders = []
+    for idx in range(args.sources):
+        settings = ndi.SendCreate()
+        settings.ndi_name = f"SYNTH {args.group} CAM{idx}"
+        settings.clock_video = False
+        sender = ndi.send_create(settings)
+        if sender is None:
+            raise SystemExit(f"Failed to create NDI sender {settings.ndi_name}.")
+
+        video_frame = ndi.VideoFrameV2()
+        video_frame.FourCC = ndi.FOURCC_VIDEO_TYPE_BGRX
+        video_frame.frame_rate_N, video_frame.frame_rate_D = int(args.fps * 1000), 1000
+        senders.append((sender, video_frame, test_pattern(idx)))
+        print(f"Publishing {settings.ndi_name}")
+
+    interval = 1 / args.fps
+    deadline = time.perf_counter()
+    frame_idx = 0
+    try:
+        while True:
+            for sender, video_frame, pattern in senders:
+                # A moving white line shows dropped and repeated frames in the recordings
+                frame = pattern.copy()
+                x = (frame_idx * 8) % WIDTH
+                frame[:, x : x + 8, :3] = 255
+                video_frame.data = frame
+                ndi.send_send_video_v2(sender, video_frame)
+
+            frame_idx += 1
+            deadline += interval
+            time.sleep(max(deadline - time.perf_counter(), 0))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for sender, _, _ in senders:
+            ndi.send_destroy(sender)
+        ndi.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,453 @@
 import logging
 import os
+import signal
 import subprocess
+import threading
 import time
-from collections import Counter, deque
 from typing import List
 
 import cv2
 import NDIlib as ndi
 import numpy as np
 import onnxruntime
-from multiprocess import Event
+from multiprocess.queues import Queue
+from multiprocess.synchronize import Event
+
+from app.core.config import PanoConfig, PanoIngest
+from app.core.cpu_placement import pin_to_cpus
+from app.core.detection_log import DetectionLogWriter
+from app.core.metrics import MetricsWriter, NullMetricsWriter, attach_metrics_writer
+from app.core.preview import NullPreviewWriter, PreviewWriter, attach_preview_writer
+from app.core.profiler import profile_main_thread
+from app.core.ptz_policy import PtzDecision, PtzPolicy, create_ptz_policy
+from app.core.utils.logger import get_worker_logger
+from app.core.worker_control import serve_control
+
+THROUGHPUT_REPORT_INTERVAL: float = 5.0
+# Bounds how long a receiver takes to notice its stop event while the source sends nothing
+CAPTURE_TIMEOUT_MS: int = 200
+# Time a reconfiguration waits for the panorama loop to take it, which happens before the next frame
+APPLY_TIMEOUT: float = 10.0
+
+
+def stop_on_sigterm():
+    """
+    Turn SIGTERM into a KeyboardInterrupt, so a worker terminated on a late stop still finishes its file.
+    """
 
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt()
 
-def process_buckets(boxes, labels, scores, bucket_width):
-    buckets = {0: 0, 1: 0, 2: 0}
-    bboxes_player = boxes[(labels == 2) & (scores > 0.5)]
+    signal.signal(signal.SIGTERM, interrupt)
+
+
+def report_status(status_queue: Queue | None, type: str, data: dict):
+    """
+    Send a status update to the parent process without ever blocking the caller.
+    """
+    if status_queue is None:
+        return
+
+    try:
+        status_queue.put_nowait((type, data))
+    except Exception:
+        pass
+
+
+def count_buckets(boxes, labels, scores, bucket_width, min_score=0.5) -> np.ndarray:
+    """
+    Count the players in each bucket of the region of interest.
+    """
+    bboxes_player = boxes[(labels == 2) & (scores > min_score)]
     centers_x = (bboxes_player[:, 0] + bboxes_player[:, 2]) / 2
+    # A player centered on the right edge belongs to the last bucket
+    return np.bincount(np.clip(centers_x // bucket_width, 0, 2).astype(np.intp), minlength=3)
+
+
+def process_buckets(boxes, labels, scores, bucket_width):
+    return int(np.argmax(count_buckets(boxes, labels, scores, bucket_width)))
+
+
+def annotate_preview(image, boxes, labels, scores, bucket_width, leader, position, scale, min_score=0.5):
+    """
+    Draw the detections, the buckets, the bucket leading the PTZ policy's votes and the followed preset onto a
+    preview of the region of interest.
+
+    Boxes and bucket edges are in region of interest pixels, `scale` brings them to the image's.
+    """
+    height, width = image.shape[:2]
+    for bucket in range(3):
+        left = int(bucket * bucket_width * scale[0])
+        right = width if bucket == 2 else int((bucket + 1) * bucket_width * scale[0])
+        if bucket == leader:
+            overlay = image.copy()
+            cv2.rectangle(overlay, (left, 0), (right, height), (0, 200, 255), -1)
+            cv2.addWeighted(overlay, 0.15, image, 0.85, 0, dst=image)
+        if bucket > 0:
+            cv2.line(image, (left, 0), (left, height), (255, 255, 255), 1)
+
+    keep = scores > min_score
+    for box, label in zip(boxes[keep] * np.tile(scale, 2), labels[keep]):
+        color = (0, 255, 0) if label == 2 else (160, 160, 160)
+        cv2.rectangle(image, (int(box[0]), int(box[1])), (int(box[2]), int(box[3])), color, 1)
+
+    cv2.putText(image, f"preset {position}", (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 255), 2)
+    return image
+
+
+class OpenCVPanoramaReader:
+    """
+    Decodes full panorama frames with OpenCV and crops and resizes them in Python.
+    """
+
+    def __init__(self, url: str, config: PanoConfig):
+        self.config = config
+        self.video_capture = cv2.VideoCapture(url)
+
+    def read(self) -> np.ndarray | None:
+        ret, frame = self.video_capture.read()
+        return frame if ret else None
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        roi = self.config.roi
+        frame = frame[roi.y : roi.y + roi.height, roi.x : roi.x + roi.width]
+        return cv2.resize(frame, (self.config.input_width, self.config.input_height), interpolation=cv2.INTER_LINEAR)
+
+    def release(self):
+        self.video_capture.release()
+
+
+class FFmpegPanoramaReader:
+    """
+    Lets ffmpeg crop, scale and drop panorama frames to the analyzed rate while decoding.
+
+    Only model sized BGR frames cross the pipe, read into a single preallocated buffer, so Python never touches
+    the full resolution frame.
+    """
+
+    def __init__(self, url: str, config: PanoConfig):
+        self.config = config
+        roi = config.roi
+        filters = (
+            f"fps={config.fps},"
+            f"crop={roi.width}:{roi.height}:{roi.x}:{roi.y},"
+            f"scale={config.input_width}:{config.input_height}:flags=bilinear"
+        )
+        self.process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-rtsp_transport",
+                "tcp",
+                "-i",
+                url,
+                "-an",
+                "-vf",
+                filters,
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "bgr24",
+                "pipe:",
+            ],
+            stdout=subprocess.PIPE,
+        )
+        self.buffer = bytearray(config.input_width * config.input_height * 3)
+        self.frame = np.frombuffer(self.buffer, dtype=np.uint8).reshape(config.input_height, config.input_width, 3)
+
+    def read(self) -> np.ndarray | None:
+        """
+        Returns:
+            The next frame, which is overwritten by the following read, or None if the stream ended.
+        """
+        view = memoryview(self.buffer)
+        filled = 0
+        while filled < len(view):
+            read = self.process.stdout.readinto(view[filled:])
+            if not read:
+                return None
+            filled += read
+
+        return self.frame
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        return frame
+
+    def release(self):
+        self.process.kill()
+        self.process.wait()
+
+
+def open_pano_reader(url: str, config: PanoConfig) -> OpenCVPanoramaReader | FFmpegPanoramaReader:
+    if config.ingest == PanoIngest.FFMPEG:
+        return FFmpegPanoramaReader(url, config)
+    return OpenCVPanoramaReader(url, config)
 
-    for center_x in centers_x:
-        bucket_idx = center_x // bucket_width
-        buckets[bucket_idx] += 1
 
-    return max(buckets, key=lambda k: buckets[k])
+def create_onnx_session(model_path: str, cpus: list[int] | None) -> onnxruntime.InferenceSession:
+    session_options = onnxruntime.SessionOptions()
+    if cpus:
+        # One intra-op thread per CPU of the worker instead of one per CPU of the machine
+        session_options.intra_op_num_threads = len(cpus)
+    return onnxruntime.InferenceSession(
+        model_path, sess_options=session_options, providers=["CUDAExecutionProvider", "CPUExecutionProvider"]
+    )
 
 
-def update_frequency(window, freq_counter, bucket, max_window_size=10):
+class PanoPipeline:
     """
-    Update the sliding window and frequency counter to track the most frequent bucket.
+    The stream reader, the detector and the parameters the panorama loop runs a frame with.
+
+    A reconfiguration builds a new pipeline next to the running one, reusing its reader and detector where the
+    config leaves them unchanged, and the loop switches over between two frames.
+    """
+
+    def __init__(self, url: str, config: PanoConfig, reader, session: onnxruntime.InferenceSession):
+        self.url = url
+        self.config = config
+        self.reader = reader
+        self.session = session
+
+        roi = config.roi
+        # Boxes are scaled back to the region of interest, which the buckets split
+        self.frame_size = np.array([[roi.width, roi.height]])
+        self.bucket_width = config.bucket_width or roi.width // 3
+        self.preview_scale = np.array([config.input_width / roi.width, config.input_height / roi.height])
+
+    def can_reuse_reader(self, url: str, config: PanoConfig) -> bool:
+        if url != self.url or config.ingest != self.config.ingest:
+            return False
+        # OpenCV frames are cropped and resized with the current config, ffmpeg does it while decoding
+        return config.ingest == PanoIngest.OPENCV or (
+            config.roi,
+            config.input_width,
+            config.input_height,
+            config.fps,
+        ) == (self.config.roi, self.config.input_width, self.config.input_height, self.config.fps)
+
+
+class PipelineSwap:
+    """
+    Hands a pipeline built by the control thread over to the panorama loop, which takes it between two frames.
     """
-    window.append(bucket)
-    freq_counter[bucket] += 1
 
-    if len(window) > max_window_size:
-        oldest = window.popleft()
-        freq_counter[oldest] -= 1
-        if freq_counter[oldest] == 0:
-            del freq_counter[oldest]
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__pending: tuple[PanoPipeline, threading.Event] | None = None
+
+    def offer(self, pipeline: PanoPipeline, timeout: float) -> bool:
+        """
+        Returns:
+            bool: Whether the loop took the pipeline within the timeout, it is withdrawn otherwise.
+        """
+        taken = threading.Event()
+        with self.__lock:
+            self.__pending = (pipeline, taken)
+
+        if taken.wait(timeout):
+            return True
+
+        with self.__lock:
+            if self.__pending is not None and self.__pending[0] is pipeline:
+                self.__pending = None
+                return False
+        return True
+
+    def take(self) -> PanoPipeline | None:
+        # Checked without the lock on every frame, a pipeline offered meanwhile is taken on the next one
+        if self.__pending is None:
+            return None
+
+        with self.__lock:
+            pending, self.__pending = self.__pending, None
+        if pending is None:
+            return None
+
+        pipeline, taken = pending
+        taken.set()
+        return pipeline
+
+
+def prepare_reconfiguration(
+    current: PanoPipeline, url: str, config: PanoConfig, cpus: list[int] | None
+) -> tuple[PanoPipeline, dict]:
+    """
+    Build a pipeline for the new stream and config next to the running one, loading a new model and connecting
+    to the stream anew only where the config changed them.
+
+    Raises:
+        RuntimeError: If the new stream delivers no frame.
+    """
+    load_start = time.perf_counter()
+    session = current.session
+    if config.model_path != current.config.model_path:
+        session = create_onnx_session(config.model_path, cpus)
+    load_seconds = time.perf_counter() - load_start
+
+    reader = current.reader
+    if not current.can_reuse_reader(url, config):
+        reader = open_pano_reader(url, config)
+        # Only a stream that delivers replaces the running one
+        if reader.read() is None:
+            reader.release()
+            raise RuntimeError(f"No frame received from the panorama stream {url}")
+
+    result = {
+        "model_swapped": session is not current.session,
+        "reader_restarted": reader is not current.reader,
+        "load_seconds": round(load_seconds, 3),
+    }
+    return PanoPipeline(url, config, reader, session), result
+
+
+def apply_pending_swap(
+    swap: PipelineSwap,
+    pipeline: PanoPipeline,
+    policy: PtzPolicy,
+    detection_log: DetectionLogWriter | None,
+    logger: logging.Logger,
+) -> tuple[PanoPipeline, PtzPolicy]:
+    """
+    Switch the panorama loop over to the pipeline a reconfiguration offered, if there is one.
 
-    # Return the most common bucket
-    return freq_counter.most_common(1)[0][0]
+    Returns:
+        The pipeline and the PTZ policy to continue with.
+    """
+    update = swap.take()
+    if update is None:
+        return pipeline, policy
+
+    if update.reader is not pipeline.reader:
+        pipeline.reader.release()
+    update.reader.config = update.config
+    if update.config.ptz != pipeline.config.ptz:
+        policy = create_ptz_policy(update.config.ptz, policy.position)
+    if detection_log is not None:
+        detection_log.min_score = update.config.log_min_score
+    logger.info("Panorama reconfigured, model %s", update.config.model_path)
+    return update, policy
+
+
+def detect(pipeline: PanoPipeline, prepared: np.ndarray, metrics_writer: MetricsWriter | NullMetricsWriter):
+    """
+    Run the detector on a prepared frame of the region of interest.
+
+    Returns:
+        The labels, boxes and scores of the detections, boxes in region of interest pixels.
+    """
+    preprocess_start = time.perf_counter()
+    img = prepared.astype(np.float32) / 255.0
+    img = np.expand_dims(np.transpose(img, (2, 0, 1)), axis=0)
+
+    inference_start = time.perf_counter()
+    metrics_writer.observe("preprocess_seconds", inference_start - preprocess_start)
+    labels, boxes, scores = pipeline.session.run(
+        output_names=None,
+        input_feed={
+            'images': img,
+            "orig_target_sizes": pipeline.frame_size,
+        },
+    )
+    metrics_writer.observe("inference_seconds", time.perf_counter() - inference_start)
+    return labels, boxes, scores
+
+
+def log_frame(
+    detection_log: DetectionLogWriter | None,
+    now: float,
+    boxes,
+    labels,
+    scores,
+    bucket_counts: np.ndarray,
+    policy: PtzPolicy,
+    decision: PtzDecision | None,
+):
+    if detection_log is None:
+        return
+
+    detection_log.append(
+        now,
+        boxes,
+        labels,
+        scores,
+        bucket_counts,
+        int(np.argmax(bucket_counts)),
+        policy.leader,
+        -1 if decision is None else decision.bucket,
+    )
+
+
+def publish_preview(
+    preview_writer: PreviewWriter | NullPreviewWriter,
+    prepared: np.ndarray,
+    boxes,
+    labels,
+    scores,
+    pipeline: PanoPipeline,
+    policy: PtzPolicy,
+):
+    if preview_writer.wanted():
+        preview_writer.publish(
+            annotate_preview(
+                prepared.copy(),
+                boxes,
+                labels,
+                scores,
+                pipeline.bucket_width,
+                policy.leader,
+                policy.position,
+                pipeline.preview_scale,
+                pipeline.config.player_min_score,
+            )
+        )
+
+
+def send_ptz_preset(
+    decision: PtzDecision | None,
+    now: float,
+    ptz_urls: List,
+    status_queue: Queue | None,
+    metrics_writer: MetricsWriter | NullMetricsWriter,
+):
+    """
+    Call the preset of the decided bucket on every PTZ camera and report the change, nothing if the PTZ policy
+    decided to stay.
+    """
+    if decision is None:
+        return
+
+    mode = decision.bucket
+    report_status(status_queue, "ptz_preset", {"preset": mode, "time": now})
+    metrics_writer.inc("preset_changes")
+    metrics_writer.observe("ptz_reaction_seconds", now - decision.onset)
+    ptz_start = time.perf_counter()
+    for url in ptz_urls:
+        command = (
+            rf'szCmd={{'
+            rf'"SysCtrl":{{'
+            rf'"PtzCtrl":{{'
+            rf'"nChanel":0,"szPtzCmd":"preset_call","byValue":{mode}'
+            rf'}}'
+            rf'}}'
+            rf'}}'
+        )
+
+        subprocess.run(
+            [
+                "curl",
+                f"http://{url}/ajaxcom",
+                "--data-raw",
+                command,
+            ],
+            check=False,
+            capture_output=False,
+            text=False,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    metrics_writer.observe("ptz_command_seconds", time.perf_counter() - ptz_start)
 
 
 def pano_process(
@@ -47,90 +456,108 @@ def pano_process(
     onnx_file: str,
     stop_event: Event,
     start_event: Event,
-    logger: logging.Logger,
+    log_queue: Queue,
     fps: int = 15,
+    status_queue: Queue | None = None,
+    metrics: tuple[str, int] | None = None,
+    control: tuple[Queue, Queue] | None = None,
+    cpus: list[int] | None = None,
+    config: PanoConfig | None = None,
+    recording_dir: str | None = None,
+    preview: tuple[str, int, int, int, float] | None = None,
 ):
     """ """
-
-    position = 1
-
-    frame_size = np.array([[2200, 730]])
-    sleep_time = 1 / fps
-    bucket_width = 2200 // 3
-
-    onnx_session = onnxruntime.InferenceSession(onnx_file, providers=["CUDAExecutionProvider", "CPUExecutionProvider"])
-    logger.info(f"ONNX Model Device: {onnxruntime.get_device()}")
-
-    window = deque()
-    freq_counter = Counter()
-
-    video_capture = cv2.VideoCapture(url)
+    stop_on_sigterm()
+    pin_to_cpus(cpus)
+    logger = get_worker_logger("pano", log_queue)
+    config = (config or PanoConfig()).model_copy(update={"fps": fps, "model_path": onnx_file})
+    metrics_writer = attach_metrics_writer(metrics)
+    preview_writer = attach_preview_writer(preview)
+
+    session = create_onnx_session(config.model_path, cpus)
+    logger.info("ONNX Model Device: %s", onnxruntime.get_device())
+
+    policy = create_ptz_policy(config.ptz)
+    logger.info("PTZ policy: %s", config.ptz.policy.value)
+    detection_log = (
+        DetectionLogWriter(recording_dir, config.log_min_score)
+        if config.log_detections and recording_dir is not None
+        else None
+    )
+
+    pipeline = PanoPipeline(url, config, open_pano_reader(url, config), session)
+    logger.info("Panorama ingest: %s", config.ingest.value)
+    swap = PipelineSwap()
+
+    def reconfigure(url: str, config: PanoConfig) -> dict:
+        """
+        Build a pipeline for the new stream and config while the loop keeps running on the current one, then
+        have the loop switch over.
+        """
+        update, result = prepare_reconfiguration(pipeline, url, config, cpus)
+        if not swap.offer(update, APPLY_TIMEOUT):
+            if result["reader_restarted"]:
+                update.reader.release()
+            raise RuntimeError("The panorama loop did not take the new configuration in time")
+
+        return result
+
+    serve_control(control, {"profile": profile_main_thread, "reconfigure": reconfigure})
 
     start_event.set()
     logger.info(f"Process Pano - Event Set!")
+    failed = False
     try:
         while not stop_event.is_set():
-            ret, frame = video_capture.read()
-
-            if not ret:
-                logger.warning(f"No panorama frame captured.")
-                raise KeyboardInterrupt()
-
-            frame = frame[420:1150, 1190:3390]
-            img = cv2.resize(frame, (640, 640), interpolation=cv2.INTER_LINEAR).astype(np.float32) / 255.0
-            img = np.expand_dims(np.transpose(img, (2, 0, 1)), axis=0)
-
-            labels, boxes, scores = onnx_session.run(
-                output_names=None,
-                input_feed={
-                    'images': img,
-                    "orig_target_sizes": frame_size,
-                },
+            pipeline, policy = apply_pending_swap(swap, pipeline, policy, detection_log, logger)
+
+            frame = pipeline.reader.read()
+            if frame is None:
+                # The supervisor restarts the worker, which reconnects to the stream
+                logger.error("No panorama frame captured.")
+                failed = True
+                break
+
+            metrics_writer.inc("frames_captured")
+            metrics_writer.set_gauge("last_frame_timestamp_seconds", time.time())
+
+            prepared = pipeline.reader.prepare(frame)
+            labels, boxes, scores = detect(pipeline, prepared, metrics_writer)
+
+            now = time.time()
+            bucket_counts = count_buckets(
+                boxes, labels, scores, pipeline.bucket_width, pipeline.config.player_min_score
             )
+            decision = policy.update(now, bucket_counts)
+
+            log_frame(detection_log, now, boxes, labels, scores, bucket_counts, policy, decision)
+            send_ptz_preset(decision, now, ptz_urls, status_queue, metrics_writer)
+            publish_preview(preview_writer, prepared, boxes, labels, scores, pipeline, policy)
 
-            most_populated_bucket = process_buckets(boxes, labels, scores, bucket_width)
-            mode = update_frequency(window, freq_counter, most_populated_bucket)
-
-            # draw(Image.fromarray(frame), labels, boxes, scores, mode, bucket_width)
-
-            if position != mode:
-                position = mode
-                for url in ptz_urls:
-                    command = (
-                        rf'szCmd={{'
-                        rf'"SysCtrl":{{'
-                        rf'"PtzCtrl":{{'
-                        rf'"nChanel":0,"szPtzCmd":"preset_call","byValue":{mode}'
-                        rf'}}'
-                        rf'}}'
-                        rf'}}'
-                    )
-
-                    subprocess.run(
-                        [
-                            "curl",
-                            f"http://{url}/ajaxcom",
-                            "--data-raw",
-                            command,
-                        ],
-                        check=False,
-                        capture_output=False,
-                        text=False,
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                    )
-
-            time.sleep(sleep_time)
+            if pipeline.config.ingest == PanoIngest.OPENCV:
+                # ffmpeg already drops the frames past the analyzed rate
+                time.sleep(1 / pipeline.config.fps)
 
     except KeyboardInterrupt:
-        video_capture.release()
+        pass
+    finally:
+        pipeline.reader.release()
+        metrics_writer.close()
+        preview_writer.close()
+        if detection_log is not None:
+            detection_log.close()
 
     logger.info(f"RTSP Receiver Process stopped.")
+    if failed:
+        raise SystemExit(1)
 
 
 class NDIReceiver:
-    def __init__(self, src, idx: int, path, logger: logging.Logger, codec="h264_nvenc", fps: int = 30) -> None:
+    def __init__(
+        self, src, idx: int, path, logger: logging.Logger, codec="h264_nvenc", fps: int = 30, segment: int = 0
+    ) -> None:
         self.idx = idx
+        self.segment = segment
         self.codec = codec
         self.fps = fps
         self.path = path
@@ -139,20 +566,28 @@ class NDIReceiver:
         self.receiver = self.create_receiver(src)
         self.ffmpeg_process = self.start_ffmpeg_process()
 
-    def create_receiver(self, src):
+    def create_receiver(self, src: tuple[str, str]):
+        """
+        Connect to the source with the given (name, url), workers get those instead of the NDI source object.
+        """
+        if not ndi.initialize():
+            raise RuntimeError("Failed to initialize NDI")
+
+        source = ndi.Source()
+        source.ndi_name, source.url_address = src
 
         ndi_recv_create = ndi.RecvCreateV3()
         ndi_recv_create.color_format = ndi.RECV_COLOR_FORMAT_BGRX_BGRA
         receiver = ndi.recv_create_v3(ndi_recv_create)
         if receiver is None:
             raise RuntimeError("Failed to create NDI receiver")
-        ndi.recv_connect(receiver, src)
+        ndi.recv_connect(receiver, source)
 
         return receiver
 
     def get_frame(self):
 
-        t, v, _, _ = ndi.recv_capture_v3(self.receiver, 1000)
+        t, v, _, _ = ndi.recv_capture_v3(self.receiver, CAPTURE_TIMEOUT_MS)
         frame = None
         if t == ndi.FRAME_TYPE_VIDEO:
             # logger.info("Frame received")
@@ -163,6 +598,15 @@ class NDIReceiver:
 
         return frame, t
 
+    def get_dropped_frames(self) -> int:
+        _, dropped = ndi.recv_get_performance(self.receiver)
+        return dropped.video_frames
+
+    @property
+    def segment_file_name(self) -> str:
+        # Restarted receivers continue the recording in a new file next to the first one
+        return f"cam{self.idx}.mp4" if self.segment == 0 else f"cam{self.idx}_seg{self.segment}.mp4"
+
     def start_ffmpeg_process(self):
         return subprocess.Popen(
             [
@@ -194,7 +638,7 @@ class NDIReceiver:
                 "fast",
                 "-profile:v",
                 "high",
-                os.path.join(self.path, f"cam{self.idx}.mp4"),
+                os.path.join(self.path, self.segment_file_name),
             ],
             stdin=subprocess.PIPE,
         )
@@ -208,31 +652,120 @@ class NDIReceiver:
                 self.logger.error(f"Broken pipe error while closing stdin: {e}")
 
         self.ffmpeg_process.wait()
+        ndi.recv_destroy(self.receiver)
 
 
-def ndi_receiver_process(
-    src, idx: int, path, logger: logging.Logger, stop_event: Event, codec: str = "h264_nvenc", fps: int = 30
-):
-    receiver = NDIReceiver(src, idx, path, logger, codec, fps)
+def record_frame(
+    receiver: NDIReceiver,
+    frame: np.ndarray,
+    metrics_writer: MetricsWriter | NullMetricsWriter,
+    preview_writer: PreviewWriter | NullPreviewWriter,
+    logger: logging.Logger,
+) -> bool:
+    """
+    Pipe a captured frame to the receiver's encoder and publish it as the preview if one is wanted.
+
+    Returns:
+        bool: False if the encoder does not take frames anymore.
+    """
+    metrics_writer.inc("frames_captured")
+    metrics_writer.set_gauge("last_frame_timestamp_seconds", time.time())
+    try:
+        write_start = time.perf_counter()
+        receiver.ffmpeg_process.stdin.write(frame.tobytes())
+        receiver.ffmpeg_process.stdin.flush()
+    except BrokenPipeError as e:
+        logger.error("Broken pipe error while writing frame: %s", e)
+        return False
+    except Exception as e:
+        logger.error("Error in NDI Receiver Process %d: %s", receiver.idx, e)
+        return False
+
+    metrics_writer.observe("pipe_write_seconds", time.perf_counter() - write_start)
+    metrics_writer.inc("frames_written")
+    if preview_writer.wanted():
+        preview_writer.publish(frame)
+    return True
 
-    logger.info(f"NDI Receiver {idx} created.")
 
+def ndi_receiver_process(
+    src: tuple[str, str],
+    idx: int,
+    path,
+    log_queue: Queue,
+    stop_event: Event,
+    codec: str = "h264_nvenc",
+    fps: int = 30,
+    status_queue: Queue | None = None,
+    metrics: tuple[str, int] | None = None,
+    control: tuple[Queue, Queue] | None = None,
+    cpus: list[int] | None = None,
+    segment: int = 0,
+    preview: tuple[str, int, int, int, float] | None = None,
+):
+    stop_on_sigterm()
+    # Pinned before the receiver starts ffmpeg, which inherits the affinity
+    pin_to_cpus(cpus)
+    logger = get_worker_logger(f"cam{idx}", log_queue)
+    receiver = NDIReceiver(src, idx, path, logger, codec, fps, segment)
+    metrics_writer = attach_metrics_writer(metrics)
+    preview_writer = attach_preview_writer(preview)
+    serve_control(control, {"profile": profile_main_thread})
+
+    logger.info("NDI Receiver %d created, recording into %s.", idx, receiver.segment_file_name)
+
+    frames_written = 0
+    last_report_frames = 0
+    last_report_time = time.monotonic()
+
+    failed = False
     try:
         while not stop_event.is_set():
+            now = time.monotonic()
+            if now - last_report_time >= THROUGHPUT_REPORT_INTERVAL:
+                report_status(
+                    status_queue,
+                    "throughput",
+                    {
+                        "camera": idx,
+                        "frames": frames_written,
+                        "fps": (frames_written - last_report_frames) / (now - last_report_time),
+                    },
+                )
+                last_report_frames, last_report_time = frames_written, now
+                metrics_writer.set_counter("frames_dropped", receiver.get_dropped_frames())
+
+            if receiver.ffmpeg_process.poll() is not None:
+                logger.error("ffmpeg exited with code %d", receiver.ffmpeg_process.returncode)
+                failed = True
+                break
+
             frame, t = receiver.get_frame()
-            if frame is not None:
-                try:
-                    receiver.ffmpeg_process.stdin.write(frame.tobytes())
-                    receiver.ffmpeg_process.stdin.flush()
-                except BrokenPipeError as e:
-                    logger.error(f"Broken pipe error while writing frame: {e}")
-                    break
-                except Exception as e:
-                    logger.error(f"Error in NDI Receiver Process {idx}: {e}")
-                    break
-            else:
-                logger.warning(f"No video frame captured. Frame type: {t}")
+            if frame is None:
+                metrics_writer.inc("capture_timeouts")
+                logger.warning("No video frame captured. Frame type: %s", t)
+                continue
+
+            if not record_frame(receiver, frame, metrics_writer, preview_writer, logger):
+                failed = True
+                break
+
+            frames_written += 1
+            if frames_written == 1:
+                # Places the file on the wall clock for the timeline index
+                report_status(
+                    status_queue,
+                    "segment_started",
+                    {"camera": idx, "segment": segment, "file": receiver.segment_file_name, "time": time.time()},
+                )
     except KeyboardInterrupt:
+        pass
+    finally:
+        # Closing the pipe lets ffmpeg finish the file, also when the loop broke on an error
         receiver.stop()
+        metrics_writer.close()
+        preview_writer.close()
 
-    logger.info(f"NDI Receiver Process {receiver.idx} stopped.")
+    logger.info("NDI Receiver Process %d stopped.", receiver.idx)
+    if failed:
+        raise SystemExit(1)
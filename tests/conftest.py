@@ -0,0 +1,21 @@
+import logging
+
+import pytest
+
+from app.core.recording_catalog import RecordingCatalog
+from app.core.scheduler import Scheduler
+
+
+@pytest.fixture(scope="session")
+def scheduler():
+    scheduler = Scheduler.get_instance(logging.getLogger("test_scheduler"))
+    yield scheduler
+    scheduler.stop()
+
+
+@pytest.fixture
+def catalog(tmp_path) -> RecordingCatalog:
+    # A catalog of its own instead of the shared instance
+    return RecordingCatalog(
+        RecordingCatalog._RecordingCatalog__key, path=str(tmp_path / "catalog.db"), root=str(tmp_path / "recordings")
+    )
@@ -0,0 +1,41 @@
+import time
+
+from app.core.schedulable import Schedulable
+
+
+class FakeTask(Schedulable):
+    def __init__(self):
+        self.owner: int | None = None
+        self.starts = 0
+
+    def start(self, *args, owner: int | None = None, **kwargs):
+        self.owner = owner
+        self.starts += 1
+
+    def stop(self, *args, owner: int | None = None, **kwargs):
+        if owner is None or owner == self.owner:
+            self.owner = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.owner is not None
+
+    def is_running_for(self, owner: int | None) -> bool:
+        return self.owner is not None and self.owner == owner
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def add_recording(root, session: str, name: str, files: dict[str, int]):
+    path = root / session / name
+    path.mkdir(parents=True)
+    for file, size in files.items():
+        (path / file).write_bytes(b"\0" * size)
+    return path
@@ -0,0 +1,33 @@
+import logging
+import time
+
+from app.core import agent_registry
+from app.core.agent_registry import AgentRegistry
+
+from .helpers import wait_for
+
+
+def test_heartbeat_syncs_the_clock_in_the_background(monkeypatch):
+    requests = []
+
+    def request_json(url: str, method: str = "GET", body: dict | None = None, timeout: float = 5.0) -> dict:
+        requests.append(url)
+        time.sleep(0.1)
+        return {"time": time.time() + 2.0}
+
+    monkeypatch.setattr(agent_registry, "request_json", request_json)
+    registry = AgentRegistry.get_instance(logging.getLogger("test_agent_registry"))
+
+    started = time.monotonic()
+    agent = registry.heartbeat("recorder-1", "http://recorder-1:8100", 4, 0, {})
+    assert time.monotonic() - started < 0.1
+    # A heartbeat during the sync does not start another one
+    registry.heartbeat("recorder-1", "http://recorder-1:8100", 4, 1, {})
+
+    assert wait_for(lambda: agent.clock_synced_at is not None)
+    assert len(requests) == AgentRegistry.CLOCK_SAMPLES
+    assert abs(agent.clock_offset - 2.0) < 0.1
+    assert wait_for(lambda: not agent.clock_syncing)
+
+    registry.heartbeat("recorder-1", "http://recorder-1:8100", 4, 1, {})
+    assert len(requests) == AgentRegistry.CLOCK_SAMPLES
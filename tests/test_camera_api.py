@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_record_manager, get_scheduler
+from app.main import app
+from app.schemas.schedule import Schedule
+
+from .helpers import FakeTask, wait_for
+
+
+def test_restart_during_a_scheduled_recording(scheduler):
+    record_manager = FakeTask()
+    record_manager.session = "default"
+    app.dependency_overrides[get_record_manager] = lambda: record_manager
+    app.dependency_overrides[get_scheduler] = lambda: scheduler
+    try:
+        start_time = datetime.now(timezone.utc)
+        id = scheduler.add_task(
+            Schedule(start_time=start_time, end_time=start_time + timedelta(seconds=2)), record_manager
+        )
+        assert wait_for(lambda: record_manager.is_running_for(id))
+
+        response = TestClient(app).post("/api/v1/camera/restart")
+        assert response.status_code == 202
+        assert wait_for(lambda: record_manager.starts == 2)
+        assert record_manager.is_running_for(id)
+
+        # The recording still stops when the schedule ends
+        assert wait_for(lambda: not record_manager.is_running)
+        scheduler.remove_task(id)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,50 @@
+import numpy as np
+
+from app.core.detection_log import DetectionLog, DetectionLogWriter
+
+
+def append_frame(writer: DetectionLogWriter, timestamp: float, scores: list[float], preset: int = -1):
+    count = len(scores)
+    boxes = np.full((count, 4), timestamp, np.float32)
+    writer.append(
+        timestamp, boxes, np.zeros(count, np.int16), np.array(scores, np.float32), np.array([count, 0, 0]), 0, 0, preset
+    )
+
+
+def test_log_keeps_the_detections_above_the_minimum_score(tmp_path):
+    writer = DetectionLogWriter(str(tmp_path), min_score=0.5, chunk_frames=4, chunk_boxes=8)
+    for n in range(10):
+        append_frame(writer, 100.0 + n, [0.9, 0.4, 0.6], preset=2 if n == 5 else -1)
+    writer.close()
+
+    log = DetectionLog(str(tmp_path))
+    assert len(log) == 10
+    boxes, _, scores = log.frame_boxes(7)
+    assert scores.tolist() == [np.float32(0.9), np.float32(0.6)]
+    assert (boxes == 107.0).all()
+    assert log.between(102.0, 104.0) == slice(2, 5)
+    assert log.preset_changes().tolist() == [5]
+
+
+def test_restarted_writer_drops_the_rows_a_kill_cut_off(tmp_path):
+    writer = DetectionLogWriter(str(tmp_path), chunk_frames=4, chunk_boxes=8)
+    for n in range(8):
+        append_frame(writer, 100.0 + n, [0.9])
+    writer.flush()
+    # A killed worker leaves a partial row in some of the columns
+    with open(tmp_path / "detections/timestamp.bin", "ab") as file:
+        file.write(b"\1\2\3")
+    with open(tmp_path / "detections/scores.bin", "ab") as file:
+        file.write(np.float32(0.9).tobytes())
+
+    writer = DetectionLogWriter(str(tmp_path), chunk_frames=4, chunk_boxes=8)
+    assert writer.frames_written == 8
+    append_frame(writer, 200.0, [0.8, 0.7])
+    writer.close()
+
+    log = DetectionLog(str(tmp_path))
+    assert len(log) == 9
+    assert log.timestamp[-2:].tolist() == [107.0, 200.0]
+    assert log.frame_boxes(7)[2].tolist() == [np.float32(0.9)]
+    assert log.frame_boxes(8)[2].tolist() == [np.float32(0.8), np.float32(0.7)]
+    assert all(len(column) == len(log.scores) for column in (log.boxes, log.labels))
@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timedelta
+
+from app.core.interval_index import IntervalIndex
+
+ORIGIN = datetime(2025, 1, 1)
+
+
+def test_matches_linear_scan():
+    rng = random.Random(0)
+    index = IntervalIndex()
+    intervals = {}
+    for id in range(500):
+        start = ORIGIN + timedelta(minutes=rng.randrange(10_000))
+        # A few intervals far longer than the others
+        end = start + timedelta(minutes=rng.randrange(5_000) if id % 50 == 0 else rng.randrange(60))
+        index.add(id, start, end)
+        intervals[id] = (start, end)
+
+    for id in rng.sample(sorted(intervals), 200):
+        index.remove(id, intervals.pop(id)[0])
+
+    assert len(index) == len(intervals)
+    assert index.upper_bound() == max(end for _, end in intervals.values())
+    for _ in range(200):
+        start = ORIGIN + timedelta(minutes=rng.randrange(10_000))
+        end = start + timedelta(minutes=rng.randrange(120))
+        expected = [
+            id
+            for (s, id) in sorted((s, id) for id, (s, e) in intervals.items())
+            if intervals[id][1] >= start and s <= end
+        ]
+        assert list(index.overlapping(start, end)) == expected
+        assert list(index.intervals(start, end)) == [(id, *intervals[id]) for id in expected]
+        assert index.first_overlap(start, end) == (expected[0] if expected else None)
+
+        after = (ORIGIN + timedelta(minutes=rng.randrange(10_000)), rng.randrange(500))
+        assert list(index.range(start, None, after)) == [
+            id
+            for (s, id) in sorted((s, id) for id, (s, e) in intervals.items())
+            if (s, id) > after and intervals[id][1] >= start
+        ]
+
+    assert list(index.range()) == [id for _, id in sorted((s, id) for id, (s, _) in intervals.items())]
+
+
+def test_removed_long_interval_no_longer_bounds_queries():
+    index = IntervalIndex()
+    index.add(0, ORIGIN, ORIGIN + timedelta(days=365))
+    index.add(1, ORIGIN + timedelta(days=1), ORIGIN + timedelta(days=1, hours=1))
+    index.remove(0, ORIGIN)
+
+    assert index.upper_bound() == ORIGIN + timedelta(days=1, hours=1)
+    assert index.first_overlap(ORIGIN + timedelta(days=2), ORIGIN + timedelta(days=3)) is None
@@ -0,0 +1,14 @@
+import importlib
+
+import pytest
+
+
+def test_main_imports():
+    # The worker module only runs inside the recording workers, so an error at import time fails every recording
+    for module in ("cv2", "NDIlib", "onnxruntime"):
+        pytest.importorskip(module)
+
+    main = importlib.import_module("main")
+
+    assert callable(main.ndi_receiver_process)
+    assert callable(main.pano_process)
@@ -0,0 +1,25 @@
+from threading import Thread
+
+from app.core.metrics import MetricsRegistry, render_metrics
+
+
+def test_render_does_not_read_a_closed_registry(monkeypatch):
+    first = MetricsRegistry([{"session": "default", "worker": "pano"}])
+    second = MetricsRegistry([{"session": "court2", "worker": "pano"}])
+    read = first.read
+    closing = Thread(target=second.close)
+
+    def read_while_closing(slot: int) -> list[float]:
+        # The second registry is closed while the scrape is between the registries
+        closing.start()
+        closing.join(0.2)
+        return read(slot)
+
+    monkeypatch.setattr(first, "read", read_while_closing)
+    try:
+        text = render_metrics()
+    finally:
+        closing.join()
+        first.close()
+
+    assert 'worker="pano"' in text
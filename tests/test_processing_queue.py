@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+
+from app.core import processing_queue
+from app.core.config import ProcessingConfig, ProcessingStep, RecordingConfig
+from app.core.processing_queue import ProcessingQueue, ProcessingState
+
+from .helpers import wait_for
+
+# The queue outlives the tests and only reacts to increases of the counter
+_drops = {"count": 0.0, "fail": False}
+
+
+@pytest.fixture(scope="module")
+def queue():
+    queue = ProcessingQueue.get_instance(logging.getLogger("test_processing_queue"))
+    yield queue
+    queue.stop()
+
+
+@pytest.fixture
+def drops(monkeypatch):
+    config = RecordingConfig(
+        processing=ProcessingConfig(
+            steps=[ProcessingStep(name="sleep", command=["sleep", "0.5"])], idle_io=False, resume_after=0.2
+        )
+    )
+    monkeypatch.setattr(processing_queue, "get_recording_config", lambda: config)
+    monkeypatch.setattr(ProcessingQueue, "INTERVAL", 0.02)
+
+    drops = _drops
+    drops["fail"] = False
+
+    def sum_counter(name: str) -> float:
+        if drops["fail"]:
+            raise RuntimeError("Metrics are unavailable")
+        return drops["count"]
+
+    monkeypatch.setattr(processing_queue, "sum_counter", sum_counter)
+    return drops
+
+
+def process_state(pid: int) -> str:
+    with open(f"/proc/{pid}/stat") as file:
+        return file.read().rsplit(")", 1)[1].split()[0]
+
+
+def test_suspends_commands_while_frames_drop(queue, drops, tmp_path):
+    job = queue.submit("default", str(tmp_path))
+    assert wait_for(lambda: job.process is not None)
+    process = job.process
+
+    drops["count"] += 1
+    assert wait_for(lambda: job.state == ProcessingState.PAUSED)
+    assert queue.is_paused
+    assert process_state(process.pid) == "T"
+
+    assert wait_for(lambda: job.state == ProcessingState.RUNNING)
+    assert not queue.is_paused
+    assert wait_for(lambda: job.state == ProcessingState.SUCCEEDED)
+
+
+def test_resumes_after_a_failed_check(queue, drops, tmp_path):
+    job = queue.submit("default", str(tmp_path))
+    assert wait_for(lambda: job.process is not None)
+    drops["count"] += 1
+    assert wait_for(lambda: queue.is_paused)
+
+    drops["fail"] = True
+    assert wait_for(lambda: job.state == ProcessingState.PAUSED)
+    drops["fail"] = False
+
+    assert wait_for(lambda: not queue.is_paused)
+    assert wait_for(lambda: job.state == ProcessingState.SUCCEEDED)
+    assert (tmp_path / "processing_sleep.log").exists()
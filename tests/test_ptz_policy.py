@@ -0,0 +1,51 @@
+import numpy as np
+
+from app.core.config import PtzPolicyConfig, PtzPolicyKind
+from app.core.ptz_policy import HysteresisPolicy, ModePolicy, PtzDecision, create_ptz_policy
+
+
+def counts(bucket: int, players: int = 3) -> np.ndarray:
+    bucket_counts = np.zeros(3, np.int64)
+    bucket_counts[bucket] = players
+    return bucket_counts
+
+
+def run(policy, frames: list[tuple[float, np.ndarray]]) -> list[PtzDecision | None]:
+    return [policy.update(timestamp, bucket_counts) for timestamp, bucket_counts in frames]
+
+
+def test_mode_policy_follows_the_most_voted_bucket():
+    policy = ModePolicy(PtzPolicyConfig(window=3))
+
+    decisions = run(policy, [(0.0, counts(2)), (1.0, counts(0)), (2.0, counts(0)), (3.0, counts(0))])
+
+    # A tie goes to the bucket counted first
+    assert decisions == [PtzDecision(2, 0.0), None, PtzDecision(0, 1.0), None]
+    assert policy.position == 0
+
+
+def test_hysteresis_policy_needs_a_lead_and_a_dwell():
+    policy = create_ptz_policy(PtzPolicyConfig(policy=PtzPolicyKind.HYSTERESIS, window=5, dwell_seconds=2.0))
+    assert isinstance(policy, HysteresisPolicy)
+
+    decisions = run(policy, [(0.0, counts(2)), (0.5, counts(2, players=1)), (1.0, counts(2)), (2.0, counts(2))])
+    # Frames with too few players abstain, the switch waits for three votes out of the window
+    assert decisions == [None, None, None, PtzDecision(2, 0.0)]
+
+    decisions = run(policy, [(2.5, counts(0)), (3.0, counts(0)), (3.5, counts(0))])
+    # Three votes against two is not enough of a lead
+    assert decisions == [None, None, None]
+    assert policy.leader == 0 and policy.position == 2
+
+    assert policy.update(4.0, counts(0)) == PtzDecision(0, 2.5)
+
+
+def test_hysteresis_policy_stays_on_a_tie_and_during_the_dwell():
+    policy = HysteresisPolicy(PtzPolicyConfig(window=4, min_share=0.5, margin=0, dwell_seconds=10.0))
+
+    decisions = run(policy, [(0.0, counts(0)), (1.0, counts(0)), (2.0, counts(2)), (3.0, counts(2))])
+    assert decisions == [None, PtzDecision(0, 0.0), None, None]
+    assert policy.leader == 0
+
+    decisions = run(policy, [(4.0, counts(2)), (11.0, counts(2))])
+    assert decisions == [None, PtzDecision(2, 2.0)]
@@ -0,0 +1,80 @@
+import logging
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core import record_manager as record_manager_module
+from app.core.record_manager import (
+    FailedToStartRecordingException,
+    RecordManager,
+    claim_devices,
+    first_free_segment,
+    release_devices,
+)
+from app.core.recording_state import RecordingState
+
+
+def test_resumed_recording_starts_after_existing_segments(tmp_path):
+    assert first_free_segment(str(tmp_path)) == 0
+
+    for name in ("cam0.mp4", "cam1.mp4", "cam0_seg2.mp4", "run.log", "cam0_seg2_100-200.mp4"):
+        (tmp_path / name).touch()
+
+    assert first_free_segment(str(tmp_path)) == 3
+
+
+class FakeSource:
+    def __init__(self, ndi_name: str, url_address: str):
+        self.ndi_name = ndi_name
+        self.url_address = url_address
+
+
+class FakeNDI:
+    def __init__(self, sources: list[FakeSource]):
+        self.sources = sources
+
+    def initialize(self) -> bool:
+        return True
+
+    def find_create_v2(self):
+        return object()
+
+    def find_wait_for_sources(self, find, timeout: int):
+        pass
+
+    def find_get_current_sources(self, find) -> list[FakeSource]:
+        return self.sources
+
+    def find_destroy(self, find):
+        pass
+
+
+@pytest.fixture
+def record_manager(monkeypatch):
+    ndi = FakeNDI([FakeSource("HOST (CAM1)", "10.0.0.1:5961"), FakeSource("HOST (CAM2)", "10.0.0.2:5961")])
+    monkeypatch.setitem(sys.modules, "NDIlib", ndi)
+    record_manager = RecordManager.get_instance(logging.getLogger("test_record_manager"))
+    yield record_manager
+    record_manager.stop()
+    release_devices("court2")
+
+
+def test_sessions_cannot_record_the_same_sources(record_manager):
+    claim_devices("court2", {"source:HOST (CAM2)"})
+
+    with pytest.raises(FailedToStartRecordingException, match=r"source:HOST \(CAM2\) \(court2\)"):
+        record_manager.start(datetime.now(timezone.utc))
+    assert record_manager.snapshot.state == RecordingState.FAILED
+
+
+def test_failed_start_releases_the_claimed_sources(record_manager, monkeypatch):
+    def fail(recording_dir: str):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(record_manager_module, "TimelineJournal", fail)
+    with pytest.raises(OSError):
+        record_manager.start(datetime.now(timezone.utc))
+
+    # Another session can record the sources now
+    claim_devices("court2", {"source:HOST (CAM1)", "source:HOST (CAM2)", "ptz:10.0.0.1"})
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.recording_catalog import CatalogState
+
+from .helpers import add_recording
+
+
+def test_sync_catalogues_the_recordings_on_disk(catalog, tmp_path):
+    root = tmp_path / "recordings"
+    add_recording(root, "default", "20250101_1800", {"cam0.mp4": 100, "cam1.mp4": 200, "cam1_seg1.mp4": 50})
+    gone = add_recording(root, "court2", "20250102_1800", {"cam0.mp4": 10, "run.log": 1})
+    add_recording(root, "court2", "not-a-recording", {"cam0.mp4": 10})
+
+    assert catalog.sync() == 2
+    recording = catalog.get_recordings(session="default")[0]
+    assert recording.name == "20250101_1800"
+    assert recording.state == CatalogState.COMPLETE
+    assert recording.cameras == 2 and recording.size_bytes == 350
+    assert {file.name for file in catalog.get(recording.id).files} == {"cam0.mp4", "cam1.mp4", "cam1_seg1.mp4"}
+
+    # Unchanged directories are not scanned again
+    assert catalog.sync() == 0
+
+    for file in gone.iterdir():
+        file.unlink()
+    gone.rmdir()
+    assert catalog.sync() == 1
+    assert [recording.session for recording in catalog.get_recordings()] == ["default"]
+
+
+def test_interrupted_recording_is_marked_on_sync(catalog, tmp_path):
+    path = add_recording(tmp_path / "recordings", "default", "20250101_1800", {"cam0.mp4": 100})
+    id = catalog.begin("default", str(path), datetime(2025, 1, 1, 18, tzinfo=timezone.utc), schedule_id=3)
+
+    catalog.sync()
+    recording = catalog.get(id)
+    assert recording.state == CatalogState.INTERRUPTED
+    assert recording.schedule_id == 3 and recording.size_bytes == 100
+
+
+def test_sync_moves_recordings_without_session_into_the_default_session(catalog, tmp_path):
+    root = tmp_path / "recordings"
+    legacy = root / "20240601_0900"
+    legacy.mkdir(parents=True)
+    (legacy / "cam0.mp4").write_bytes(b"\0" * 10)
+
+    assert catalog.sync() == 1
+    recording = catalog.get_recordings()[0]
+    assert (recording.session, recording.name) == ("default", "20240601_0900")
+    assert catalog.get_file_path(recording.id, "cam0.mp4") == f"{root}/default/20240601_0900/cam0.mp4"
+    assert not legacy.exists()
+
+
+def test_recordings_are_paged_newest_first(catalog, tmp_path):
+    base = datetime(2025, 1, 1, 18, tzinfo=timezone.utc)
+    ids = [
+        catalog.begin("default", str(tmp_path / f"recording{n}"), base + timedelta(days=n // 2), schedule_id=None)
+        for n in range(5)
+    ]
+
+    pages, before = [], None
+    while page := catalog.get_recordings(before=before, limit=2):
+        pages.append([recording.id for recording in page])
+        before = (page[-1].start_time, page[-1].id)
+
+    assert pages == [[ids[4], ids[3]], [ids[2], ids[1]], [ids[0]]]
+    assert [recording.id for recording in catalog.get_recordings(start=base + timedelta(days=1))] == [
+        ids[4],
+        ids[3],
+        ids[2],
+    ]
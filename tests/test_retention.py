@@ -0,0 +1,82 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Event
+
+import pytest
+
+from app.core import retention
+from app.core.config import RecordingConfig, RetentionConfig, StorageConfig
+from app.core.recording_catalog import RecordingCatalog
+from app.core.retention import RetentionStopped, RetentionWorker, TokenBucket
+
+from .helpers import add_recording
+
+
+@pytest.fixture
+def retention_config(catalog, monkeypatch):
+    monkeypatch.setattr(RecordingCatalog, "get_instance", lambda: catalog)
+
+    def configure(quota_gb: float | None = None, **retention_config):
+        config = RecordingConfig(
+            storage=StorageConfig(quota_gb=quota_gb, retention=RetentionConfig(io_mbps=1000, **retention_config))
+        )
+        monkeypatch.setattr(retention, "get_recording_config", lambda: config)
+
+    return configure
+
+
+def add_recordings(catalog, root, ages_days: list[int], size: int) -> list[int]:
+    now = datetime.now().replace(second=0, microsecond=0)
+    for age in ages_days:
+        name = (now - timedelta(days=age)).strftime("%Y%m%d_%H%M")
+        add_recording(root, "default", name, {"cam0.mp4": size, "run.log": 1})
+    catalog.sync()
+    return [recording.id for recording in reversed(catalog.get_recordings())]
+
+
+def test_pass_evicts_the_expired_recordings(catalog, retention_config, tmp_path):
+    retention_config(max_age_days=30, offload_dir=str(tmp_path / "archive"))
+    oldest, old, recent = add_recordings(catalog, tmp_path / "recordings", [90, 40, 1], 1000)
+    running = catalog.begin(
+        "default", str(tmp_path / "recordings/default/20200101_0000"), datetime(2020, 1, 1, tzinfo=timezone.utc), None
+    )
+
+    worker = RetentionWorker.get_instance(logging.getLogger("test_retention"))
+    assert worker.run_pass() == 2
+
+    assert [recording.id for recording in catalog.get_recordings()] == [recent, running]
+    offloaded = list((tmp_path / "archive/default").iterdir())
+    assert len(offloaded) == 2
+    assert all((path / "cam0.mp4").stat().st_size == 1000 for path in offloaded)
+    assert len(list((tmp_path / "recordings/default").iterdir())) == 1
+
+
+def test_pass_evicts_the_oldest_recordings_over_the_quota(catalog, retention_config, tmp_path):
+    retention_config(quota_gb=1500 / 1000**3)
+    ids = add_recordings(catalog, tmp_path / "recordings", [3, 2, 1], 1000)
+
+    worker = RetentionWorker.get_instance(logging.getLogger("test_retention"))
+    assert worker.run_pass() == 2
+    assert [recording.id for recording in catalog.get_recordings()] == ids[2:]
+
+    retention_config(enabled=False, quota_gb=1 / 1000**3)
+    assert worker.run_pass() == 0
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(lambda: 10_000.0, Event())
+
+    started = time.monotonic()
+    bucket.consume(2_000)
+    bucket.consume(2_000)
+    assert 0.3 < time.monotonic() - started < 0.6
+
+
+def test_token_bucket_stops_waiting_when_stopped():
+    stop_event = Event()
+    stop_event.set()
+    bucket = TokenBucket(lambda: 100.0, stop_event)
+
+    with pytest.raises(RetentionStopped):
+        bucket.consume(1_000)
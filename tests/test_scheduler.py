@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import scheduler as scheduler_module
+from app.core.scheduler import TaskOverlapsWithOtherTask
+from app.schemas.schedule import Recurrence, Schedule
+
+from .helpers import FakeTask, wait_for
+
+
+def test_far_deadline_does_not_stop_the_scheduler(scheduler):
+    far_start = datetime(9000, 1, 1, tzinfo=timezone.utc)
+    far_id = scheduler.add_task(Schedule(start_time=far_start, end_time=far_start + timedelta(hours=1)), FakeTask())
+    # Let the scheduler thread go to sleep on the far deadline
+    time.sleep(0.1)
+
+    task = FakeTask()
+    start_time = datetime.now(timezone.utc) + timedelta(milliseconds=200)
+    id = scheduler.add_task(Schedule(start_time=start_time, end_time=start_time + timedelta(hours=1)), task)
+
+    assert wait_for(lambda: task.starts == 1)
+    scheduler.remove_task(far_id)
+    scheduler.remove_task(id)
+
+
+def test_overlaps_with_recurring_tasks(scheduler):
+    task = FakeTask()
+    base = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1)
+    one_off_id = scheduler.add_task(
+        Schedule(start_time=base + timedelta(days=3), end_time=base + timedelta(days=3, hours=1)), task
+    )
+    daily = Recurrence(frequency="daily", count=10)
+
+    with pytest.raises(TaskOverlapsWithOtherTask) as error:
+        scheduler.add_task(Schedule(start_time=base, end_time=base + timedelta(hours=2), recurrence=daily), task)
+    assert error.value.existing_task_id == one_off_id
+
+    evening = base + timedelta(hours=4)
+    daily_id = scheduler.add_task(
+        Schedule(start_time=evening, end_time=evening + timedelta(hours=1), recurrence=daily), task
+    )
+    with pytest.raises(TaskOverlapsWithOtherTask) as error:
+        later = evening + timedelta(days=5, minutes=30)
+        scheduler.add_task(Schedule(start_time=later, end_time=later + timedelta(hours=1)), task)
+    assert error.value.existing_task_id == daily_id
+
+    # Other tasks do not share the resource
+    scheduler.add_task(Schedule(start_time=base, end_time=base + timedelta(hours=2), recurrence=daily), FakeTask())
+
+    for id in [task.id for task in scheduler.get_tasks()]:
+        scheduler.remove_task(id)
+
+
+def test_restart_keeps_the_scheduled_task_running_the_task(scheduler):
+    task = FakeTask()
+    start_time = datetime.now(timezone.utc)
+    id = scheduler.add_task(Schedule(start_time=start_time, end_time=start_time + timedelta(seconds=1.5)), task)
+    assert wait_for(lambda: task.is_running_for(id))
+
+    assert scheduler.restart_running_task(task, datetime.now())
+    assert task.starts == 2 and task.is_running_for(id)
+
+    # The scheduled task still stops the restarted task when its schedule ends
+    assert wait_for(lambda: not task.is_running)
+    assert not scheduler.restart_running_task(task, datetime.now())
+    scheduler.remove_task(id)
+
+
+class SizedTask(FakeTask):
+    def __init__(self, bytes_per_second: int):
+        super().__init__()
+        self.bytes_per_second = bytes_per_second
+        self.estimates = 0
+
+    def estimated_bytes(self, duration: timedelta) -> int:
+        self.estimates += 1
+        return int(self.bytes_per_second * duration.total_seconds())
+
+
+def test_storage_check_estimates_every_task_once(scheduler, monkeypatch):
+    required = []
+    monkeypatch.setattr(
+        scheduler_module, "check_capacity", lambda required_bytes, what, logger: required.append(required_bytes)
+    )
+
+    task, other_task = SizedTask(1), SizedTask(10)
+    base = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1)
+    ids = [
+        scheduler.add_task(
+            Schedule(start_time=base + timedelta(hours=n), end_time=base + timedelta(hours=n, minutes=30)), task
+        )
+        for n in range(4)
+    ]
+    ids.append(scheduler.add_task(Schedule(start_time=base, end_time=base + timedelta(hours=1)), other_task))
+    # Written after the checked task ends
+    ids.append(
+        scheduler.add_task(
+            Schedule(start_time=base + timedelta(days=1), end_time=base + timedelta(days=1, hours=1)), task
+        )
+    )
+
+    required.clear()
+    task.estimates = other_task.estimates = 0
+    ids.append(
+        scheduler.add_task(
+            Schedule(start_time=base + timedelta(hours=2, minutes=30), end_time=base + timedelta(hours=3)), other_task
+        )
+    )
+
+    assert task.estimates == 1 and other_task.estimates == 1
+    assert required == [3 * 1800 + 10 * (3600 + 1800)]
+    for id in ids:
+        scheduler.remove_task(id)
+
+
+def test_recurring_task_overlaps_with_a_task_years_ahead(scheduler):
+    task = FakeTask()
+    base = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1)
+    far = base + timedelta(days=365 * 30)
+    far_id = scheduler.add_task(Schedule(start_time=far, end_time=far + timedelta(hours=1)), task)
+
+    daily = Recurrence(frequency="daily")
+    with pytest.raises(TaskOverlapsWithOtherTask) as error:
+        scheduler.add_task(Schedule(start_time=base, end_time=base + timedelta(hours=2), recurrence=daily), task)
+    assert error.value.existing_task_id == far_id
+
+    evening = base + timedelta(hours=4)
+    daily_id = scheduler.add_task(
+        Schedule(start_time=evening, end_time=evening + timedelta(hours=1), recurrence=daily), task
+    )
+    # The same slot is free when the season ends long before the far task
+    ended = Recurrence(frequency="daily", count=30)
+    ended_id = scheduler.add_task(Schedule(start_time=base, end_time=base + timedelta(hours=2), recurrence=ended), task)
+
+    for id in (far_id, daily_id, ended_id):
+        scheduler.remove_task(id)
@@ -0,0 +1,38 @@
+import logging
+import time
+
+from app.core.metrics import MetricsRegistry
+from app.core.process_context import get_worker_context
+from app.core.supervisor import SupervisedWorker, WorkerSupervisor
+
+
+def run_worker(stop_event, ignore_stop: bool):
+    while ignore_stop or not stop_event.is_set():
+        time.sleep(0.01)
+
+
+def spawn_worker(ignore_stop: bool):
+    def spawn(segment: int, stop_event):
+        process = get_worker_context().Process(target=run_worker, args=(stop_event, ignore_stop), daemon=True)
+        process.start()
+        return process
+
+    return spawn
+
+
+def test_stop_escalates_within_the_deadline(tmp_path):
+    workers = [SupervisedWorker("cam0", 0, spawn_worker(False)), SupervisedWorker("cam1", 1, spawn_worker(True))]
+    metrics = MetricsRegistry([{"worker": worker.name} for worker in workers])
+    supervisor = WorkerSupervisor(workers, metrics, str(tmp_path), "default", logging.getLogger("test_supervisor"))
+    for worker in workers:
+        worker.start(0)
+    supervisor.start()
+
+    started = time.monotonic()
+    report = supervisor.stop(0.5)
+    elapsed = time.monotonic() - started
+    metrics.close()
+
+    assert report["cam0"]["escalation"] == "none"
+    assert report["cam1"]["escalation"] == "terminated"
+    assert elapsed < 0.5 + WorkerSupervisor.ESCALATION_GRACE
@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from app.core import timeline
+from app.core.timeline import TimelineJournal, cut_clips, load_timeline
+
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0]
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeline, "_probe_keyframes", lambda path: (KEYFRAMES, 10.0))
+
+    journal = TimelineJournal(str(tmp_path))
+    journal.record("ptz_preset", 999.0, preset=1)
+    journal.record("segment_started", 1000.0, file="cam0.mp4")
+    journal.record("segment_started", 1000.5, file="cam1.mp4")
+    # Camera 0 was restarted into a new segment
+    journal.record("segment_started", 1020.0, file="cam0_seg1.mp4")
+    journal.record("ptz_preset", 1004.0, preset=3)
+    journal.record("recording_stopped", 1030.0)
+    for name in ("cam0.mp4", "cam1.mp4", "cam0_seg1.mp4"):
+        (tmp_path / name).touch()
+
+    return tmp_path
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch):
+    commands = []
+
+    def run(command: list[str], **kwargs):
+        commands.append(command)
+        with open(command[-1], "w"):
+            pass
+
+    monkeypatch.setattr(timeline.subprocess, "run", run)
+    return commands
+
+
+def test_clips_are_widened_to_keyframes(recording, ffmpeg):
+    clips = cut_clips(str(recording), 1003.0, 1005.0)
+
+    assert [(clip.name, clip.camera, clip.segment, clip.start, clip.end) for clip in clips] == [
+        ("cam0_2000-6000.mp4", 0, 0, 1002.0, 1006.0),
+        ("cam1_2000-6000.mp4", 1, 0, 1002.5, 1006.5),
+    ]
+    command = ffmpeg[0]
+    assert command[command.index("-ss") + 1] == "2.000000"
+    assert command[command.index("-t") + 1] == "4.000000"
+    assert command[command.index("-c") + 1] == "copy"
+    assert all(os.path.exists(clip.path) for clip in clips)
+
+    # Clips already cut are reused
+    assert cut_clips(str(recording), 1003.0, 1005.0) == clips
+    assert len(ffmpeg) == 2
+
+
+def test_clips_end_with_the_file(recording, ffmpeg):
+    clips = cut_clips(str(recording), 1028.5, 1040.0, cameras=[0])
+
+    assert [(clip.name, clip.start, clip.end) for clip in clips] == [("cam0_seg1_8000-10000.mp4", 1028.0, 1030.0)]
+
+
+def test_timeline_is_indexed_once(recording, monkeypatch):
+    first = load_timeline(str(recording))
+    assert [interval.preset for interval in first.preset_intervals()] == [1, 3]
+    assert first.preset_intervals()[-1].end == 1030.0
+
+    monkeypatch.setattr(timeline, "_probe_keyframes", lambda path: pytest.fail("Timeline was indexed again"))
+    assert load_timeline(str(recording)) == first
+    with open(recording / "timeline.json") as file:
+        assert len(json.load(file)["files"]) == 3